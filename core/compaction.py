@@ -0,0 +1,71 @@
+import logging
+import time
+from datetime import timedelta
+from django.conf import settings
+from django.utils import timezone
+from core.scheduler import schedule_periodic
+from quiz_management_app.models import QuizSession
+from quiz_management_app.api.answer_buffer import (
+    flush_dirty_sessions, get_buffered_session_ids, is_answer_buffer_enabled
+)
+from quiz_management_app.api.deletion import QuizDeletionService
+from user_auth_app.api.token_compaction import delete_expired_tokens
+
+logger = logging.getLogger(__name__)
+
+COMPACTION_TASK_NAME = 'compaction'
+
+
+def get_stale_sessions(cutoff):
+    """Gets unfinished sessions started and last answered before the cutoff"""
+    return QuizSession.objects.filter(is_completed=False, started_at__lt=cutoff).exclude(
+        answers__answered_at__gte=cutoff
+    )
+
+
+def exclude_buffered_sessions(sessions, batch_size):
+    """Keeps sessions whose answers are still in the write-behind buffer, as their rows look stale"""
+    if not is_answer_buffer_enabled():
+        return sessions
+    flush_dirty_sessions()
+    # Other processes flush their own sessions; their buffered state is visible in the shared cache
+    buffered = []
+    last_pk = 0
+    while True:
+        batch = list(sessions.filter(pk__gt=last_pk).order_by('pk').values_list('pk', flat=True)[:batch_size])
+        if not batch:
+            break
+        buffered.extend(get_buffered_session_ids(batch))
+        last_pk = batch[-1]
+    return sessions.exclude(pk__in=buffered) if buffered else sessions
+
+
+def compact_database(batch_size=None, session_max_age=None, progress=None):
+    """Deletes expired tokens and stale open sessions and reports removed rows and seconds spent"""
+    batch_size = batch_size or getattr(settings, 'COMPACTION_BATCH_SIZE', 1000)
+    if session_max_age is None:
+        session_max_age = timedelta(days=getattr(settings, 'COMPACTION_STALE_SESSION_DAYS', 7))
+    now = timezone.now()
+    start = time.perf_counter()
+
+    totals = dict(delete_expired_tokens(now=now, batch_size=batch_size, progress=progress))
+    service = QuizDeletionService(
+        batch_size=batch_size,
+        progress=(lambda session_totals: progress({**totals, **session_totals})) if progress else None
+    )
+    sessions = exclude_buffered_sessions(get_stale_sessions(now - session_max_age), batch_size)
+    totals.update(service.delete_open_sessions(sessions))
+    return totals, time.perf_counter() - start
+
+
+def _run_scheduled_compaction():
+    """Runs one compaction pass and logs its result"""
+    totals, elapsed = compact_database()
+    logger.info(f"Compaction removed {totals or 'no rows'} in {elapsed:.2f}s")
+
+
+def start_compaction_schedule():
+    """Starts periodic compaction in this process when COMPACTION_INTERVAL is set"""
+    interval = getattr(settings, 'COMPACTION_INTERVAL', 0)
+    if interval > 0:
+        schedule_periodic(COMPACTION_TASK_NAME, interval, _run_scheduled_compaction)
@@ -0,0 +1,22 @@
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+
+def get_sqlite_pragmas():
+    """Gets the PRAGMAs applied to new SQLite connections"""
+    return getattr(settings, 'SQLITE_PRAGMAS', {})
+
+
+def apply_sqlite_pragmas(connection, pragmas):
+    """Sets PRAGMAs on an open SQLite connection"""
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+
+
+@receiver(connection_created, dispatch_uid='quizly_sqlite_pragmas')
+def configure_sqlite_connection(sender, connection, **kwargs):
+    """Applies the configured PRAGMAs whenever Django opens a SQLite connection"""
+    if connection.vendor == 'sqlite':
+        apply_sqlite_pragmas(connection, get_sqlite_pragmas())
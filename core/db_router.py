@@ -0,0 +1,50 @@
+from contextvars import ContextVar
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+
+_routing_state = ContextVar('quizly_routing_state', default=None)
+
+
+def get_replica_alias():
+    """Gets the configured replica alias or None when no replica is set up"""
+    alias = getattr(settings, 'REPLICA_DATABASE_ALIAS', 'replica')
+    return alias if alias in settings.DATABASES else None
+
+
+def begin_request_routing(allow_replica):
+    """Starts routing state for the current request and returns its reset token"""
+    return _routing_state.set({'allow_replica': allow_replica, 'wrote': False})
+
+
+def end_request_routing(token):
+    """Ends routing state for the current request and tells whether it wrote"""
+    state = _routing_state.get()
+    _routing_state.reset(token)
+    return bool(state and state['wrote'])
+
+
+class ReplicaRouter:
+    """Routes reads of replica-safe requests to the replica and everything else to the primary"""
+
+    def db_for_read(self, model, **hints):
+        """Uses the replica until the request writes or when it is not replica-safe"""
+        state = _routing_state.get()
+        if state is None or not state['allow_replica'] or state['wrote']:
+            return DEFAULT_DB_ALIAS
+        return get_replica_alias() or DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        """Writes always go to the primary and pin the rest of the request to it"""
+        state = _routing_state.get()
+        if state is not None:
+            state['wrote'] = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        """Primary and replica hold the same data"""
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        """Migrates only the primary; replicas follow through replication"""
+        return db != get_replica_alias()
@@ -0,0 +1,37 @@
+from django.conf import settings
+from .db_router import begin_request_routing, end_request_routing, get_replica_alias
+
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+class ReplicaRoutingMiddleware:
+    """Allows replica reads for safe requests and pins clients to the primary after their writes"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        """Sets up routing state around the view and sets the pin cookie after writes"""
+        cookie_name = getattr(settings, 'REPLICA_PIN_COOKIE_NAME', 'primary_pin')
+        allow_replica = (
+            get_replica_alias() is not None
+            and request.method in SAFE_METHODS
+            and cookie_name not in request.COOKIES
+        )
+        token = begin_request_routing(allow_replica)
+        try:
+            response = self.get_response(request)
+        finally:
+            wrote = end_request_routing(token)
+
+        if wrote and get_replica_alias() is not None:
+            response.set_cookie(
+                cookie_name,
+                '1',
+                httponly=True,
+                samesite='Lax',
+                max_age=getattr(settings, 'REPLICA_PIN_SECONDS', 10),
+                secure=False
+            )
+        return response
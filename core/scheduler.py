@@ -0,0 +1,61 @@
+import logging
+import threading
+from django.db import close_old_connections
+
+logger = logging.getLogger(__name__)
+
+_tasks = {}
+_tasks_lock = threading.Lock()
+
+
+class PeriodicTask:
+    """Runs a function every interval seconds in a daemon thread"""
+
+    def __init__(self, name, interval, func):
+        self.name = name
+        self.interval = interval
+        self.func = func
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f'quizly-{name}', daemon=True)
+
+    def _run(self):
+        """Calls the function until the task is stopped"""
+        while not self._stop.wait(self.interval):
+            self.run_once()
+
+    def run_once(self):
+        """Calls the function once with fresh database connections"""
+        close_old_connections()
+        try:
+            self.func()
+        except Exception:
+            logger.exception(f"Periodic task {self.name} failed")
+        finally:
+            close_old_connections()
+
+    def start(self):
+        """Starts the worker thread"""
+        self._thread.start()
+
+    def stop(self):
+        """Stops the worker thread after the current run"""
+        self._stop.set()
+
+
+def schedule_periodic(name, interval, func):
+    """Starts a periodic task once per process and name"""
+    with _tasks_lock:
+        task = _tasks.get(name)
+        if task is None:
+            task = PeriodicTask(name, interval, func)
+            _tasks[name] = task
+            task.start()
+        return task
+
+
+def cancel_periodic(name):
+    """Stops a periodic task if it is running"""
+    with _tasks_lock:
+        task = _tasks.pop(name, None)
+    if task is not None:
+        task.stop()
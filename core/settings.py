@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 from datetime import timedelta
 
@@ -39,6 +40,7 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'rest_framework',
+    'rest_framework_simplejwt.token_blacklist',
     'corsheaders',
     'user_auth_app',
     'quiz_management_app',
@@ -51,6 +53,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.middleware.ReplicaRoutingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -77,15 +80,137 @@ WSGI_APPLICATION = 'core.wsgi.application'
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
+# QUIZLY_DB_ENGINE: sqlite (Standard) oder postgres (benötigt psycopg, Pool zusätzlich psycopg[pool])
 
-DATABASES = {
-    'default': {
+QUIZLY_DB_ENGINE = os.environ.get('QUIZLY_DB_ENGINE', 'sqlite')
+QUIZLY_DB_POOL = os.environ.get('QUIZLY_DB_POOL', 'False') == 'True'
+
+DATABASE_BACKENDS = {
+    'sqlite': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'NAME': os.environ.get('QUIZLY_DB_NAME', BASE_DIR / 'db.sqlite3'),
+        'OPTIONS': {
+            # Schreibtransaktionen sofort sperren statt beim ersten Schreibzugriff zu scheitern
+            'transaction_mode': 'IMMEDIATE',
+        },
+    },
+    'postgres': {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': os.environ.get('QUIZLY_DB_NAME', 'quizly'),
+        'USER': os.environ.get('QUIZLY_DB_USER', 'quizly'),
+        'PASSWORD': os.environ.get('QUIZLY_DB_PASSWORD', ''),
+        'HOST': os.environ.get('QUIZLY_DB_HOST', '127.0.0.1'),
+        'PORT': os.environ.get('QUIZLY_DB_PORT', '5432'),
+        # Persistente Verbindungen und Pooling schließen sich in Django aus
+        'CONN_MAX_AGE': 0 if QUIZLY_DB_POOL else int(os.environ.get('QUIZLY_DB_CONN_MAX_AGE', 60)),
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {'pool': True} if QUIZLY_DB_POOL else {},
+    },
+}
+
+DATABASES = {
+    'default': DATABASE_BACKENDS[QUIZLY_DB_ENGINE],
+}
+
+# Optionales Lese-Replikat: QUIZLY_DB_REPLICA_HOST (PostgreSQL) oder QUIZLY_DB_REPLICA_NAME (z.B. SQLite-Datei)
+if os.environ.get('QUIZLY_DB_REPLICA_HOST') or os.environ.get('QUIZLY_DB_REPLICA_NAME'):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'NAME': os.environ.get('QUIZLY_DB_REPLICA_NAME', DATABASES['default']['NAME']),
+        'HOST': os.environ.get('QUIZLY_DB_REPLICA_HOST', DATABASES['default'].get('HOST', '')),
+        'TEST': {'MIRROR': 'default'},
     }
+
+DATABASE_ROUTERS = ['core.db_router.ReplicaRouter']
+REPLICA_DATABASE_ALIAS = 'replica'
+# Nach eigenen Schreibzugriffen liest der Client so lange vom Primary (Sekunden)
+REPLICA_PIN_SECONDS = int(os.environ.get('QUIZLY_REPLICA_PIN_SECONDS', 10))
+REPLICA_PIN_COOKIE_NAME = 'primary_pin'
+
+# Wird bei jeder neuen SQLite-Verbindung gesetzt (siehe core/db.py)
+SQLITE_PRAGMAS = {
+    'journal_mode': os.environ.get('QUIZLY_SQLITE_JOURNAL_MODE', 'WAL'),
+    'synchronous': os.environ.get('QUIZLY_SQLITE_SYNCHRONOUS', 'NORMAL'),
+    'busy_timeout': int(os.environ.get('QUIZLY_SQLITE_BUSY_TIMEOUT', 20000)),
+    'mmap_size': int(os.environ.get('QUIZLY_SQLITE_MMAP_SIZE', 134217728)),
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# QUIZLY_CACHE_BACKEND: locmem (Standard, pro Prozess), file oder redis (geteilt, benötigt redis-py)
+
+QUIZLY_CACHE_BACKEND = os.environ.get('QUIZLY_CACHE_BACKEND', 'locmem')
+
+CACHE_BACKENDS = {
+    'locmem': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'quizly',
+    },
+    'file': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get('QUIZLY_CACHE_LOCATION', str(BASE_DIR / 'cache')),
+    },
+    'redis': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ.get('QUIZLY_CACHE_LOCATION', 'redis://127.0.0.1:6379/1'),
+    },
+}
+
+CACHES = {
+    'default': CACHE_BACKENDS[QUIZLY_CACHE_BACKEND],
+}
+
+QUIZ_PAYLOAD_CACHE_ALIAS = 'default'
+QUIZ_PAYLOAD_CACHE_TIMEOUT = int(os.environ.get('QUIZ_PAYLOAD_CACHE_TIMEOUT', 3600))
+
+# Maximale Anzahl Einträge pro Quiz-Bestenliste
+QUIZ_LEADERBOARD_SIZE = int(os.environ.get('QUIZ_LEADERBOARD_SIZE', 100))
+
+# Antworten im Cache puffern und gesammelt in die Datenbank schreiben (bei mehreren Workern nur mit geteiltem Cache; Sperre pro Sitzung in Sekunden)
+QUIZ_ANSWER_BUFFER_ENABLED = os.environ.get('QUIZ_ANSWER_BUFFER_ENABLED', 'False') == 'True'
+QUIZ_ANSWER_BUFFER_CACHE_ALIAS = 'default'
+QUIZ_ANSWER_BUFFER_FLUSH_INTERVAL = float(os.environ.get('QUIZ_ANSWER_BUFFER_FLUSH_INTERVAL', 5))
+QUIZ_ANSWER_BUFFER_STATE_TIMEOUT = int(os.environ.get('QUIZ_ANSWER_BUFFER_STATE_TIMEOUT', 86400))
+QUIZ_ANSWER_BUFFER_LOCK_TIMEOUT = float(os.environ.get('QUIZ_ANSWER_BUFFER_LOCK_TIMEOUT', 5))
+
+# Zugangskontrolle für Quiz-Generierung pro Prozess (gleichzeitig gesamt/pro Benutzer, Warteschlange, Wartezeit in Sekunden)
+QUIZ_GENERATION_MAX_CONCURRENT = int(os.environ.get('QUIZ_GENERATION_MAX_CONCURRENT', 2))
+QUIZ_GENERATION_MAX_PER_USER = int(os.environ.get('QUIZ_GENERATION_MAX_PER_USER', 1))
+QUIZ_GENERATION_MAX_QUEUED = int(os.environ.get('QUIZ_GENERATION_MAX_QUEUED', 20))
+QUIZ_GENERATION_MAX_QUEUED_PER_USER = int(os.environ.get('QUIZ_GENERATION_MAX_QUEUED_PER_USER', 2))
+QUIZ_GENERATION_QUEUE_TIMEOUT = float(os.environ.get('QUIZ_GENERATION_QUEUE_TIMEOUT', 60))
+QUIZ_GENERATION_STAFF_WEIGHT = float(os.environ.get('QUIZ_GENERATION_STAFF_WEIGHT', 2))
+
+# Gestufte Quiz-Generierung: Download-, Transkriptions- und LLM-Threads mit begrenzten Warteschlangen
+# (ASR-Threads 0 = Anzahl CPU-Kerne, die Kerne werden auf ihre torch-Threads aufgeteilt;
+# gleichzeitige Generierungen ersetzen QUIZ_GENERATION_MAX_CONCURRENT, 0 = Summe aller Threads)
+QUIZ_PIPELINE_ENABLED = os.environ.get('QUIZ_PIPELINE_ENABLED', 'False') == 'True'
+QUIZ_PIPELINE_MAX_IN_FLIGHT = int(os.environ.get('QUIZ_PIPELINE_MAX_IN_FLIGHT', 0))
+QUIZ_PIPELINE_DOWNLOAD_WORKERS = int(os.environ.get('QUIZ_PIPELINE_DOWNLOAD_WORKERS', 4))
+QUIZ_PIPELINE_DOWNLOAD_QUEUE = int(os.environ.get('QUIZ_PIPELINE_DOWNLOAD_QUEUE', 16))
+QUIZ_PIPELINE_ASR_WORKERS = int(os.environ.get('QUIZ_PIPELINE_ASR_WORKERS', 0))
+QUIZ_PIPELINE_ASR_QUEUE = int(os.environ.get('QUIZ_PIPELINE_ASR_QUEUE', 4))
+# Speicherbudget für Whisper-Modelle (ein Modell je ASR-Thread, 0 = unbegrenzt) und geschätzter Bedarf je Modell in MB
+QUIZ_PIPELINE_ASR_MEMORY_MB = int(os.environ.get('QUIZ_PIPELINE_ASR_MEMORY_MB', 0))
+QUIZ_WHISPER_MODEL_MEMORY_MB = int(os.environ.get('QUIZ_WHISPER_MODEL_MEMORY_MB', 500))
+QUIZ_PIPELINE_LLM_WORKERS = int(os.environ.get('QUIZ_PIPELINE_LLM_WORKERS', 8))
+QUIZ_PIPELINE_LLM_QUEUE = int(os.environ.get('QUIZ_PIPELINE_LLM_QUEUE', 16))
+
+# Abbruch laufender Quiz-Generierungen (Prüfintervall für getrennte Clients und Länge der Transkriptionsabschnitte in Sekunden)
+QUIZ_GENERATION_DISCONNECT_POLL_INTERVAL = float(os.environ.get('QUIZ_GENERATION_DISCONNECT_POLL_INTERVAL', 1))
+QUIZ_TRANSCRIBE_CHUNK_SECONDS = int(os.environ.get('QUIZ_TRANSCRIBE_CHUNK_SECONDS', 120))
+
+# Gespeicherte Antworten für wiederholte createQuiz-Anfragen mit Idempotency-Key (Lebensdauer in Sekunden)
+QUIZ_IDEMPOTENCY_CACHE_ALIAS = 'default'
+QUIZ_IDEMPOTENCY_TIMEOUT = int(os.environ.get('QUIZ_IDEMPOTENCY_TIMEOUT', 86400))
+
+# Abgelaufene Tokens und verwaiste Sitzungen löschen (Intervall in Sekunden, 0 = nur per compact_database)
+COMPACTION_INTERVAL = int(os.environ.get('COMPACTION_INTERVAL', 0))
+COMPACTION_BATCH_SIZE = int(os.environ.get('COMPACTION_BATCH_SIZE', 1000))
+COMPACTION_STALE_SESSION_DAYS = int(os.environ.get('COMPACTION_STALE_SESSION_DAYS', 7))
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -129,7 +254,6 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
         'user_auth_app.api.authentication.CookieJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
@@ -137,8 +261,47 @@ REST_FRAMEWORK = {
     ],
 }
 
+# Prozesslokaler Cache für authentifizierte Benutzer (Einträge, Lebensdauer in Sekunden)
+AUTH_USER_CACHE_SIZE = int(os.environ.get('AUTH_USER_CACHE_SIZE', 1024))
+AUTH_USER_CACHE_TTL = int(os.environ.get('AUTH_USER_CACHE_TTL', 30))
+
+# Bloom-Filter für gesperrte Tokens (Mindestkapazität, Fehlerrate, Abgleich- und Neuaufbauintervall in Sekunden)
+REVOCATION_FILTER_CAPACITY = int(os.environ.get('REVOCATION_FILTER_CAPACITY', 100000))
+REVOCATION_FILTER_ERROR_RATE = float(os.environ.get('REVOCATION_FILTER_ERROR_RATE', 0.001))
+REVOCATION_FILTER_SYNC_INTERVAL = int(os.environ.get('REVOCATION_FILTER_SYNC_INTERVAL', 5))
+REVOCATION_FILTER_REBUILD_INTERVAL = int(os.environ.get('REVOCATION_FILTER_REBUILD_INTERVAL', 3600))
+# Beim Abgleich erneut gelesene IDs unterhalb der letzten, damit verspätet committete Sperren nicht fehlen
+REVOCATION_FILTER_SYNC_OVERLAP = int(os.environ.get('REVOCATION_FILTER_SYNC_OVERLAP', 1000))
+
+# Token-Bucket für Anmeldeversuche je IP und Benutzername (Burst, Nachfüllrate pro Minute)
+LOGIN_THROTTLE_RATES = {
+    'login_ip': (int(os.environ.get('LOGIN_THROTTLE_IP_BURST', 60)), int(os.environ.get('LOGIN_THROTTLE_IP_PER_MINUTE', 60))),
+    'login_username': (int(os.environ.get('LOGIN_THROTTLE_USERNAME_BURST', 10)), int(os.environ.get('LOGIN_THROTTLE_USERNAME_PER_MINUTE', 10))),
+}
+LOGIN_THROTTLE_CACHE_ALIAS = 'default'
+
+# Passwortprüfung in begrenztem Thread-Pool pro Prozess (Threads, Warteschlange, Wartezeit in Sekunden)
+LOGIN_HASH_WORKERS = int(os.environ.get('LOGIN_HASH_WORKERS', 2))
+LOGIN_HASH_QUEUE_SIZE = int(os.environ.get('LOGIN_HASH_QUEUE_SIZE', 32))
+LOGIN_HASH_TIMEOUT = float(os.environ.get('LOGIN_HASH_TIMEOUT', 10))
+
+# Anmeldung über ModelBackend, das Passwörter im begrenzten Thread-Pool prüft
+AUTHENTICATION_BACKENDS = ['user_auth_app.api.backends.BoundedHashingModelBackend']
+
+# Prozesse für das Hashen von Passwörtern beim CSV-Benutzerimport per Befehl (0 = Anzahl CPU-Kerne)
+USER_IMPORT_HASH_PROCESSES = int(os.environ.get('USER_IMPORT_HASH_PROCESSES', 0))
+# und beim Upload über die API (klein halten, die Prozesse laufen neben dem Webserver)
+USER_IMPORT_UPLOAD_HASH_PROCESSES = int(os.environ.get('USER_IMPORT_UPLOAD_HASH_PROCESSES', 2))
+
+# Token-Validierung über Signatur, Ablauf und Benutzer-Claims; die Token-Version wird gegen den Cache geprüft.
+# Passwortänderung, Deaktivierung oder Löschung wirken spätestens nach AUTH_TOKEN_VERSION_CACHE_TTL Sekunden,
+# Profiländerungen (Name, E-Mail) erst mit dem nächsten Access-Token
+AUTH_STATELESS_TOKEN_VALIDATION = os.environ.get('AUTH_STATELESS_TOKEN_VALIDATION', 'False') == 'True'
+AUTH_TOKEN_VERSION_CACHE_TTL = int(os.environ.get('AUTH_TOKEN_VERSION_CACHE_TTL', 60))
+
 SIMPLE_JWT = {
-    'ACCESS_TOKEN_LIFETIME': timedelta(minutes=60),
+    # Kürzer bei zustandsloser Validierung, da die Benutzer-Claims bis zum Ablauf veralten können
+    'ACCESS_TOKEN_LIFETIME': timedelta(minutes=15 if AUTH_STATELESS_TOKEN_VALIDATION else 60),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=1),
     'ROTATE_REFRESH_TOKENS': True,
     'BLACKLIST_AFTER_ROTATION': True,
@@ -155,7 +318,7 @@ SIMPLE_JWT = {
     'USER_ID_FIELD': 'id',
     'USER_ID_CLAIM': 'user_id',
     'USER_AUTHENTICATION_RULE': 'rest_framework_simplejwt.authentication.default_user_authentication_rule',
-    'AUTH_TOKEN_CLASSES': ('rest_framework_simplejwt.tokens.AccessToken',),
+    'AUTH_TOKEN_CLASSES': ('user_auth_app.api.tokens.AccessToken',),
     'TOKEN_TYPE_CLAIM': 'token_type',
     'TOKEN_USER_CLASS': 'rest_framework_simplejwt.models.TokenUser',
     'JTI_CLAIM': 'jti',
@@ -198,6 +361,10 @@ CORS_ALLOW_ALL_ORIGINS = False  # Sicherheit: Nur erlaubte Origins
 CORS_EXPOSE_HEADERS = [
     'content-type',
     'authorization',
+    'etag',
+    'last-modified',
+    'retry-after',
+    'idempotent-replayed',
 ]
 
 CORS_ALLOW_METHODS = [
@@ -221,6 +388,9 @@ CORS_ALLOW_HEADERS = [
     'x-requested-with',
     'cache-control',
     'pragma',
+    'if-none-match',
+    'if-modified-since',
+    'idempotency-key',
 ]
 
 # Session-Einstellungen für bessere Cookie-Unterstützung
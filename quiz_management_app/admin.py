@@ -1,5 +1,7 @@
 from django.contrib import admin
 from .models import Quiz, Question, QuestionOption
+from .api.deletion import QuizDeletionService, count_quiz_rows
+from .api.search import is_search_index_available, search_quiz_ids
 
 
 class QuestionOptionInline(admin.TabularInline):
@@ -21,10 +23,31 @@ class QuizAdmin(admin.ModelAdmin):
     search_fields = ['title', 'description', 'video_url']
     readonly_fields = ['created_at']
     inlines = [QuestionInline]
+    search_result_limit = 1000
     
     def question_count(self, obj):
         return obj.questions.count()
     question_count.short_description = 'Anzahl Fragen'
+    
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term or not is_search_index_available():
+            return super().get_search_results(request, queryset, search_term)
+        quiz_ids = [quiz_id for quiz_id, _ in search_quiz_ids(search_term, limit=self.search_result_limit)]
+        return queryset.filter(pk__in=quiz_ids), False
+    
+    def get_deleted_objects(self, objs, request):
+        model_count = {
+            model._meta.verbose_name_plural: count
+            for model, count in count_quiz_rows([obj.pk for obj in objs]).items() if count
+        }
+        perms_needed = set() if self.has_delete_permission(request) else {self.opts.verbose_name}
+        return [str(obj) for obj in objs], model_count, perms_needed, []
+    
+    def delete_model(self, request, obj):
+        QuizDeletionService().delete_quizzes(Quiz.objects.filter(pk=obj.pk))
+    
+    def delete_queryset(self, request, queryset):
+        QuizDeletionService().delete_quizzes(queryset)
 
 
 @admin.register(Question)
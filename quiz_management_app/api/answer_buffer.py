@@ -0,0 +1,226 @@
+import atexit
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import Case, When, Value
+from core.scheduler import schedule_periodic
+from ..models import QuestionOption, QuizSession, QuizAnswer
+from .fast_serializers import get_play_questions
+from .question_stats import apply_option_deltas
+from .quiz_utils import move_to_next_question
+
+
+FLUSH_TASK_NAME = 'answer-buffer-flush'
+
+_dirty = {}
+_dirty_lock = threading.Lock()
+
+
+def is_answer_buffer_enabled():
+    """Checks whether answers are buffered in the cache before reaching the database"""
+    return getattr(settings, 'QUIZ_ANSWER_BUFFER_ENABLED', False)
+
+
+def _get_cache():
+    """Gets the cache backend holding buffered session state"""
+    return caches[getattr(settings, 'QUIZ_ANSWER_BUFFER_CACHE_ALIAS', 'default')]
+
+
+def _get_timeout():
+    """Gets the lifetime of buffered session state in seconds"""
+    return getattr(settings, 'QUIZ_ANSWER_BUFFER_STATE_TIMEOUT', 86400)
+
+
+def build_state_key(session_id):
+    """Builds the cache key of a buffered session state"""
+    return f'quizly:session:{session_id}:state'
+
+
+class SessionLocked(Exception):
+    """Raised when another answer of the same session holds the buffer lock too long"""
+
+
+def build_lock_key(session_id):
+    """Builds the cache key of a session's buffer lock"""
+    return f'quizly:session:{session_id}:lock'
+
+
+@contextmanager
+def _session_lock(session_id):
+    """Serialises read-modify-write of one session's buffered state across processes"""
+    cache = _get_cache()
+    key = build_lock_key(session_id)
+    owner = uuid.uuid4().hex
+    timeout = getattr(settings, 'QUIZ_ANSWER_BUFFER_LOCK_TIMEOUT', 5)
+    deadline = time.monotonic() + timeout
+    # add() only succeeds if the key is absent; the lock expires if its holder dies
+    while not cache.add(key, owner, timeout):
+        if time.monotonic() >= deadline:
+            raise SessionLocked(session_id)
+        time.sleep(0.005)
+    try:
+        yield
+    finally:
+        if cache.get(key) == owner:
+            cache.delete(key)
+
+
+def _load_state(session):
+    """Gets the buffered state of a session or starts one from the database row"""
+    state = _get_cache().get(build_state_key(session.pk))
+    if state is None:
+        state = {'index': session.current_question_index, 'answers': {}, 'version': 0}
+    return state
+
+
+def _store_state(session_id, state):
+    """Writes a session state back to the cache"""
+    _get_cache().set(build_state_key(session_id), state, _get_timeout())
+
+
+def _mark_dirty(session_id, version):
+    """Registers a session for the next flush and makes sure the flush timer runs"""
+    with _dirty_lock:
+        _dirty[session_id] = version
+    schedule_periodic(
+        FLUSH_TASK_NAME,
+        getattr(settings, 'QUIZ_ANSWER_BUFFER_FLUSH_INTERVAL', 5),
+        flush_dirty_sessions
+    )
+
+
+def apply_buffered_state(session):
+    """Replaces the stored progress of an open session with its buffered progress"""
+    if not is_answer_buffer_enabled() or session.is_completed:
+        return session
+    state = _get_cache().get(build_state_key(session.pk))
+    if state is not None:
+        session.current_question_index = state['index']
+    return session
+
+
+def _existing_answers(session_ids):
+    """Gets stored option ids per (session id, question id)"""
+    rows = QuizAnswer.objects.filter(session_id__in=session_ids).values_list(
+        'session_id', 'question_id', 'selected_option_id'
+    )
+    return {(session_id, question_id): option_id for session_id, question_id, option_id in rows}
+
+
+def _valid_option_pairs(states):
+    """Gets (option id, question id) pairs of buffered answers that still exist"""
+    option_ids = {
+        option_id for state in states.values() for option_id in state['answers'].values()
+    }
+    return set(QuestionOption.objects.filter(pk__in=option_ids).values_list('pk', 'question_id'))
+
+
+def flush_sessions(session_ids):
+    """Writes buffered answers and progress of open sessions in one transaction"""
+    session_ids = list(session_ids)
+    states = _get_cache().get_many([build_state_key(session_id) for session_id in session_ids])
+    states = {
+        session_id: states[build_state_key(session_id)]
+        for session_id in session_ids if build_state_key(session_id) in states
+    }
+    if not states:
+        return {}
+
+    with transaction.atomic():
+        open_ids = set(
+            QuizSession.objects.filter(pk__in=list(states), is_completed=False).values_list('pk', flat=True)
+        )
+        existing = _existing_answers(open_ids)
+        valid_pairs = _valid_option_pairs(states)
+        answers = []
+        deltas = {}
+        for session_id in open_ids:
+            for question_id, option_id in states[session_id]['answers'].items():
+                question_id = int(question_id)
+                previous_option_id = existing.get((session_id, question_id))
+                if previous_option_id == option_id or (option_id, question_id) not in valid_pairs:
+                    continue
+                answers.append(QuizAnswer(
+                    session_id=session_id, question_id=question_id, selected_option_id=option_id
+                ))
+                deltas[option_id] = deltas.get(option_id, 0) + 1
+                if previous_option_id is not None:
+                    deltas[previous_option_id] = deltas.get(previous_option_id, 0) - 1
+
+        QuizAnswer.objects.bulk_create(
+            answers,
+            update_conflicts=True,
+            unique_fields=['session', 'question'],
+            update_fields=['selected_option']
+        )
+        if open_ids:
+            QuizSession.objects.filter(pk__in=open_ids).update(current_question_index=Case(
+                *[When(pk=session_id, then=Value(states[session_id]['index'])) for session_id in open_ids]
+            ))
+        apply_option_deltas(deltas)
+    return {session_id: states[session_id]['version'] for session_id in states}
+
+
+def get_buffered_session_ids(session_ids):
+    """Gets the ids among session_ids whose answers are still buffered in the cache"""
+    session_ids = list(session_ids)
+    states = _get_cache().get_many([build_state_key(session_id) for session_id in session_ids])
+    return [session_id for session_id in session_ids if build_state_key(session_id) in states]
+
+
+def flush_dirty_sessions():
+    """Flushes all sessions buffered in this process since the last flush"""
+    with _dirty_lock:
+        pending = dict(_dirty)
+    if not pending:
+        return 0
+    flushed = flush_sessions(pending)
+    with _dirty_lock:
+        for session_id, version in pending.items():
+            if _dirty.get(session_id) == version:
+                del _dirty[session_id]
+    return len(flushed)
+
+
+def submit_buffered_answer(session, question, selected_option):
+    """Buffers an answer and advances the session, completing it durably on the last question"""
+    with _session_lock(session.pk):
+        return _submit_locked(session, question, selected_option)
+
+
+def _submit_locked(session, question, selected_option):
+    """Applies an answer to the buffered state while the session lock is held"""
+    state = _load_state(session)
+    state['answers'][str(question.pk)] = selected_option.pk
+    state['version'] += 1
+    session.current_question_index = state['index']
+
+    total_questions = len(get_play_questions(session.quiz_id, session.quiz_content_version))
+    if session.current_question_index < total_questions - 1:
+        session.current_question_index += 1
+        state['index'] = session.current_question_index
+        _store_state(session.pk, state)
+        _mark_dirty(session.pk, state['version'])
+        return session
+
+    _store_state(session.pk, state)
+    with transaction.atomic():
+        flush_sessions([session.pk])
+        move_to_next_question(session)
+    _get_cache().delete(build_state_key(session.pk))
+    with _dirty_lock:
+        _dirty.pop(session.pk, None)
+    return session
+
+
+def _flush_at_exit():
+    """Flushes remaining buffered answers when the process shuts down"""
+    if _dirty:
+        flush_dirty_sessions()
+
+
+atexit.register(_flush_at_exit)
@@ -0,0 +1,137 @@
+from collections import Counter
+from functools import partial
+from django.contrib.auth.models import User
+from django.db import router, transaction
+from ..models import Quiz, Question, QuestionOption, QuizSession, QuizAnswer, QuestionStats, LeaderboardEntry
+from .payload_cache import invalidate_quiz_payloads
+from .question_stats import apply_option_deltas
+from .leaderboard import rebuild_quiz_leaderboard
+from .search import update_search_index
+
+
+class QuizDeletionService:
+    """Deletes quizzes and users bottom-up in bounded primary key chunks"""
+
+    def __init__(self, batch_size=1000, quiz_batch_size=50, progress=None):
+        self.batch_size = batch_size
+        self.quiz_batch_size = quiz_batch_size
+        self.progress = progress
+        self.totals = {}
+
+    def _add(self, label, count):
+        """Adds deleted rows to the totals and reports progress"""
+        if not count:
+            return
+        self.totals[label] = self.totals.get(label, 0) + count
+        if self.progress:
+            self.progress(self.totals)
+
+    def _delete_chunked(self, queryset):
+        """Deletes matching rows chunk by chunk without loading model instances"""
+        model = queryset.model
+        using = router.db_for_write(model)
+        while True:
+            pks = list(queryset.order_by().values_list('pk', flat=True)[:self.batch_size])
+            if not pks:
+                return
+            # Skips the deletion collector; callers delete children first and invalidate caches themselves
+            self._add(model._meta.label, model.objects.filter(pk__in=pks)._raw_delete(using))
+
+    def _delete_answers_with_stats(self, queryset):
+        """Deletes answers chunk by chunk and subtracts them from the answer statistics"""
+        using = router.db_for_write(QuizAnswer)
+        while True:
+            rows = list(queryset.order_by().values_list('pk', 'selected_option_id')[:self.batch_size])
+            if not rows:
+                return
+            deltas = Counter(option_id for _, option_id in rows)
+            self._add(QuizAnswer._meta.label, QuizAnswer.objects.filter(pk__in=[pk for pk, _ in rows])._raw_delete(using))
+            apply_option_deltas({option_id: -count for option_id, count in deltas.items()})
+
+    def _iter_pk_batches(self, queryset, size):
+        """Yields primary key batches of a queryset in ascending order"""
+        last_pk = 0
+        while True:
+            batch = list(queryset.filter(pk__gt=last_pk).order_by('pk').values_list('pk', flat=True)[:size])
+            if not batch:
+                return
+            yield batch
+            last_pk = batch[-1]
+
+    def _delete_quiz_batch(self, quiz_ids):
+        """Deletes a batch of quizzes with all their rows in one transaction"""
+        with transaction.atomic():
+            self._delete_chunked(QuizAnswer.objects.filter(session__quiz_id__in=quiz_ids))
+            self._delete_chunked(QuizAnswer.objects.filter(question__quiz_id__in=quiz_ids))
+            self._delete_chunked(LeaderboardEntry.objects.filter(quiz_id__in=quiz_ids))
+            self._delete_chunked(QuestionStats.objects.filter(quiz_id__in=quiz_ids))
+            self._delete_chunked(QuizSession.objects.filter(quiz_id__in=quiz_ids))
+            self._delete_chunked(QuestionOption.objects.filter(question__quiz_id__in=quiz_ids))
+            self._delete_chunked(Question.objects.filter(quiz_id__in=quiz_ids))
+            self._delete_chunked(Quiz.objects.filter(pk__in=quiz_ids))
+            for quiz_id in quiz_ids:
+                transaction.on_commit(partial(invalidate_quiz_payloads, quiz_id))
+            transaction.on_commit(partial(update_search_index, quiz_ids))
+
+    def delete_quizzes(self, queryset):
+        """Deletes the quizzes of a queryset batch by batch"""
+        for quiz_ids in self._iter_pk_batches(queryset, self.quiz_batch_size):
+            self._delete_quiz_batch(quiz_ids)
+        return self.totals
+
+    def delete_open_sessions(self, queryset):
+        """Deletes unfinished sessions batch by batch, each batch in its own short transaction"""
+        for session_ids in self._iter_pk_batches(queryset, self.batch_size):
+            with transaction.atomic():
+                # Re-applies the queryset filters so sessions completed meanwhile are kept
+                batch = queryset.filter(pk__in=session_ids, is_completed=False)
+                self._delete_answers_with_stats(QuizAnswer.objects.filter(session__in=batch))
+                self._delete_chunked(batch)
+        return self.totals
+
+    def _delete_user(self, user_id):
+        """Deletes a user after their quizzes, sessions and leaderboard entries"""
+        self.delete_quizzes(Quiz.objects.filter(created_by_id=user_id))
+        with transaction.atomic():
+            ranked_quiz_ids = set(
+                LeaderboardEntry.objects.filter(user_id=user_id).values_list('quiz_id', flat=True)
+            )
+            self._delete_answers_with_stats(QuizAnswer.objects.filter(session__user_id=user_id))
+            self._delete_chunked(LeaderboardEntry.objects.filter(user_id=user_id))
+            self._delete_chunked(QuizSession.objects.filter(user_id=user_id))
+            _, deleted = User.objects.filter(pk=user_id).delete()
+            for label, count in deleted.items():
+                self._add(label, count)
+            for quiz_id in ranked_quiz_ids:
+                rebuild_quiz_leaderboard(quiz_id)
+
+    def delete_users(self, queryset):
+        """Deletes the users of a queryset one by one with their data"""
+        for user_ids in self._iter_pk_batches(queryset, self.quiz_batch_size):
+            for user_id in user_ids:
+                self._delete_user(user_id)
+        return self.totals
+
+
+def count_quiz_rows(quiz_ids):
+    """Counts the rows a quiz deletion would remove per model"""
+    return {
+        Quiz: Quiz.objects.filter(pk__in=quiz_ids).count(),
+        Question: Question.objects.filter(quiz_id__in=quiz_ids).count(),
+        QuestionOption: QuestionOption.objects.filter(question__quiz_id__in=quiz_ids).count(),
+        QuizSession: QuizSession.objects.filter(quiz_id__in=quiz_ids).count(),
+        QuizAnswer: QuizAnswer.objects.filter(session__quiz_id__in=quiz_ids).count(),
+    }
+
+
+def count_user_rows(user_ids):
+    """Counts the rows a user deletion would remove per model"""
+    counts = count_quiz_rows(Quiz.objects.filter(created_by_id__in=user_ids).values('pk'))
+    counts[User] = User.objects.filter(pk__in=user_ids).count()
+    counts[QuizSession] += QuizSession.objects.filter(user_id__in=user_ids).exclude(
+        quiz__created_by_id__in=user_ids
+    ).count()
+    counts[QuizAnswer] += QuizAnswer.objects.filter(session__user_id__in=user_ids).exclude(
+        session__quiz__created_by_id__in=user_ids
+    ).count()
+    return counts
@@ -0,0 +1,81 @@
+from rest_framework import serializers
+from ..models import Quiz, Question, QuestionOption
+from .payload_cache import get_quiz_payload
+
+
+_datetime_field = serializers.DateTimeField()
+
+
+def format_datetime(value):
+    """Formats datetimes exactly like the DRF DateTimeField"""
+    return _datetime_field.to_representation(value)
+
+
+def _load_questions(quiz_id, include_answers):
+    """Loads questions and their options as plain dicts ordered by id"""
+    questions = [
+        {'id': question_id, 'question_title': question_title, 'question_options': []}
+        for question_id, question_title in (
+            Question.objects.filter(quiz_id=quiz_id).order_by('id').values_list('id', 'question_title')
+        )
+    ]
+    by_id = {question['id']: question for question in questions}
+    answers = {}
+
+    option_rows = (
+        QuestionOption.objects.filter(question__quiz_id=quiz_id)
+        .order_by('id')
+        .values_list('question_id', 'option_text', 'is_correct')
+    )
+    for question_id, option_text, is_correct in option_rows:
+        by_id[question_id]['question_options'].append(option_text)
+        if is_correct and question_id not in answers:
+            answers[question_id] = option_text
+
+    if include_answers:
+        for question in questions:
+            question['answer'] = answers.get(question['id'])
+    return questions
+
+
+def serialize_quiz_detail(quiz_id, user):
+    """Builds the QuizDetailSerializer payload from values() rows"""
+    quiz = (
+        Quiz.objects.filter(id=quiz_id, created_by=user)
+        .values('id', 'title', 'description', 'video_url', 'created_at')
+        .first()
+    )
+    if quiz is None:
+        return None
+    quiz['created_at'] = format_datetime(quiz['created_at'])
+    quiz['questions'] = _load_questions(quiz['id'], include_answers=True)
+    return quiz
+
+
+def serialize_play_questions(quiz_id):
+    """Builds the QuizPlayQuestionSerializer payloads of a quiz from values() rows"""
+    return _load_questions(quiz_id, include_answers=False)
+
+
+def get_play_questions(quiz_id, content_version):
+    """Gets cached play questions of a quiz, rebuilding them when the content version changed"""
+    return get_quiz_payload(
+        'play', quiz_id, lambda: serialize_play_questions(quiz_id), version=content_version
+    )
+
+
+def serialize_quiz_play(session, questions):
+    """Builds the quiz play payload of a session from its play questions"""
+    total_questions = len(questions)
+    index = session.current_question_index
+    current_question = questions[index] if 0 <= index < total_questions else None
+    progress_percentage = (index / total_questions) * 100 if total_questions else 0
+    return {
+        'id': session.pk,
+        'quiz': session.quiz_id,
+        'current_question': current_question,
+        'current_question_index': index,
+        'progress_percentage': progress_percentage,
+        'total_questions': total_questions,
+        'is_completed': session.is_completed,
+    }
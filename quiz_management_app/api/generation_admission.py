@@ -0,0 +1,206 @@
+import itertools
+import math
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from django.conf import settings
+from .generation_jobs import GenerationCancelled
+from .generation_pipeline import is_pipeline_enabled, get_pipeline_capacity
+
+
+class GenerationRejected(Exception):
+    """Raised when a quiz generation request is not admitted"""
+
+    def __init__(self, detail, retry_after, reason):
+        super().__init__(detail)
+        self.detail = detail
+        self.retry_after = retry_after
+        self.reason = reason
+
+
+class _Ticket:
+    """Waiting generation request with its fair queueing tag"""
+    __slots__ = ('user_id', 'start', 'finish', 'seq')
+
+    def __init__(self, user_id, start, finish, seq):
+        self.user_id = user_id
+        self.start = start
+        self.finish = finish
+        self.seq = seq
+
+
+class FairShareAdmission:
+    """Caps concurrent generations globally and per user and admits waiting requests in weighted fair order"""
+
+    def __init__(self, max_concurrent, max_per_user, max_queued, max_queued_per_user, queue_timeout):
+        self.max_concurrent = max_concurrent
+        self.max_per_user = max_per_user
+        self.max_queued = max_queued
+        self.max_queued_per_user = max_queued_per_user
+        self.queue_timeout = queue_timeout
+        self._condition = threading.Condition()
+        self._running = Counter()
+        self._queued = Counter()
+        self._queue = []
+        self._seq = itertools.count()
+        self._virtual_time = 0.0
+        self._user_finish = {}
+        self._average_seconds = None
+        self._stats = Counter()
+
+    def _has_slot(self, user_id):
+        """Checks whether a request of the user could run right now"""
+        return sum(self._running.values()) < self.max_concurrent and self._running[user_id] < self.max_per_user
+
+    def _next_ticket(self):
+        """Gets the waiting ticket with the smallest finish tag among users with a free slot"""
+        eligible = [ticket for ticket in self._queue if self._running[ticket.user_id] < self.max_per_user]
+        return min(eligible, key=lambda ticket: (ticket.finish, ticket.seq), default=None)
+
+    def _retry_after(self):
+        """Estimates the seconds until the queue has room again"""
+        average = self._average_seconds or 60
+        return max(math.ceil(average * (len(self._queue) + 1) / self.max_concurrent), 1)
+
+    def _reject(self, detail, reason):
+        """Counts and raises a rejection"""
+        self._stats[f'rejected_{reason}'] += 1
+        raise GenerationRejected(detail, self._retry_after(), reason)
+
+    def _start(self, user_id, start):
+        """Marks a request as running and advances the virtual clock"""
+        self._running[user_id] += 1
+        self._virtual_time = max(self._virtual_time, start)
+        self._stats['admitted'] += 1
+
+    def _wake(self):
+        """Wakes all waiting requests so they re-check their state"""
+        with self._condition:
+            self._condition.notify_all()
+
+    def acquire(self, user_id, weight=1, cancel_token=None):
+        """Blocks until the request may run or is cancelled and returns the seconds it waited"""
+        with self._condition:
+            start = max(self._virtual_time, self._user_finish.get(user_id, 0.0))
+            finish = start + 1 / weight
+            if not self._queue and self._has_slot(user_id):
+                self._user_finish[user_id] = finish
+                self._start(user_id, start)
+                return 0.0
+
+            if self._queued[user_id] >= self.max_queued_per_user:
+                self._reject("Zu viele Quiz-Generierungen in Bearbeitung.", 'user')
+            if len(self._queue) >= self.max_queued:
+                self._reject("Quiz-Generierung ist derzeit ausgelastet.", 'global')
+
+            ticket = _Ticket(user_id, start, finish, next(self._seq))
+            self._user_finish[user_id] = finish
+            self._queue.append(ticket)
+            self._queued[user_id] += 1
+            self._stats['queued'] += 1
+            waited_since = time.monotonic()
+            deadline = waited_since + self.queue_timeout
+            if cancel_token is not None:
+                cancel_token.add_callback(self._wake)
+            try:
+                while not (self._next_ticket() is ticket and self._has_slot(user_id)):
+                    if cancel_token is not None and cancel_token.is_cancelled():
+                        self._stats['cancelled'] += 1
+                        raise GenerationCancelled(cancel_token.reason)
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._reject("Zeitüberschreitung in der Warteschlange der Quiz-Generierung.", 'timeout')
+                    self._condition.wait(remaining)
+            finally:
+                if cancel_token is not None:
+                    cancel_token.remove_callback(self._wake)
+                self._queue.remove(ticket)
+                self._queued[user_id] -= 1
+                # Lets the next ticket re-check whether it is now at the head
+                self._condition.notify_all()
+            self._start(user_id, ticket.start)
+            return time.monotonic() - waited_since
+
+    def release(self, user_id, seconds):
+        """Frees the slot of a finished request and records its duration"""
+        with self._condition:
+            self._running[user_id] -= 1
+            if not self._running[user_id]:
+                del self._running[user_id]
+            if not self._queued[user_id]:
+                self._queued.pop(user_id, None)
+                if user_id not in self._running:
+                    # Idle users restart at the current virtual time instead of keeping old credit
+                    self._user_finish.pop(user_id, None)
+            average = self._average_seconds
+            self._average_seconds = seconds if average is None else average * 0.8 + seconds * 0.2
+            self._condition.notify_all()
+
+    def get_stats(self):
+        """Gets running and queued requests and admission counters"""
+        with self._condition:
+            stats = dict(self._stats)
+            stats.update({
+                'running': sum(self._running.values()),
+                'queued_now': len(self._queue),
+                'users_running': len(self._running),
+                'max_concurrent': self.max_concurrent,
+                'max_per_user': self.max_per_user,
+                'max_queued': self.max_queued,
+                'average_seconds': round(self._average_seconds, 2) if self._average_seconds else None,
+            })
+        return stats
+
+
+_admission = None
+_admission_lock = threading.Lock()
+
+
+def get_max_concurrent_generations():
+    """Gets the global cap of running generations, sized to the pipeline stages when it is enabled"""
+    if is_pipeline_enabled():
+        # Stage workers bound CPU and model memory; admission only needs to keep them fed
+        return getattr(settings, 'QUIZ_PIPELINE_MAX_IN_FLIGHT', 0) or get_pipeline_capacity()
+    return getattr(settings, 'QUIZ_GENERATION_MAX_CONCURRENT', 2)
+
+
+def get_generation_admission():
+    """Gets the admission controller of this process, creating it from the settings on first use"""
+    global _admission
+    with _admission_lock:
+        if _admission is None:
+            _admission = FairShareAdmission(
+                max_concurrent=get_max_concurrent_generations(),
+                max_per_user=getattr(settings, 'QUIZ_GENERATION_MAX_PER_USER', 1),
+                max_queued=getattr(settings, 'QUIZ_GENERATION_MAX_QUEUED', 20),
+                max_queued_per_user=getattr(settings, 'QUIZ_GENERATION_MAX_QUEUED_PER_USER', 2),
+                queue_timeout=getattr(settings, 'QUIZ_GENERATION_QUEUE_TIMEOUT', 60),
+            )
+        return _admission
+
+
+def reset_generation_admission():
+    """Drops the admission controller so it is rebuilt from the settings"""
+    global _admission
+    with _admission_lock:
+        _admission = None
+
+
+def get_generation_weight(user):
+    """Gets the fair share weight of a user"""
+    if user.is_staff:
+        return getattr(settings, 'QUIZ_GENERATION_STAFF_WEIGHT', 2)
+    return 1
+
+
+@contextmanager
+def admit_generation(user, cancel_token=None):
+    """Runs the block once the user's generation request is admitted"""
+    admission = get_generation_admission()
+    admission.acquire(user.pk, get_generation_weight(user), cancel_token)
+    start = time.monotonic()
+    try:
+        yield
+    finally:
+        admission.release(user.pk, time.monotonic() - start)
@@ -0,0 +1,155 @@
+import hashlib
+import threading
+from collections import Counter
+from django.conf import settings
+from django.core.cache import caches
+
+
+MAX_IDEMPOTENCY_KEY_LENGTH = 255
+
+_stats = Counter()
+_stats_lock = threading.Lock()
+
+
+def _count(counter):
+    """Increments a statistics counter"""
+    with _stats_lock:
+        _stats[counter] += 1
+
+
+class _Call:
+    """Outcome of one in-flight call shared by all callers of its key"""
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Runs one call per key at a time and hands its outcome to concurrent callers of the same key"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def run(self, key, func):
+        """Returns (result, shared), running func only if no call for the key is in flight"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+        if not leader:
+            _count('coalesced')
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = func()
+            return call.result, False
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def is_running(self, key):
+        """Checks whether a call for the key is in flight in this process"""
+        with self._lock:
+            return key in self._calls
+
+
+generation_flights = SingleFlight()
+
+
+class IdempotencyConflict(Exception):
+    """Raised when an Idempotency-Key cannot be used for this request"""
+
+    def __init__(self, detail, status_code, retry_after=None):
+        super().__init__(detail)
+        self.detail = detail
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+def _get_cache():
+    """Gets the cache backend holding idempotency records"""
+    return caches[getattr(settings, 'QUIZ_IDEMPOTENCY_CACHE_ALIAS', 'default')]
+
+
+def _get_timeout():
+    """Gets how long idempotent responses are kept in seconds"""
+    return getattr(settings, 'QUIZ_IDEMPOTENCY_TIMEOUT', 86400)
+
+
+def build_idempotency_cache_key(user_id, idempotency_key):
+    """Builds the cache key of a user's idempotency record"""
+    digest = hashlib.sha256(idempotency_key.encode()).hexdigest()
+    return f'quizly:idempotency:{user_id}:{digest}'
+
+
+def get_idempotency_key(request):
+    """Gets the Idempotency-Key header or None, rejecting oversized keys"""
+    idempotency_key = request.headers.get('Idempotency-Key', '').strip()
+    if not idempotency_key:
+        return None
+    if len(idempotency_key) > MAX_IDEMPOTENCY_KEY_LENGTH:
+        raise IdempotencyConflict("Idempotency-Key ist zu lang.", 400)
+    return idempotency_key
+
+
+def begin_idempotent_request(user_id, idempotency_key, fingerprint, flight_key):
+    """Reserves an idempotency key and returns the stored response of a finished request, if any"""
+    cache_key = build_idempotency_cache_key(user_id, idempotency_key)
+    pending = {'state': 'pending', 'fingerprint': fingerprint}
+    if _get_cache().add(cache_key, pending, _get_timeout()):
+        return None
+
+    record = _get_cache().get(cache_key)
+    if record is None:
+        # Expired between add and get; reserve again
+        _get_cache().set(cache_key, pending, _get_timeout())
+        return None
+    if record['fingerprint'] != fingerprint:
+        raise IdempotencyConflict("Idempotency-Key wurde bereits für eine andere Anfrage verwendet.", 422)
+    if record['state'] == 'done':
+        _count('replayed')
+        return record
+    if generation_flights.is_running(flight_key):
+        # Same request in flight in this process; the caller joins it
+        return None
+    record = _get_cache().get(cache_key)
+    if record is not None and record['state'] == 'done' and record['fingerprint'] == fingerprint:
+        # Completed between the first read and the flight check
+        _count('replayed')
+        return record
+    raise IdempotencyConflict("Anfrage mit diesem Idempotency-Key wird noch bearbeitet.", 409, retry_after=5)
+
+
+def complete_idempotent_request(user_id, idempotency_key, fingerprint, status_code, data):
+    """Stores the response of a finished request for replay"""
+    _get_cache().set(
+        build_idempotency_cache_key(user_id, idempotency_key),
+        {'state': 'done', 'fingerprint': fingerprint, 'status': status_code, 'data': data},
+        _get_timeout()
+    )
+
+
+def release_idempotent_request(user_id, idempotency_key):
+    """Frees a reserved key after a failed request so the client can retry it"""
+    cache_key = build_idempotency_cache_key(user_id, idempotency_key)
+    record = _get_cache().get(cache_key)
+    if record is not None and record['state'] == 'pending':
+        _get_cache().delete(cache_key)
+
+
+def get_dedup_stats():
+    """Gets coalesced and replayed request counters of this worker process"""
+    with _stats_lock:
+        return {'coalesced': _stats['coalesced'], 'replayed': _stats['replayed']}
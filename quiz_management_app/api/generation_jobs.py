@@ -0,0 +1,237 @@
+import logging
+import selectors
+import socket
+import threading
+import time
+import uuid
+from collections import Counter
+from django.conf import settings
+from core.scheduler import schedule_periodic
+
+logger = logging.getLogger(__name__)
+
+DISCONNECT_TASK_NAME = 'generation-disconnect-watch'
+
+
+class GenerationCancelled(Exception):
+    """Raised inside a generation stage once its job was cancelled"""
+
+    def __init__(self, reason='cancelled'):
+        super().__init__(f"Quiz generation cancelled ({reason})")
+        self.reason = reason
+
+
+class CancellationToken:
+    """Cancellation flag of one running generation job, checked by every stage"""
+
+    def __init__(self, user_id, url, key=None):
+        self.id = uuid.uuid4().hex
+        self.user_id = user_id
+        self.url = url
+        self.key = key
+        self.stage = 'queued'
+        self.started = time.time()
+        self.reason = None
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks = []
+
+    def cancel(self, reason='cancelled'):
+        """Marks the job as cancelled, keeping the first reason, and wakes everything waiting on it"""
+        with self._lock:
+            if self._event.is_set():
+                return
+            self.reason = reason
+            self._event.set()
+            callbacks = list(self._callbacks)
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception:
+                logger.exception("Cancellation callback of a generation job failed")
+
+    def add_callback(self, callback):
+        """Calls callback on cancellation, right away if the job is already cancelled"""
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return
+        callback()
+
+    def remove_callback(self, callback):
+        """Stops calling callback on cancellation"""
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+    def is_cancelled(self):
+        """Checks whether the job was cancelled"""
+        return self._event.is_set()
+
+    def raise_if_cancelled(self):
+        """Raises GenerationCancelled if the job was cancelled"""
+        if self._event.is_set():
+            raise GenerationCancelled(self.reason)
+
+    def enter_stage(self, stage):
+        """Records the stage the job starts, unless it was cancelled before"""
+        self.raise_if_cancelled()
+        self.stage = stage
+
+    def to_dict(self):
+        """Gets the public fields of the job"""
+        return {
+            'id': self.id,
+            'url': self.url,
+            'stage': self.stage,
+            'started_at': self.started,
+            'cancelled': self.is_cancelled(),
+        }
+
+
+def check_cancelled(token):
+    """Raises GenerationCancelled if a token is given and was cancelled"""
+    if token is not None:
+        token.raise_if_cancelled()
+
+
+_jobs = {}
+_waiters = {}
+_jobs_lock = threading.Lock()
+_stats = Counter()
+
+
+def register_generation_job(user_id, url, key=None):
+    """Registers a running generation and returns its cancellation token"""
+    token = CancellationToken(user_id, url, key)
+    with _jobs_lock:
+        _jobs[token.id] = token
+        _stats['started'] += 1
+    return token
+
+
+def add_generation_waiter(key, is_disconnected):
+    """Registers a request waiting for a generation; is_disconnected is None if the socket is unknown"""
+    waiter_id = uuid.uuid4().hex
+    with _jobs_lock:
+        _waiters.setdefault(key, {})[waiter_id] = is_disconnected
+    if is_disconnected is not None:
+        schedule_periodic(
+            DISCONNECT_TASK_NAME,
+            getattr(settings, 'QUIZ_GENERATION_DISCONNECT_POLL_INTERVAL', 1),
+            cancel_disconnected_jobs
+        )
+    return waiter_id
+
+
+def remove_generation_waiter(key, waiter_id):
+    """Removes a request that stopped waiting for the generation of a key"""
+    with _jobs_lock:
+        waiters = _waiters.get(key)
+        if waiters is not None:
+            waiters.pop(waiter_id, None)
+            if not waiters:
+                del _waiters[key]
+
+
+def unregister_generation_job(token):
+    """Removes a finished generation from the registry"""
+    with _jobs_lock:
+        _jobs.pop(token.id, None)
+        if token.is_cancelled():
+            _stats[f'cancelled_{token.reason}'] += 1
+
+
+def list_generation_jobs(user_id):
+    """Gets the running generations of a user"""
+    with _jobs_lock:
+        tokens = [token for token in _jobs.values() if token.user_id == user_id]
+    return [token.to_dict() for token in sorted(tokens, key=lambda token: token.started)]
+
+
+def cancel_generation_job(user_id, job_id, reason='user'):
+    """Cancels a running generation of the user and reports whether it was found"""
+    with _jobs_lock:
+        token = _jobs.get(job_id)
+    if token is None or token.user_id != user_id:
+        return False
+    token.cancel(reason)
+    return True
+
+
+def cancel_user_generation_jobs(user_id, reason='user'):
+    """Cancels all running generations of a user and returns how many were cancelled"""
+    with _jobs_lock:
+        tokens = [token for token in _jobs.values() if token.user_id == user_id]
+    for token in tokens:
+        token.cancel(reason)
+    return len(tokens)
+
+
+def _all_disconnected(checks):
+    """Checks whether every waiting client has gone away"""
+    for is_disconnected in checks:
+        try:
+            if not is_disconnected():
+                return False
+        except Exception:
+            logger.exception("Disconnect check of a generation job failed")
+            return False
+    return True
+
+
+def cancel_disconnected_jobs():
+    """Cancels running generations once every client waiting for them has closed its connection"""
+    with _jobs_lock:
+        candidates = [
+            (token, list(_waiters.get(token.key, {}).values()))
+            for token in _jobs.values() if not token.is_cancelled()
+        ]
+    for token, checks in candidates:
+        # A waiter without a check might still be connected, so its job is kept
+        if checks and None not in checks and _all_disconnected(checks):
+            token.cancel('disconnect')
+
+
+def get_job_stats():
+    """Gets running and cancelled generation counters of this worker process"""
+    with _jobs_lock:
+        stats = dict(_stats)
+        stats['running_jobs'] = len(_jobs)
+    return stats
+
+
+def _get_client_socket(request):
+    """Gets the client socket of a WSGI request or None if the server does not expose it"""
+    environ = request.META
+    sock = environ.get('gunicorn.socket')
+    if sock is not None:
+        return sock
+    # runserver: LimitedStream -> buffered reader of the connection -> SocketIO -> socket
+    reader = getattr(getattr(environ.get('wsgi.input'), '_read', None), '__self__', None)
+    sock = getattr(getattr(reader, 'raw', None), '_sock', None)
+    return sock if isinstance(sock, socket.socket) else None
+
+
+def get_disconnect_check(request):
+    """Gets a callable telling whether the client of a request has gone away, or None if unknown"""
+    sock = _get_client_socket(request)
+    if sock is None:
+        return None
+
+    def is_disconnected():
+        """Peeks at the socket; a readable socket without data has been closed by the client"""
+        try:
+            # selectors uses epoll/poll, which unlike select() has no limit on descriptor numbers
+            with selectors.DefaultSelector() as selector:
+                selector.register(sock, selectors.EVENT_READ)
+                if not selector.select(0):
+                    return False
+            return sock.recv(1, socket.MSG_PEEK | getattr(socket, 'MSG_DONTWAIT', 0)) == b''
+        except (BlockingIOError, InterruptedError, ValueError):
+            # Nothing to read, or the socket is already closed by the server: not a client disconnect
+            return False
+        except OSError:
+            return True
+
+    return is_disconnected
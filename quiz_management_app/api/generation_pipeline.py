@@ -0,0 +1,264 @@
+import logging
+import os
+import queue
+import threading
+from concurrent.futures import CancelledError, Future, InvalidStateError
+from django.conf import settings
+from .generation_jobs import GenerationCancelled
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+SUBMIT_POLL_INTERVAL = 0.1
+
+
+class PipelineStage:
+    """Named step of a staged pipeline with its own worker threads and bounded input queue"""
+
+    def __init__(self, name, func, workers, queue_size):
+        self.name = name
+        self.func = func
+        self.workers = workers
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.busy = 0
+        self.processed = 0
+
+
+class _Job:
+    """Work item travelling through the stages with the future of its caller"""
+    __slots__ = ('state', 'future', 'cleanup')
+
+    def __init__(self, state, cleanup):
+        self.state = state
+        self.future = Future()
+        self.cleanup = cleanup
+
+
+class StagedPipeline:
+    """Runs jobs through stages connected by bounded queues so different jobs overlap across stages"""
+
+    def __init__(self, stages, name='pipeline'):
+        self.name = name
+        self.stages = stages
+        self._lock = threading.Lock()
+        self._threads = []
+        for index, stage in enumerate(stages):
+            for worker in range(stage.workers):
+                thread = threading.Thread(
+                    target=self._work, args=(index,), name=f'quizly-{name}-{stage.name}-{worker}', daemon=True
+                )
+                thread.start()
+                self._threads.append(thread)
+
+    def submit(self, state, cleanup=None, is_cancelled=None):
+        """Queues a job at the first stage and returns a future for the state after the last stage"""
+        job = _Job(state, cleanup)
+        # Blocks while the first stage is full, pushing back on the caller unless it gives up
+        while True:
+            try:
+                self.stages[0].queue.put(job, timeout=SUBMIT_POLL_INTERVAL)
+                return job.future
+            except queue.Full:
+                if is_cancelled is not None and is_cancelled():
+                    job.future.cancel()
+                    self._run_cleanup(job)
+                    return job.future
+
+    @staticmethod
+    def abandon(future, error):
+        """Resolves a job future early so its caller stops waiting; the workers drop the job at its next check"""
+        if not future.cancel():
+            try:
+                future.set_exception(error)
+            except InvalidStateError:
+                pass
+
+    def _run_cleanup(self, job):
+        """Runs the cleanup callback of a job, logging its failures"""
+        try:
+            if job.cleanup:
+                job.cleanup(job.state)
+        except Exception:
+            logger.exception(f"Cleanup of {self.name} job failed")
+
+    def _finish(self, job, error=None):
+        """Runs the job cleanup and resolves its future unless the caller abandoned it"""
+        self._run_cleanup(job)
+        try:
+            if error is None:
+                job.future.set_result(job.state)
+            else:
+                job.future.set_exception(error)
+        except InvalidStateError:
+            pass
+
+    def _work(self, index):
+        """Takes jobs from one stage queue, runs the stage and hands them to the next stage"""
+        stage = self.stages[index]
+        while True:
+            job = stage.queue.get()
+            if job is _STOP:
+                return
+            if index == 0 and not job.future.set_running_or_notify_cancel():
+                # Cancelled while waiting for the first stage
+                self._run_cleanup(job)
+                continue
+            with self._lock:
+                stage.busy += 1
+            try:
+                job.state = stage.func(job.state)
+            except Exception as e:
+                self._finish(job, e)
+                continue
+            finally:
+                with self._lock:
+                    stage.busy -= 1
+                    stage.processed += 1
+            if index + 1 < len(self.stages):
+                self.stages[index + 1].queue.put(job)
+            else:
+                self._finish(job)
+
+    def shutdown(self):
+        """Stops all worker threads after the queued jobs"""
+        for stage in self.stages:
+            for _ in range(stage.workers):
+                stage.queue.put(_STOP)
+
+    def get_stats(self):
+        """Gets queue depth, busy workers and processed jobs per stage"""
+        with self._lock:
+            return {
+                stage.name: {
+                    'workers': stage.workers,
+                    'busy': stage.busy,
+                    'queued': stage.queue.qsize(),
+                    'queue_size': stage.queue.maxsize,
+                    'processed': stage.processed,
+                }
+                for stage in self.stages
+            }
+
+
+def get_asr_workers():
+    """Gets the ASR worker count, capped so their Whisper models fit the ASR memory budget"""
+    workers = getattr(settings, 'QUIZ_PIPELINE_ASR_WORKERS', None) or os.cpu_count() or 1
+    budget = getattr(settings, 'QUIZ_PIPELINE_ASR_MEMORY_MB', 0)
+    if budget:
+        # Every ASR worker thread loads its own model
+        workers = min(workers, budget // getattr(settings, 'QUIZ_WHISPER_MODEL_MEMORY_MB', 500))
+    return max(workers, 1)
+
+
+def get_pipeline_sizes():
+    """Gets (workers, queue size) per generation stage from the settings"""
+    return {
+        'download': (
+            getattr(settings, 'QUIZ_PIPELINE_DOWNLOAD_WORKERS', 4),
+            getattr(settings, 'QUIZ_PIPELINE_DOWNLOAD_QUEUE', 16),
+        ),
+        'asr': (
+            get_asr_workers(),
+            getattr(settings, 'QUIZ_PIPELINE_ASR_QUEUE', 4),
+        ),
+        'llm': (
+            getattr(settings, 'QUIZ_PIPELINE_LLM_WORKERS', 8),
+            getattr(settings, 'QUIZ_PIPELINE_LLM_QUEUE', 16),
+        ),
+    }
+
+
+def get_pipeline_capacity(sizes=None):
+    """Gets how many jobs the pipeline stages work on at once"""
+    sizes = sizes or get_pipeline_sizes()
+    return sum(workers for workers, _ in sizes.values())
+
+
+def build_pipeline(download, transcribe, generate, name='generation', sizes=None):
+    """Builds the download, ASR and LLM stages around the given stage functions"""
+    sizes = sizes or get_pipeline_sizes()
+    return StagedPipeline([
+        PipelineStage('download', download, *sizes['download']),
+        PipelineStage('asr', transcribe, *sizes['asr']),
+        PipelineStage('llm', generate, *sizes['llm']),
+    ], name=name)
+
+
+_pipeline = None
+_pipeline_lock = threading.Lock()
+_services = threading.local()
+
+
+def is_pipeline_enabled():
+    """Checks whether quiz generation runs on the staged pipeline"""
+    return getattr(settings, 'QUIZ_PIPELINE_ENABLED', False)
+
+
+def _get_stage_service():
+    """Gets the generation service of the current worker thread"""
+    from .services import QuizGenerationService
+
+    # One service per worker thread, so each ASR thread keeps its own Whisper model
+    if getattr(_services, 'service', None) is None:
+        _services.service = QuizGenerationService()
+    return _services.service
+
+
+def _split_asr_threads(asr_workers):
+    """Splits the cores between the ASR workers so their torch thread pools do not oversubscribe the CPU"""
+    import torch
+
+    torch.set_num_threads(max((os.cpu_count() or 1) // asr_workers, 1))
+
+
+def get_generation_pipeline():
+    """Gets the generation pipeline of this process, starting its workers on first use"""
+    global _pipeline
+    with _pipeline_lock:
+        if _pipeline is None:
+            _split_asr_threads(get_asr_workers())
+            _pipeline = build_pipeline(
+                download=lambda job: _get_stage_service().download_stage(job),
+                transcribe=lambda job: _get_stage_service().transcribe_stage(job),
+                generate=lambda job: _get_stage_service().generate_stage(job),
+            )
+        return _pipeline
+
+
+def reset_generation_pipeline():
+    """Stops the pipeline workers so the pipeline is rebuilt from the settings"""
+    global _pipeline
+    with _pipeline_lock:
+        if _pipeline is not None:
+            _pipeline.shutdown()
+        _pipeline = None
+
+
+def generate_quiz_staged(youtube_url, cancel_token=None):
+    """Generates quiz data on the staged pipeline and waits for the result or the cancellation"""
+    pipeline = get_generation_pipeline()
+    future = pipeline.submit(
+        {'url': youtube_url, 'cancel_token': cancel_token},
+        cleanup=lambda job: _get_stage_service().cleanup_job(job),
+        is_cancelled=cancel_token.is_cancelled if cancel_token is not None else None
+    )
+    if cancel_token is not None:
+        abandon = lambda: pipeline.abandon(future, GenerationCancelled(cancel_token.reason))
+        cancel_token.add_callback(abandon)
+    try:
+        return future.result()['quiz_data']
+    except CancelledError:
+        raise GenerationCancelled(cancel_token.reason if cancel_token is not None else 'cancelled')
+    except GenerationCancelled:
+        raise
+    except Exception as e:
+        raise Exception(f"Error in generate_quiz_from_youtube: {str(e)}")
+    finally:
+        if cancel_token is not None:
+            cancel_token.remove_callback(abandon)
+
+
+def get_pipeline_stats():
+    """Gets per-stage statistics or None while the pipeline has not started"""
+    return _pipeline.get_stats() if _pipeline is not None else None
@@ -0,0 +1,118 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models import DurationField, ExpressionWrapper, F
+from ..models import Quiz, QuizSession, LeaderboardEntry
+
+
+RANK_ORDER = ('-percentage', 'duration', 'completed_at', 'id')
+
+
+def get_leaderboard_size():
+    """Gets the maximum number of entries kept per quiz"""
+    return getattr(settings, 'QUIZ_LEADERBOARD_SIZE', 100)
+
+
+def _rank_key(percentage, duration, completed_at):
+    """Builds a sort key where smaller values rank higher"""
+    return (-percentage, duration, completed_at)
+
+
+def _trim_leaderboard(quiz_id, size):
+    """Removes entries ranked below the leaderboard size"""
+    overflow = list(
+        LeaderboardEntry.objects.filter(quiz_id=quiz_id)
+        .order_by(*RANK_ORDER)
+        .values_list('id', flat=True)[size:]
+    )
+    if overflow:
+        LeaderboardEntry.objects.filter(id__in=overflow).delete()
+
+
+def record_completed_session(session):
+    """Inserts a completed session into its quiz leaderboard if it ranks within the top entries"""
+    if not session.is_completed or session.percentage is None or session.completed_at is None:
+        return None
+
+    size = get_leaderboard_size()
+    duration = session.completed_at - session.started_at
+    entries = LeaderboardEntry.objects.filter(quiz_id=session.quiz_id)
+
+    with transaction.atomic():
+        last_ranked = entries.order_by(*RANK_ORDER).values('percentage', 'duration', 'completed_at')[size - 1:size]
+        last_ranked = next(iter(last_ranked), None)
+        if last_ranked is not None:
+            candidate = _rank_key(session.percentage, duration, session.completed_at)
+            if candidate >= _rank_key(**last_ranked):
+                return None
+
+        entry, _ = LeaderboardEntry.objects.update_or_create(
+            session=session,
+            defaults={
+                'quiz_id': session.quiz_id,
+                'user_id': session.user_id,
+                'percentage': session.percentage,
+                'duration': duration,
+                'completed_at': session.completed_at,
+            }
+        )
+        if last_ranked is not None:
+            _trim_leaderboard(session.quiz_id, size)
+    return entry
+
+
+def _ranked_sessions(quiz_id):
+    """Returns completed sessions of a quiz in leaderboard order"""
+    return (
+        QuizSession.objects.filter(
+            quiz_id=quiz_id, is_completed=True, percentage__isnull=False, completed_at__isnull=False
+        )
+        .annotate(duration=ExpressionWrapper(F('completed_at') - F('started_at'), output_field=DurationField()))
+        .order_by(*RANK_ORDER)
+    )
+
+
+def rebuild_quiz_leaderboard(quiz_id, size=None):
+    """Recomputes the leaderboard of one quiz from its completed sessions"""
+    size = size or get_leaderboard_size()
+    rows = [
+        LeaderboardEntry(
+            quiz_id=quiz_id,
+            session_id=session.pk,
+            user_id=session.user_id,
+            percentage=session.percentage,
+            duration=session.duration,
+            completed_at=session.completed_at,
+        )
+        for session in _ranked_sessions(quiz_id).only(
+            'id', 'user_id', 'percentage', 'started_at', 'completed_at'
+        )[:size]
+    ]
+    with transaction.atomic():
+        LeaderboardEntry.objects.filter(quiz_id=quiz_id).delete()
+        LeaderboardEntry.objects.bulk_create(rows)
+    return len(rows)
+
+
+def rebuild_leaderboards(quiz_ids=None, size=None, batch_size=500, progress=None):
+    """Rebuilds leaderboards of all or selected quizzes"""
+    queryset = Quiz.objects.order_by('pk')
+    if quiz_ids is not None:
+        queryset = queryset.filter(pk__in=quiz_ids)
+
+    last_pk = 0
+    totals = {'quizzes': 0, 'entries': 0}
+    while True:
+        batch = list(queryset.filter(pk__gt=last_pk).values_list('pk', flat=True)[:batch_size])
+        if not batch:
+            return totals
+        for quiz_id in batch:
+            totals['entries'] += rebuild_quiz_leaderboard(quiz_id, size)
+        totals['quizzes'] += len(batch)
+        last_pk = batch[-1]
+        if progress:
+            progress(totals)
+
+
+def get_naive_leaderboard(quiz_id, limit):
+    """Ranks all completed sessions on every call, kept for benchmarks"""
+    return list(_ranked_sessions(quiz_id).values('id', 'user_id', 'percentage', 'duration')[:limit])
@@ -0,0 +1,119 @@
+import base64
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, LimitOffsetPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param, remove_query_param
+
+
+class KeysetPagination(BasePagination):
+    """Cursor pagination on a (timestamp, id) pair, newest first"""
+    ordering_field = 'created_at'
+    page_size = 20
+    max_page_size = 100
+    page_size_query_param = 'page_size'
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Ungültiger Cursor.'
+
+    def get_page_size(self, request):
+        """Gets page size from query params within allowed bounds"""
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def encode_cursor(self, obj):
+        """Encodes the keyset position of an object"""
+        value = getattr(obj, self.ordering_field)
+        raw = f'{value.isoformat()}|{obj.pk}'
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+
+    def decode_cursor(self, request):
+        """Decodes the cursor from query params"""
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            raw = base64.urlsafe_b64decode(encoded.encode()).decode()
+            value, pk = raw.rsplit('|', 1)
+            timestamp = parse_datetime(value)
+            if timestamp is None:
+                raise ValueError(value)
+            return timestamp, int(pk)
+        except (TypeError, ValueError, UnicodeDecodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def filter_after_cursor(self, queryset, cursor):
+        """Restricts queryset to rows after the cursor position"""
+        value, pk = cursor
+        field = self.ordering_field
+        return queryset.filter(
+            Q(**{f'{field}__lte': value}),
+            Q(**{f'{field}__lt': value}) | Q(pk__lt=pk),
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """Returns one page of rows after the cursor"""
+        self.request = request
+        page_size = self.get_page_size(request)
+        cursor = self.decode_cursor(request)
+        if cursor:
+            queryset = self.filter_after_cursor(queryset, cursor)
+        queryset = queryset.order_by(f'-{self.ordering_field}', '-pk')
+
+        rows = list(queryset[:page_size + 1])
+        self.has_next = len(rows) > page_size
+        self.page = rows[:page_size]
+        return self.page
+
+    def get_next_link(self):
+        """Builds link to the next page"""
+        if not self.has_next or not self.page:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.page[-1]))
+
+    def get_first_link(self):
+        """Builds link to the first page"""
+        url = self.request.build_absolute_uri()
+        return remove_query_param(url, self.cursor_query_param)
+
+    def get_paginated_response(self, data):
+        """Wraps page data with navigation links"""
+        return Response({
+            'next': self.get_next_link(),
+            'first': self.get_first_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        """Describes the paginated response"""
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'first': {'type': 'string', 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+
+class QuizCursorPagination(KeysetPagination):
+    """Keyset pagination for quiz lists"""
+    ordering_field = 'created_at'
+
+
+class SessionCursorPagination(KeysetPagination):
+    """Keyset pagination for quiz session history"""
+    ordering_field = 'started_at'
+
+
+class LeaderboardPagination(LimitOffsetPagination):
+    """Limit/offset pagination for bounded leaderboards"""
+    default_limit = 20
+    max_limit = 100
@@ -0,0 +1,69 @@
+import threading
+from django.conf import settings
+from django.core.cache import caches
+
+
+PAYLOAD_KINDS = ('detail', 'play')
+
+_stats = {'hits': 0, 'misses': 0, 'invalidations': 0}
+_stats_lock = threading.Lock()
+
+
+def _get_cache():
+    """Gets the cache backend used for quiz payloads"""
+    return caches[getattr(settings, 'QUIZ_PAYLOAD_CACHE_ALIAS', 'default')]
+
+
+def _get_timeout():
+    """Gets the lifetime of cached payloads in seconds"""
+    return getattr(settings, 'QUIZ_PAYLOAD_CACHE_TIMEOUT', 3600)
+
+
+def _record(counter, amount=1):
+    """Increments a cache statistic"""
+    with _stats_lock:
+        _stats[counter] += amount
+
+
+def build_payload_key(kind, quiz_id):
+    """Builds the cache key of a quiz payload"""
+    return f'quizly:quiz:{quiz_id}:{kind}'
+
+
+def get_quiz_payload(kind, quiz_id, builder, version=None):
+    """Returns a cached quiz payload or builds and stores it on a miss"""
+    cache = _get_cache()
+    key = build_payload_key(kind, quiz_id)
+    entry = cache.get(key)
+    if entry is not None and (version is None or entry['version'] == version):
+        _record('hits')
+        return entry['payload']
+
+    _record('misses')
+    payload = builder()
+    if payload is not None:
+        cache.set(key, {'version': version, 'payload': payload}, _get_timeout())
+    return payload
+
+
+def invalidate_quiz_payloads(quiz_id):
+    """Removes all cached payloads of a quiz"""
+    _get_cache().delete_many([build_payload_key(kind, quiz_id) for kind in PAYLOAD_KINDS])
+    _record('invalidations')
+
+
+def get_cache_stats():
+    """Returns hit and miss statistics of this process"""
+    with _stats_lock:
+        stats = dict(_stats)
+    lookups = stats['hits'] + stats['misses']
+    stats['hit_rate'] = round(stats['hits'] / lookups, 4) if lookups else None
+    stats['backend'] = _get_cache().__class__.__name__
+    return stats
+
+
+def reset_cache_stats():
+    """Resets statistics of this process"""
+    with _stats_lock:
+        for counter in _stats:
+            _stats[counter] = 0
@@ -0,0 +1,136 @@
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Value
+from django.db.models.functions import Coalesce
+from ..models import Quiz, QuestionOption, QuizAnswer, QuestionStats
+
+
+def _create_stats_row(option_id, delta):
+    """Creates the stats row of an option seeded from its stored answers, which already include the change"""
+    option = (
+        QuestionOption.objects.filter(pk=option_id)
+        .values('question_id', 'question__quiz_id')
+        .first()
+    )
+    if option is None:
+        return
+    try:
+        with transaction.atomic():
+            QuestionStats.objects.create(
+                quiz_id=option['question__quiz_id'],
+                question_id=option['question_id'],
+                option_id=option_id,
+                answer_count=QuizAnswer.objects.filter(selected_option_id=option_id).count()
+            )
+    except IntegrityError:
+        QuestionStats.objects.filter(option_id=option_id).update(answer_count=F('answer_count') + delta)
+
+
+def apply_option_deltas(deltas):
+    """Adds answer count deltas per option id to the materialised stats"""
+    for option_id, delta in deltas.items():
+        if not delta:
+            continue
+        updated = QuestionStats.objects.filter(option_id=option_id).update(
+            answer_count=F('answer_count') + delta
+        )
+        if not updated:
+            _create_stats_row(option_id, delta)
+
+
+def record_answer_change(previous_option_id, selected_option_id):
+    """Updates stats after an answer was created or changed"""
+    if previous_option_id == selected_option_id:
+        return
+    deltas = {selected_option_id: 1}
+    if previous_option_id is not None:
+        deltas[previous_option_id] = -1
+    apply_option_deltas(deltas)
+
+
+def _rebuild_quiz_batch(quiz_ids):
+    """Recomputes stats rows of a batch of quizzes in one transaction"""
+    counts = dict(
+        QuizAnswer.objects.filter(question__quiz_id__in=quiz_ids)
+        .order_by()
+        .values_list('selected_option')
+        .annotate(total=Count('id'))
+    )
+    options = (
+        QuestionOption.objects.filter(question__quiz_id__in=quiz_ids)
+        .values_list('id', 'question_id', 'question__quiz_id')
+    )
+    rows = [
+        QuestionStats(
+            quiz_id=quiz_id,
+            question_id=question_id,
+            option_id=option_id,
+            answer_count=counts.get(option_id, 0)
+        )
+        for option_id, question_id, quiz_id in options
+    ]
+    with transaction.atomic():
+        QuestionStats.objects.filter(quiz_id__in=quiz_ids).delete()
+        QuestionStats.objects.bulk_create(rows)
+    return len(rows)
+
+
+def rebuild_question_stats(batch_size=100, quiz_ids=None, progress=None):
+    """Rebuilds materialised stats quiz batch by quiz batch"""
+    queryset = Quiz.objects.order_by('pk')
+    if quiz_ids is not None:
+        queryset = queryset.filter(pk__in=quiz_ids)
+
+    last_pk = 0
+    totals = {'quizzes': 0, 'rows': 0}
+    while True:
+        batch = list(queryset.filter(pk__gt=last_pk).values_list('pk', flat=True)[:batch_size])
+        if not batch:
+            return totals
+        totals['rows'] += _rebuild_quiz_batch(batch)
+        totals['quizzes'] += len(batch)
+        last_pk = batch[-1]
+        if progress:
+            progress(totals)
+
+
+def get_quiz_analytics(quiz_id):
+    """Builds the answer distribution of a quiz from its materialised stats"""
+    rows = (
+        QuestionOption.objects.filter(question__quiz_id=quiz_id)
+        .order_by('question_id', 'id')
+        .values(
+            'id', 'option_text', 'is_correct', 'question_id', 'question__question_title',
+            answer_count=Coalesce(F('stats__answer_count'), Value(0))
+        )
+    )
+    questions = {}
+    for row in rows:
+        question = questions.setdefault(row['question_id'], {
+            'id': row['question_id'],
+            'question_title': row['question__question_title'],
+            'total_answers': 0,
+            'correct_answers': 0,
+            'correct_rate': None,
+            'options': [],
+        })
+        question['total_answers'] += row['answer_count']
+        if row['is_correct']:
+            question['correct_answers'] += row['answer_count']
+        question['options'].append({
+            'id': row['id'],
+            'option_text': row['option_text'],
+            'is_correct': row['is_correct'],
+            'answer_count': row['answer_count'],
+        })
+
+    for question in questions.values():
+        total = question['total_answers']
+        question['correct_rate'] = round(question['correct_answers'] / total, 3) if total else None
+        for option in question['options']:
+            option['share'] = round(option['answer_count'] / total, 3) if total else None
+
+    return {
+        'quiz_id': int(quiz_id),
+        'total_answers': sum(question['total_answers'] for question in questions.values()),
+        'questions': list(questions.values()),
+    }
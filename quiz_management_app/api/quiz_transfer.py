@@ -0,0 +1,129 @@
+import json
+from functools import partial
+from django.db import transaction
+from django.db.models import Prefetch
+from ..models import Quiz, Question, QuestionOption
+from .fast_serializers import format_datetime
+from .renderers import FastJSONRenderer
+from .serializers import QuizImportSerializer
+from .search import update_search_index
+
+
+EXPORT_CHUNK_SIZE = 200
+IMPORT_BATCH_SIZE = 200
+MAX_REPORTED_ERRORS = 100
+
+_renderer = FastJSONRenderer()
+
+
+def _export_queryset(user):
+    """Returns the user's quizzes with questions and options prefetched in id order"""
+    options = QuestionOption.objects.order_by('id')
+    questions = Question.objects.order_by('id').prefetch_related(Prefetch('question_options', queryset=options))
+    return (
+        Quiz.objects.filter(created_by=user)
+        .order_by('id')
+        .prefetch_related(Prefetch('questions', queryset=questions))
+    )
+
+
+def serialize_export_quiz(quiz):
+    """Builds the export line of a quiz in the quiz detail format"""
+    questions = []
+    for question in quiz.questions.all():
+        options = list(question.question_options.all())
+        answer = next((option.option_text for option in options if option.is_correct), None)
+        questions.append({
+            'id': question.id,
+            'question_title': question.question_title,
+            'question_options': [option.option_text for option in options],
+            'answer': answer,
+        })
+    return {
+        'id': quiz.id,
+        'title': quiz.title,
+        'description': quiz.description,
+        'video_url': quiz.video_url,
+        'created_at': format_datetime(quiz.created_at),
+        'questions': questions,
+    }
+
+
+def iter_quiz_export(user, chunk_size=EXPORT_CHUNK_SIZE):
+    """Yields one encoded NDJSON line per quiz, loading quizzes chunk by chunk"""
+    for quiz in _export_queryset(user).iterator(chunk_size=chunk_size):
+        yield _renderer.render(serialize_export_quiz(quiz)) + b'\n'
+
+
+def iter_ndjson_lines(lines):
+    """Yields (line number, decoded object, error) for each non-empty NDJSON line"""
+    for line_number, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield line_number, json.loads(line), None
+        except (ValueError, UnicodeDecodeError):
+            yield line_number, None, "Ungültiges JSON."
+
+
+def _persist_batch(user, batch):
+    """Creates quizzes, questions and options of a validated batch in one transaction"""
+    with transaction.atomic():
+        quizzes = Quiz.objects.bulk_create([
+            Quiz(
+                title=data['title'],
+                description=data['description'],
+                video_url=data['video_url'],
+                created_by=user
+            )
+            for data in batch
+        ])
+        question_rows = [
+            (Question(quiz=quiz, question_title=question_data['question_title']), question_data)
+            for quiz, data in zip(quizzes, batch)
+            for question_data in data['questions']
+        ]
+        Question.objects.bulk_create([question for question, _ in question_rows])
+        QuestionOption.objects.bulk_create([
+            QuestionOption(
+                question=question,
+                option_text=option_text,
+                is_correct=option_text == question_data['answer']
+            )
+            for question, question_data in question_rows
+            for option_text in question_data['question_options']
+        ])
+        transaction.on_commit(partial(update_search_index, [quiz.pk for quiz in quizzes]))
+    return len(quizzes)
+
+
+def import_quizzes(user, lines, batch_size=IMPORT_BATCH_SIZE):
+    """Validates NDJSON quiz lines and persists them in batches, collecting per-line errors"""
+    report = {'imported': 0, 'failed': 0, 'errors': []}
+    batch = []
+
+    def record_error(line_number, errors):
+        report['failed'] += 1
+        if len(report['errors']) < MAX_REPORTED_ERRORS:
+            report['errors'].append({'line': line_number, 'errors': errors})
+
+    for line_number, data, error in iter_ndjson_lines(lines):
+        if error:
+            record_error(line_number, {'non_field_errors': [error]})
+            continue
+        if not isinstance(data, dict):
+            record_error(line_number, {'non_field_errors': ["Zeile muss ein JSON-Objekt sein."]})
+            continue
+        serializer = QuizImportSerializer(data=data)
+        if not serializer.is_valid():
+            record_error(line_number, serializer.errors)
+            continue
+        batch.append(serializer.validated_data)
+        if len(batch) >= batch_size:
+            report['imported'] += _persist_batch(user, batch)
+            batch = []
+
+    if batch:
+        report['imported'] += _persist_batch(user, batch)
+    return report
@@ -1,7 +1,19 @@
+import re
+from urllib.parse import parse_qs, urlparse
 from rest_framework import status
 from rest_framework.response import Response
 from django.contrib.auth.models import User
+from datetime import timedelta
+from django.db.models import (
+    Avg, Count, DurationField, ExpressionWrapper, F, FloatField, IntegerField, Max, OuterRef, Q, Subquery
+)
+from django.db import transaction
+from django.utils import timezone
+from django.db.models.functions import Coalesce
+from django.utils.http import http_date, quote_etag
 from ..models import Quiz, Question, QuestionOption, QuizSession, QuizAnswer
+from .question_stats import record_answer_change
+from .leaderboard import record_completed_session
 
 
 def validate_youtube_url(url):
@@ -9,6 +21,27 @@ def validate_youtube_url(url):
     return 'youtube.com' in url or 'youtu.be' in url
 
 
+YOUTUBE_VIDEO_ID_PATTERN = re.compile(r'^[A-Za-z0-9_-]{11}$')
+
+
+def extract_youtube_video_id(url):
+    """Extracts the canonical video id from the common YouTube URL forms"""
+    parsed = urlparse(url.strip())
+    host = (parsed.hostname or '').lower().removeprefix('www.').removeprefix('m.')
+    candidate = None
+    if host == 'youtu.be':
+        candidate = parsed.path.lstrip('/').split('/')[0]
+    elif host.endswith('youtube.com'):
+        segments = [segment for segment in parsed.path.split('/') if segment]
+        if segments[:1] == ['watch']:
+            candidate = parse_qs(parsed.query).get('v', [None])[0]
+        elif len(segments) >= 2 and segments[0] in ('shorts', 'embed', 'live', 'v'):
+            candidate = segments[1]
+    if candidate and YOUTUBE_VIDEO_ID_PATTERN.match(candidate):
+        return candidate
+    return None
+
+
 def get_youtube_url_from_data(request_data):
     """Extracts YouTube URL from request data"""
     return request_data.get('youtube_url') or request_data.get('url')
@@ -27,6 +60,100 @@ def get_authenticated_user(request):
     return request.user
 
 
+QUIZ_LIST_FIELDS = ['id', 'title', 'description', 'video_url', 'created_at', 'question_count', 'attempt_count', 'best_score']
+QUIZ_LIST_MODEL_FIELDS = ['id', 'title', 'description', 'video_url', 'created_at']
+
+
+def parse_requested_fields(query_params, allowed_fields):
+    """Parses the comma separated 'fields' query parameter"""
+    raw_fields = query_params.get('fields')
+    if not raw_fields:
+        return list(allowed_fields)
+    requested = [name.strip() for name in raw_fields.split(',')]
+    selected = [name for name in allowed_fields if name in requested]
+    return selected or list(allowed_fields)
+
+
+def _count_subquery(queryset):
+    """Wraps a per-quiz count as correlated subquery"""
+    counted = queryset.order_by().values('quiz').annotate(total=Count('id')).values('total')
+    return Coalesce(Subquery(counted, output_field=IntegerField()), 0)
+
+
+def _best_score_subquery():
+    """Builds subquery for the best snapshot percentage of completed sessions"""
+    best = (
+        QuizSession.objects.filter(quiz=OuterRef('pk'), is_completed=True)
+        .order_by()
+        .values('quiz')
+        .annotate(best=Max('percentage'))
+        .values('best')
+    )
+    return Subquery(best, output_field=FloatField())
+
+
+def annotate_quiz_list(queryset, fields):
+    """Adds requested statistics to a quiz queryset in a single query"""
+    model_fields = [name for name in QUIZ_LIST_MODEL_FIELDS if name in fields]
+    queryset = queryset.only(*set(model_fields) | {'id', 'created_at'})
+
+    annotations = {}
+    if 'question_count' in fields:
+        annotations['question_count'] = _count_subquery(Question.objects.filter(quiz=OuterRef('pk')))
+    if 'attempt_count' in fields:
+        annotations['attempt_count'] = _count_subquery(QuizSession.objects.filter(quiz=OuterRef('pk')))
+    if 'best_score' in fields:
+        annotations['best_score'] = _best_score_subquery()
+    return queryset.annotate(**annotations)
+
+
+def annotate_session_history(queryset):
+    """Adds quiz title and duration to a session queryset"""
+    return queryset.annotate(
+        quiz_title=F('quiz__title'),
+        duration=ExpressionWrapper(F('completed_at') - F('started_at'), output_field=DurationField())
+    )
+
+
+def calculate_streaks(days, today):
+    """Calculates current and longest streak of consecutive days from days sorted descending"""
+    longest = 0
+    run = 0
+    previous = None
+    for day in days:
+        run = run + 1 if previous is not None and previous - day == timedelta(days=1) else 1
+        longest = max(longest, run)
+        previous = day
+
+    current = 0
+    if days and today - days[0] <= timedelta(days=1):
+        current = 1
+        for newer, older in zip(days, days[1:]):
+            if newer - older != timedelta(days=1):
+                break
+            current += 1
+    return current, longest
+
+
+def get_session_summary(user):
+    """Aggregates attempt statistics of a user"""
+    sessions = QuizSession.objects.filter(user=user)
+    completed = Q(is_completed=True)
+    summary = sessions.aggregate(
+        attempts=Count('id'),
+        completed_attempts=Count('id', filter=completed),
+        average_score=Avg('percentage', filter=completed),
+        best_score=Max('percentage', filter=completed),
+        quizzes_played=Count('quiz', distinct=True),
+    )
+    if summary['average_score'] is not None:
+        summary['average_score'] = round(summary['average_score'], 1)
+
+    days = list(sessions.filter(completed).dates('completed_at', 'day', order='DESC'))
+    summary['current_streak'], summary['longest_streak'] = calculate_streaks(days, timezone.now().date())
+    return summary
+
+
 def get_quiz_by_id(quiz_id, user):
     """Gets quiz by ID for authenticated user"""
     try:
@@ -35,6 +162,36 @@ def get_quiz_by_id(quiz_id, user):
         return None
 
 
+QUIZ_DETAIL_SCHEMA_VERSION = 1
+
+
+def get_quiz_validators(quiz_id, user):
+    """Gets ETag and Last-Modified of a quiz with a single indexed lookup"""
+    try:
+        row = (
+            Quiz.objects.filter(id=quiz_id, created_by=user)
+            .values_list('updated_at', 'content_version')
+            .first()
+        )
+    except (TypeError, ValueError):
+        return None
+    if row is None:
+        return None
+    updated_at, content_version = row
+    etag = quote_etag(
+        f'{quiz_id}-{content_version}-{int(updated_at.timestamp() * 1000000)}-s{QUIZ_DETAIL_SCHEMA_VERSION}'
+    )
+    return etag, updated_at
+
+
+def set_quiz_validator_headers(response, etag, last_modified):
+    """Sets caching validator headers on a response"""
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified.timestamp())
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
+
 def get_question_by_id(question_id):
     """Gets question by ID"""
     try:
@@ -63,9 +220,11 @@ def get_or_create_quiz_session(quiz, user):
 
 
 def get_quiz_session_by_id(session_id, user):
-    """Gets quiz session by ID for authenticated user"""
+    """Gets quiz session by ID for authenticated user with the content version of its quiz"""
     try:
-        return QuizSession.objects.get(id=session_id, user=user)
+        return QuizSession.objects.annotate(
+            quiz_content_version=F('quiz__content_version')
+        ).get(id=session_id, user=user)
     except QuizSession.DoesNotExist:
         return None
 
@@ -83,22 +242,63 @@ def get_completed_quiz_session(session_id, user):
 
 
 def save_quiz_answer(session, question, selected_option):
-    """Saves or updates quiz answer"""
-    answer, created = QuizAnswer.objects.get_or_create(
-        session=session,
-        question=question,
-        defaults={'selected_option': selected_option}
-    )
-    if not created:
-        answer.selected_option = selected_option
-        answer.save()
+    """Saves or updates quiz answer and its option statistics in one transaction"""
+    with transaction.atomic():
+        answer, created = QuizAnswer.objects.get_or_create(
+            session=session,
+            question=question,
+            defaults={'selected_option': selected_option}
+        )
+        previous_option_id = None if created else answer.selected_option_id
+        if not created:
+            answer.selected_option = selected_option
+            answer.save()
+        record_answer_change(previous_option_id, selected_option.pk)
     return answer
 
 
-def move_to_next_question(session):
-    """Moves to next question or completes quiz"""
-    from django.utils import timezone
+def calculate_percentage(correct_answers, total_questions):
+    """Calculates percentage score rounded to one decimal"""
+    if total_questions == 0:
+        return 0
+    return round((correct_answers / total_questions) * 100, 1)
+
+
+def store_score_snapshot(session, total_questions):
+    """Computes score and per-answer correctness with one query and stores it on the session"""
+    from .fast_serializers import format_datetime
     
+    rows = (
+        session.answers.order_by('id')
+        .values('id', 'question_id', 'selected_option_id', 'answered_at', correct=F('selected_option__is_correct'))
+    )
+    answers = [
+        {
+            'id': row['id'],
+            'question': row['question_id'],
+            'selected_option': row['selected_option_id'],
+            'answered_at': format_datetime(row['answered_at']),
+            'is_correct': row['correct'],
+        }
+        for row in rows
+    ]
+    session.correct_answers = sum(1 for answer in answers if answer['is_correct'])
+    session.total_questions = total_questions
+    session.percentage = calculate_percentage(session.correct_answers, total_questions)
+    session.answer_snapshot = answers
+
+
+def ensure_score_snapshot(session):
+    """Stores a score snapshot for completed sessions created before snapshots existed"""
+    if session.percentage is not None:
+        return session
+    store_score_snapshot(session, session.quiz.questions.count())
+    session.save(update_fields=['correct_answers', 'total_questions', 'percentage', 'answer_snapshot'])
+    return session
+
+
+def move_to_next_question(session):
+    """Moves to next question or completes quiz with a score snapshot"""
     total_questions = session.quiz.questions.count()
     if session.current_question_index < total_questions - 1:
         session.current_question_index += 1
@@ -106,4 +306,6 @@ def move_to_next_question(session):
     else:
         session.is_completed = True
         session.completed_at = timezone.now()
+        store_score_snapshot(session, total_questions)
         session.save()
+        record_completed_session(session)
@@ -0,0 +1,32 @@
+from rest_framework.renderers import JSONRenderer, BrowsableAPIRenderer
+from rest_framework.utils import encoders
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+_fallback_encoder = encoders.JSONEncoder()
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSON renderer backed by orjson, byte-compatible with the compact DRF JSONRenderer"""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        """Renders data with orjson unless indentation is requested or orjson is missing"""
+        if orjson is None or not self.compact or self.ensure_ascii:
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b''
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=_fallback_encoder.default)
+        except TypeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        return ret.replace('\u2028'.encode(), b'\\u2028').replace('\u2029'.encode(), b'\\u2029')
+
+
+FAST_RENDERER_CLASSES = [FastJSONRenderer, BrowsableAPIRenderer]
@@ -0,0 +1,144 @@
+import re
+from django.db import connections, router
+from django.db.models import Q
+from ..models import Quiz, Question
+
+
+SEARCH_TABLE = 'quiz_search_index'
+SEARCH_VENDORS = ('sqlite', 'postgresql')
+MAX_QUERY_TERMS = 10
+
+_INDEX_SQL = {
+    'sqlite': (
+        "INSERT INTO {index} (rowid, title, description, questions, transcript) "
+        "SELECT q.id, q.title, q.description, "
+        "COALESCE((SELECT group_concat(question_title, ' ') FROM {question} WHERE quiz_id = q.id), ''), "
+        "q.transcript "
+        "FROM {quiz} q WHERE q.id IN ({ids})"
+    ),
+    'postgresql': (
+        "INSERT INTO {index} (quiz_id, document) "
+        "SELECT q.id, "
+        "setweight(to_tsvector('simple', q.title), 'A') || "
+        "setweight(to_tsvector('simple', q.description), 'B') || "
+        "setweight(to_tsvector('simple', COALESCE("
+        "(SELECT string_agg(question_title, ' ') FROM {question} WHERE quiz_id = q.id), '')), 'C') || "
+        "setweight(to_tsvector('simple', q.transcript), 'D') "
+        "FROM {quiz} q WHERE q.id IN ({ids}) "
+        "ON CONFLICT (quiz_id) DO UPDATE SET document = EXCLUDED.document"
+    ),
+}
+
+_DELETE_SQL = {
+    'sqlite': "DELETE FROM {index} WHERE rowid IN ({ids})",
+    'postgresql': "DELETE FROM {index} WHERE quiz_id IN ({ids})",
+}
+
+_SEARCH_SQL = {
+    'sqlite': (
+        "SELECT {index}.rowid, -bm25({index}, 10.0, 4.0, 2.0, 1.0) AS rank "
+        "FROM {index} JOIN {quiz} q ON q.id = {index}.rowid "
+        "WHERE {index} MATCH %s{owner} ORDER BY rank DESC LIMIT %s"
+    ),
+    'postgresql': (
+        "SELECT s.quiz_id, ts_rank_cd(s.document, query) AS rank "
+        "FROM {index} s JOIN {quiz} q ON q.id = s.quiz_id, to_tsquery('simple', %s) query "
+        "WHERE s.document @@ query{owner} ORDER BY rank DESC LIMIT %s"
+    ),
+}
+
+
+def _format_sql(template, **kwargs):
+    """Fills table names into a search SQL template"""
+    return template.format(
+        index=SEARCH_TABLE,
+        quiz=Quiz._meta.db_table,
+        question=Question._meta.db_table,
+        **kwargs
+    )
+
+
+def is_search_index_available(using=None):
+    """Checks whether the database backend has a full-text search index"""
+    return connections[using or router.db_for_read(Quiz)].vendor in SEARCH_VENDORS
+
+
+def update_search_index(quiz_ids):
+    """Re-indexes the given quizzes, dropping entries of deleted quizzes"""
+    quiz_ids = [int(quiz_id) for quiz_id in quiz_ids]
+    connection = connections[router.db_for_write(Quiz)]
+    if not quiz_ids or connection.vendor not in SEARCH_VENDORS:
+        return
+    placeholders = ', '.join(['%s'] * len(quiz_ids))
+    with connection.cursor() as cursor:
+        cursor.execute(_format_sql(_DELETE_SQL[connection.vendor], ids=placeholders), quiz_ids)
+        cursor.execute(_format_sql(_INDEX_SQL[connection.vendor], ids=placeholders), quiz_ids)
+
+
+def index_quiz(quiz_id):
+    """Re-indexes a single quiz"""
+    update_search_index([quiz_id])
+
+
+def rebuild_search_index(batch_size=1000, progress=None):
+    """Re-indexes all quizzes in primary key batches"""
+    last_pk = 0
+    total = 0
+    while True:
+        batch = list(
+            Quiz.objects.filter(pk__gt=last_pk).order_by('pk').values_list('pk', flat=True)[:batch_size]
+        )
+        if not batch:
+            return total
+        update_search_index(batch)
+        total += len(batch)
+        last_pk = batch[-1]
+        if progress:
+            progress(total)
+
+
+def parse_search_terms(query):
+    """Splits a search query into plain word terms"""
+    return re.findall(r'\w+', query.lower())[:MAX_QUERY_TERMS]
+
+
+def _build_match_expression(vendor, terms):
+    """Builds a prefix match expression that requires every term"""
+    if vendor == 'sqlite':
+        return ' '.join(f'"{term}"*' for term in terms)
+    return ' & '.join(f'{term}:*' for term in terms)
+
+
+def _fallback_search(terms, user, limit):
+    """Matches quizzes with icontains on backends without a search index"""
+    queryset = Quiz.objects.order_by('-created_at', '-id')
+    if user is not None:
+        queryset = queryset.filter(created_by=user)
+    for term in terms:
+        queryset = queryset.filter(Q(title__icontains=term) | Q(description__icontains=term))
+    if limit is not None:
+        queryset = queryset[:limit]
+    return [(quiz_id, 0.0) for quiz_id in queryset.values_list('pk', flat=True)]
+
+
+def search_quiz_ids(query, user=None, limit=None):
+    """Returns (quiz id, rank) pairs matching every query term, best match first"""
+    terms = parse_search_terms(query)
+    if not terms:
+        return []
+    connection = connections[router.db_for_read(Quiz)]
+    if connection.vendor not in SEARCH_VENDORS:
+        return _fallback_search(terms, user, limit)
+
+    params = [_build_match_expression(connection.vendor, terms)]
+    owner = ''
+    if user is not None:
+        owner = ' AND q.created_by_id = %s'
+        params.append(user.pk)
+    if limit is None:
+        # SQLite spells LIMIT ALL as LIMIT -1, PostgreSQL as LIMIT NULL
+        limit = -1 if connection.vendor == 'sqlite' else None
+    params.append(limit)
+    with connection.cursor() as cursor:
+        cursor.execute(_format_sql(_SEARCH_SQL[connection.vendor], owner=owner), params)
+        return [(quiz_id, float(rank)) for quiz_id, rank in cursor.fetchall()]
@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from ..models import Quiz, Question, QuestionOption, QuizSession, QuizAnswer
+from ..models import Quiz, Question, QuestionOption, QuizSession, QuizAnswer, LeaderboardEntry
 
 
 class QuestionOptionSerializer(serializers.ModelSerializer):
@@ -37,6 +37,35 @@ class QuizSerializer(serializers.ModelSerializer):
         fields = ['id', 'title', 'description', 'video_url', 'created_at']
 
 
+class QuizSearchResultSerializer(QuizSerializer):
+    """Serializer for ranked quiz search results"""
+    rank = serializers.FloatField(read_only=True)
+
+    class Meta(QuizSerializer.Meta):
+        fields = QuizSerializer.Meta.fields + ['rank']
+
+
+class DynamicFieldsMixin:
+    """Limits serializer output to the field names passed in the 'fields' context entry"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        requested = self.context.get('fields')
+        if requested:
+            for field_name in set(self.fields) - set(requested):
+                self.fields.pop(field_name)
+
+
+class QuizListSerializer(DynamicFieldsMixin, QuizSerializer):
+    """Serializer for quiz list view with annotated statistics"""
+    question_count = serializers.IntegerField(read_only=True)
+    attempt_count = serializers.IntegerField(read_only=True)
+    best_score = serializers.FloatField(read_only=True)
+
+    class Meta(QuizSerializer.Meta):
+        fields = QuizSerializer.Meta.fields + ['question_count', 'attempt_count', 'best_score']
+
+
 class QuizDetailSerializer(serializers.ModelSerializer):
     """Detailed serializer for quiz with questions"""
     questions = QuestionSerializer(many=True, read_only=True)
@@ -66,6 +95,41 @@ class CreateQuizSerializer(serializers.Serializer):
         return attrs
 
 
+class ImportQuestionSerializer(serializers.Serializer):
+    """Serializer for a question line of an NDJSON quiz import"""
+    question_title = serializers.CharField(max_length=500)
+    question_options = serializers.ListField(
+        child=serializers.CharField(max_length=200), min_length=2
+    )
+    answer = serializers.CharField(max_length=200)
+
+    def validate(self, attrs):
+        """Validates that the answer is one of the options"""
+        if attrs['answer'] not in attrs['question_options']:
+            raise serializers.ValidationError("Antwort muss eine der Antwortoptionen sein.")
+        return attrs
+
+
+class QuizImportSerializer(serializers.Serializer):
+    """Serializer for a single quiz line of an NDJSON import"""
+    title = serializers.CharField(max_length=200)
+    description = serializers.CharField(allow_blank=True, required=False, default='')
+    video_url = serializers.URLField()
+    questions = ImportQuestionSerializer(many=True, allow_empty=False)
+
+
+class QuizImportUploadSerializer(serializers.Serializer):
+    """Serializer for the uploaded NDJSON import file"""
+    file = serializers.FileField()
+
+
+class QuizBulkDeleteSerializer(serializers.Serializer):
+    """Serializer for bulk quiz deletion input"""
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), allow_empty=False, max_length=1000
+    )
+
+
 class QuizSessionSerializer(serializers.ModelSerializer):
     """Serializer for quiz session"""
     progress_percentage = serializers.SerializerMethodField()
@@ -79,6 +143,40 @@ class QuizSessionSerializer(serializers.ModelSerializer):
         return session_obj.get_progress_percentage()
 
 
+class SessionHistorySerializer(serializers.ModelSerializer):
+    """Serializer for a user's past quiz sessions"""
+    quiz_title = serializers.CharField(read_only=True)
+    duration = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = QuizSession
+        fields = [
+            'id', 'quiz', 'quiz_title', 'started_at', 'completed_at', 'is_completed',
+            'current_question_index', 'correct_answers', 'total_questions', 'percentage', 'duration'
+        ]
+    
+    def get_duration(self, session_obj):
+        """Gets session duration in seconds"""
+        if session_obj.duration is None:
+            return None
+        return round(session_obj.duration.total_seconds(), 1)
+
+
+class LeaderboardEntrySerializer(serializers.ModelSerializer):
+    """Serializer for ranked leaderboard entries"""
+    rank = serializers.IntegerField(read_only=True)
+    username = serializers.CharField(source='user.username', read_only=True)
+    duration = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = LeaderboardEntry
+        fields = ['rank', 'session', 'username', 'percentage', 'duration', 'completed_at']
+    
+    def get_duration(self, entry_obj):
+        """Gets session duration in seconds"""
+        return round(entry_obj.duration.total_seconds(), 1)
+
+
 class QuizAnswerSerializer(serializers.ModelSerializer):
     """Serializer for quiz answers"""
     
@@ -101,32 +199,6 @@ class QuizPlayQuestionSerializer(serializers.ModelSerializer):
         return [option.option_text for option in question_obj.question_options.all()]
 
 
-class QuizPlaySerializer(serializers.ModelSerializer):
-    """Serializer for quiz play session"""
-    current_question = serializers.SerializerMethodField()
-    progress_percentage = serializers.SerializerMethodField()
-    total_questions = serializers.SerializerMethodField()
-    
-    class Meta:
-        model = QuizSession
-        fields = ['id', 'quiz', 'current_question', 'current_question_index', 'progress_percentage', 'total_questions', 'is_completed']
-    
-    def get_current_question(self, session_obj):
-        """Gets current question without correct answers"""
-        current_question = session_obj.get_current_question()
-        if current_question:
-            return QuizPlayQuestionSerializer(current_question).data
-        return None
-    
-    def get_progress_percentage(self, session_obj):
-        """Gets progress percentage"""
-        return session_obj.get_progress_percentage()
-    
-    def get_total_questions(self, session_obj):
-        """Gets total number of questions"""
-        return session_obj.quiz.questions.count()
-
-
 class SubmitAnswerSerializer(serializers.Serializer):
     """Serializer for submitting quiz answers"""
     question_id = serializers.IntegerField()
@@ -134,28 +206,20 @@ class SubmitAnswerSerializer(serializers.Serializer):
 
 
 class QuizEvaluationSerializer(serializers.ModelSerializer):
-    """Serializer for quiz evaluation results"""
-    correct_answers = serializers.SerializerMethodField()
-    total_questions = serializers.SerializerMethodField()
+    """Serializer for quiz evaluation results read from the session score snapshot"""
     percentage = serializers.SerializerMethodField()
-    answers = QuizAnswerSerializer(many=True, read_only=True)
+    answers = serializers.SerializerMethodField()
     
     class Meta:
         model = QuizSession
         fields = ['id', 'quiz', 'started_at', 'completed_at', 'correct_answers', 'total_questions', 'percentage', 'answers']
     
-    def get_correct_answers(self, session_obj):
-        """Gets number of correct answers"""
-        return session_obj.answers.filter(selected_option__is_correct=True).count()
-    
-    def get_total_questions(self, session_obj):
-        """Gets total number of questions"""
-        return session_obj.quiz.questions.count()
-    
     def get_percentage(self, session_obj):
-        """Calculates percentage score"""
-        total = self.get_total_questions(session_obj)
-        if total == 0:
+        """Gets stored percentage score"""
+        if not session_obj.total_questions:
             return 0
-        correct = self.get_correct_answers(session_obj)
-        return round((correct / total) * 100, 1)
\ No newline at end of file
+        return session_obj.percentage
+    
+    def get_answers(self, session_obj):
+        """Gets stored answers with correctness"""
+        return session_obj.answer_snapshot or []
@@ -9,6 +9,7 @@ import yt_dlp
 import subprocess
 import platform
 from django.conf import settings
+from .generation_jobs import GenerationCancelled, check_cancelled
 
 class QuizGenerationService:
     def __init__(self):
@@ -88,7 +89,13 @@ class QuizGenerationService:
             'worst'
         ]
     
-    def _create_ydl_options(self, format_choice, temp_dir):
+    def _create_cancel_hook(self, cancel_token):
+        """Creates a yt-dlp progress hook that aborts the download once the job is cancelled"""
+        def hook(progress):
+            check_cancelled(cancel_token)
+        return hook
+    
+    def _create_ydl_options(self, format_choice, temp_dir, cancel_token=None):
         """Creates yt-dlp options for download"""
         ydl_opts = {
             'format': format_choice,
@@ -110,6 +117,10 @@ class QuizGenerationService:
                 'preferredquality': '64',
             }]
         
+        if cancel_token is not None:
+            ydl_opts['progress_hooks'] = [self._create_cancel_hook(cancel_token)]
+            ydl_opts['postprocessor_hooks'] = [self._create_cancel_hook(cancel_token)]
+        
         return ydl_opts
     
     def _find_audio_files(self, temp_dir):
@@ -118,13 +129,14 @@ class QuizGenerationService:
         return [file for file in os.listdir(temp_dir) 
                 if file.endswith(audio_extensions)]
     
-    def _try_download_format(self, youtube_url, format_choice, temp_dir):
+    def _try_download_format(self, youtube_url, format_choice, temp_dir, cancel_token=None):
         """Attempts download with specific format"""
         try:
-            ydl_opts = self._create_ydl_options(format_choice, temp_dir)
+            ydl_opts = self._create_ydl_options(format_choice, temp_dir, cancel_token)
             
             with yt_dlp.YoutubeDL(ydl_opts) as ydl:
                 info = ydl.extract_info(youtube_url, download=True)
+                check_cancelled(cancel_token)
                 if info is None:
                     return None, None
                 
@@ -138,18 +150,21 @@ class QuizGenerationService:
                 return None, None
                 
         except Exception as e:
+            # yt-dlp wraps exceptions raised by hooks, so the token decides
+            check_cancelled(cancel_token)
             error_msg = str(e).lower()
             if 'ffmpeg' in error_msg or 'ffprobe' in error_msg:
                 raise Exception("ffmpeg ist nicht installiert. Bitte installiere ffmpeg: https://ffmpeg.org/download.html")
             return None, None
     
-    def _download_youtube_audio(self, youtube_url, temp_dir):
+    def _download_youtube_audio(self, youtube_url, temp_dir, cancel_token=None):
         """Robust YouTube download with multiple format fallbacks"""
         formats_to_try = self._get_download_formats()
         
         for format_choice in formats_to_try:
+            check_cancelled(cancel_token)
             audio_path, video_title = self._try_download_format(
-                youtube_url, format_choice, temp_dir)
+                youtube_url, format_choice, temp_dir, cancel_token)
             
             if audio_path and video_title:
                 return audio_path, video_title
@@ -169,22 +184,37 @@ class QuizGenerationService:
         if not self.whisper_model:
             self.whisper_model = whisper.load_model("tiny")
     
-    def _transcribe_audio(self, audio_path):
-        """Simple audio transcription using Whisper"""
+    def _iter_audio_chunks(self, audio_path):
+        """Yields the decoded audio in chunks of QUIZ_TRANSCRIBE_CHUNK_SECONDS"""
+        audio = whisper.load_audio(audio_path)
+        chunk_size = int(getattr(settings, 'QUIZ_TRANSCRIBE_CHUNK_SECONDS', 120) * whisper.audio.SAMPLE_RATE)
+        for start in range(0, len(audio), chunk_size):
+            yield audio[start:start + chunk_size]
+    
+    def _transcribe_audio(self, audio_path, cancel_token=None):
+        """Audio transcription using Whisper, checking for cancellation between chunks"""
         try:
             self._validate_audio_file(audio_path)
             self._load_whisper_model()
             
-            result = self.whisper_model.transcribe(
-                audio_path,
-                fp16=False,
-                verbose=False,
-                word_timestamps=False,
-                language="de"
-            )
+            texts = []
+            for chunk in self._iter_audio_chunks(audio_path):
+                check_cancelled(cancel_token)
+                result = self.whisper_model.transcribe(
+                    chunk,
+                    fp16=False,
+                    verbose=False,
+                    word_timestamps=False,
+                    language="de",
+                    # Carries context across chunk boundaries
+                    initial_prompt=texts[-1] if texts else None
+                )
+                texts.append(result["text"].strip())
             
-            return result["text"].strip()
+            return ' '.join(text for text in texts if text)
             
+        except GenerationCancelled:
+            raise
         except Exception as e:
             raise Exception(f"Transcription failed: {str(e)}")
     
@@ -247,13 +277,14 @@ IMPORTANT:
         response = model.generate_content(prompt)
         return response.text.strip()
     
-    def _generate_quiz_with_gemini(self, video_title, transcript):
+    def _generate_quiz_with_gemini(self, video_title, transcript, cancel_token=None):
         """Intelligent quiz generation using Gemini AI"""
         try:
             if self._is_dummy_api_key():
                 return self._generate_gemini_style_fallback(video_title, transcript)
             
             prompt = self._create_gemini_prompt(video_title, transcript)
+            check_cancelled(cancel_token)
             response_text = self._call_gemini_api(prompt)
             quiz_data = self._extract_json_from_response(response_text)
             
@@ -262,6 +293,8 @@ IMPORTANT:
             
             return quiz_data
             
+        except GenerationCancelled:
+            raise
         except Exception:
             return self._generate_gemini_style_fallback(video_title, transcript)
     
@@ -507,18 +540,51 @@ IMPORTANT:
         except Exception:
             pass
     
-    def generate_quiz_from_youtube(self, youtube_url):
+    def _enter_stage(self, job, stage):
+        """Records the stage of a job, raising GenerationCancelled if it was cancelled"""
+        cancel_token = job.get('cancel_token')
+        if cancel_token is not None:
+            cancel_token.enter_stage(stage)
+        return cancel_token
+    
+    def download_stage(self, job):
+        """Downloads the audio of job['url'] into a new temporary directory"""
+        cancel_token = self._enter_stage(job, 'download')
+        job['temp_dir'] = self._create_temp_directory()
+        job['audio_path'], job['video_title'] = self._download_youtube_audio(
+            job['url'], job['temp_dir'], cancel_token)
+        return job
+    
+    def transcribe_stage(self, job):
+        """Transcribes the downloaded audio of a job"""
+        cancel_token = self._enter_stage(job, 'transcribe')
+        job['transcript'] = self._transcribe_audio(job['audio_path'], cancel_token)
+        return job
+    
+    def generate_stage(self, job):
+        """Generates the quiz data of a job from its transcript"""
+        cancel_token = self._enter_stage(job, 'generate')
+        quiz_data = self._generate_quiz_with_gemini(job['video_title'], job['transcript'], cancel_token)
+        quiz_data['transcript'] = job['transcript']
+        job['quiz_data'] = quiz_data
+        return job
+    
+    def cleanup_job(self, job):
+        """Removes the temporary files of a job"""
+        if job.get('temp_dir'):
+            self._cleanup_temp_files(job['temp_dir'])
+    
+    def generate_quiz_from_youtube(self, youtube_url, cancel_token=None):
         """Main method for quiz generation"""
-        temp_dir = None
+        job = {'url': youtube_url, 'cancel_token': cancel_token}
         try:
-            temp_dir = self._create_temp_directory()
-            audio_path, video_title = self._download_youtube_audio(youtube_url, temp_dir)
-            transcript = self._transcribe_audio(audio_path)
-            quiz_data = self._generate_quiz_with_gemini(video_title, transcript)
-            return quiz_data
+            for stage in (self.download_stage, self.transcribe_stage, self.generate_stage):
+                job = stage(job)
+            return job['quiz_data']
             
+        except GenerationCancelled:
+            raise
         except Exception as e:
             raise Exception(f"Error in generate_quiz_from_youtube: {str(e)}")
         finally:
-            if temp_dir:
-                self._cleanup_temp_files(temp_dir)
\ No newline at end of file
+            self.cleanup_job(job)
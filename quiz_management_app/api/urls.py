@@ -3,9 +3,21 @@ from . import views
 
 urlpatterns = [
     path('createQuiz/', views.CreateQuizView.as_view(), name='create_quiz'),
+    path('createQuiz/jobs/', views.GenerationJobListView.as_view(), name='generation_jobs'),
+    path('createQuiz/jobs/<str:job_id>/', views.GenerationJobDetailView.as_view(), name='generation_job_detail'),
     path('quizzes/', views.QuizListView.as_view(), name='quiz_list'),
+    path('quizzes/search/', views.QuizSearchView.as_view(), name='quiz_search'),
+    path('quizzes/export/', views.QuizExportView.as_view(), name='quiz_export'),
+    path('quizzes/import/', views.QuizImportView.as_view(), name='quiz_import'),
+    path('quizzes/bulk-delete/', views.QuizBulkDeleteView.as_view(), name='quiz_bulk_delete'),
     path('quizzes/<pk>/', views.QuizDetailView.as_view(), name='quiz_detail'),
+    path('quizzes/<pk>/analytics/', views.QuizAnalyticsView.as_view(), name='quiz_analytics'),
+    path('quizzes/<pk>/leaderboard/', views.QuizLeaderboardView.as_view(), name='quiz_leaderboard'),
     path('quizzes/<quiz_id>/start/', views.StartQuizView.as_view(), name='start_quiz'),
+    path('sessions/', views.SessionHistoryView.as_view(), name='session_history'),
+    path('sessions/summary/', views.SessionSummaryView.as_view(), name='session_summary'),
     path('sessions/<int:session_id>/submit/', views.SubmitAnswerView.as_view(), name='submit_answer'),
     path('sessions/<int:session_id>/evaluation/', views.QuizEvaluationView.as_view(), name='quiz_evaluation'),
+    path('metrics/cache/', views.QuizCacheStatsView.as_view(), name='quiz_cache_stats'),
+    path('metrics/generation/', views.GenerationStatsView.as_view(), name='generation_stats'),
 ]
\ No newline at end of file
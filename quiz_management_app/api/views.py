@@ -1,20 +1,50 @@
 from rest_framework import status
 from rest_framework.generics import CreateAPIView, ListAPIView, RetrieveUpdateDestroyAPIView, GenericAPIView
-from rest_framework.permissions import IsAuthenticated, AllowAny
+from rest_framework.permissions import IsAuthenticated, AllowAny, IsAdminUser
 from rest_framework.response import Response
+from rest_framework.parsers import MultiPartParser
 from django.contrib.auth.models import User
+from django.http import StreamingHttpResponse
+from django.db import transaction
+from django.utils.cache import get_conditional_response
 from .serializers import (
-    CreateQuizSerializer, QuizSerializer, QuizDetailSerializer,
-    QuizPlaySerializer, SubmitAnswerSerializer, QuizEvaluationSerializer
+    CreateQuizSerializer, QuizListSerializer, QuizDetailSerializer,
+    SubmitAnswerSerializer, QuizEvaluationSerializer, SessionHistorySerializer,
+    LeaderboardEntrySerializer, QuizImportUploadSerializer, QuizBulkDeleteSerializer,
+    QuizSearchResultSerializer
 )
 from .services import QuizGenerationService
 from .quiz_utils import (
-    validate_youtube_url, get_youtube_url_from_data, create_error_response,
+    validate_youtube_url, get_youtube_url_from_data, extract_youtube_video_id, create_error_response,
     get_authenticated_user, get_quiz_by_id, get_question_by_id,
     get_selected_option, get_or_create_quiz_session, get_quiz_session_by_id,
-    get_completed_quiz_session, save_quiz_answer, move_to_next_question
+    get_completed_quiz_session, save_quiz_answer, move_to_next_question,
+    QUIZ_LIST_FIELDS, parse_requested_fields, annotate_quiz_list,
+    get_quiz_validators, set_quiz_validator_headers, ensure_score_snapshot,
+    annotate_session_history, get_session_summary
 )
-from ..models import Quiz, Question, QuestionOption, QuizSession, QuizAnswer
+from .pagination import QuizCursorPagination, SessionCursorPagination, LeaderboardPagination
+from .payload_cache import get_quiz_payload, get_cache_stats
+from .fast_serializers import serialize_quiz_detail, serialize_quiz_play, get_play_questions
+from .renderers import FAST_RENDERER_CLASSES
+from .question_stats import get_quiz_analytics
+from .leaderboard import RANK_ORDER
+from .quiz_transfer import iter_quiz_export, import_quizzes
+from .deletion import QuizDeletionService
+from .search import search_quiz_ids
+from .generation_admission import GenerationRejected, admit_generation, get_generation_admission
+from .generation_jobs import (
+    GenerationCancelled, register_generation_job, unregister_generation_job, get_disconnect_check,
+    add_generation_waiter, remove_generation_waiter,
+    list_generation_jobs, cancel_generation_job, cancel_user_generation_jobs, get_job_stats
+)
+from .generation_pipeline import is_pipeline_enabled, generate_quiz_staged, get_pipeline_stats
+from .generation_dedup import (
+    IdempotencyConflict, generation_flights, get_idempotency_key, begin_idempotent_request,
+    complete_idempotent_request, release_idempotent_request, get_dedup_stats
+)
+from .answer_buffer import is_answer_buffer_enabled, apply_buffered_state, submit_buffered_answer, SessionLocked
+from ..models import Quiz, Question, QuestionOption, QuizSession, QuizAnswer, LeaderboardEntry
 
 
 class CreateQuizView(CreateAPIView):
@@ -29,6 +59,7 @@ class CreateQuizView(CreateAPIView):
             title=quiz_data['title'],
             description=quiz_data['description'],
             video_url=url,
+            transcript=quiz_data.get('transcript', ''),
             created_by=user
         )
     
@@ -55,8 +86,28 @@ class CreateQuizView(CreateAPIView):
                 is_correct=is_correct
             )
     
+    def _generate_quiz(self, url, user, flight_key=None):
+        """Runs the generation pipeline under admission control as a cancellable job and stores the quiz"""
+        cancel_token = register_generation_job(user.pk, url, flight_key)
+        try:
+            with admit_generation(user, cancel_token):
+                cancel_token.raise_if_cancelled()
+                if is_pipeline_enabled():
+                    quiz_data = generate_quiz_staged(url, cancel_token)
+                else:
+                    quiz_service = QuizGenerationService()
+                    quiz_data = quiz_service.generate_quiz_from_youtube(url, cancel_token)
+            
+            cancel_token.raise_if_cancelled()
+            with transaction.atomic():
+                quiz = self._create_quiz_from_data(quiz_data, url, user)
+                self._create_questions_for_quiz(quiz, quiz_data['questions'])
+            return QuizDetailSerializer(quiz).data
+        finally:
+            unregister_generation_job(cancel_token)
+    
     def create(self, request, *args, **kwargs):
-        """Handles quiz creation from YouTube URL"""
+        """Handles quiz creation from YouTube URL, coalescing identical concurrent requests"""
         try:
             url = get_youtube_url_from_data(request.data)
             if not url:
@@ -71,16 +122,54 @@ class CreateQuizView(CreateAPIView):
                     {"received_url": url}
                 )
             
-            quiz_service = QuizGenerationService()
-            quiz_data = quiz_service.generate_quiz_from_youtube(url)
-            
             user = get_authenticated_user(request)
-            quiz = self._create_quiz_from_data(quiz_data, url, user)
-            self._create_questions_for_quiz(quiz, quiz_data['questions'])
+            fingerprint = extract_youtube_video_id(url) or url.strip()
+            flight_key = (user.pk, fingerprint)
+            idempotency_key = get_idempotency_key(request)
+            if idempotency_key:
+                record = begin_idempotent_request(user.pk, idempotency_key, fingerprint, flight_key)
+                if record is not None:
+                    response = Response(record['data'], status=record['status'])
+                    response['Idempotent-Replayed'] = 'true'
+                    return response
             
-            serializer = QuizDetailSerializer(quiz)
-            return Response(serializer.data, status=status.HTTP_201_CREATED)
+            def generate():
+                data = self._generate_quiz(url, user, flight_key)
+                if idempotency_key:
+                    # Stored before the flight ends, so a retry never sees a pending key without a flight
+                    complete_idempotent_request(
+                        user.pk, idempotency_key, fingerprint, status.HTTP_201_CREATED, data
+                    )
+                return data
             
+            # The job is only cancelled on disconnect once every request waiting for it has gone away
+            waiter_id = add_generation_waiter(flight_key, get_disconnect_check(request))
+            try:
+                data, shared = generation_flights.run(flight_key, generate)
+            except BaseException:
+                if idempotency_key:
+                    release_idempotent_request(user.pk, idempotency_key)
+                raise
+            finally:
+                remove_generation_waiter(flight_key, waiter_id)
+            if idempotency_key and shared:
+                complete_idempotent_request(user.pk, idempotency_key, fingerprint, status.HTTP_201_CREATED, data)
+            return Response(data, status=status.HTTP_201_CREATED)
+        
+        except GenerationRejected as exc:
+            response = create_error_response(exc.detail, status_code=status.HTTP_429_TOO_MANY_REQUESTS)
+            response['Retry-After'] = str(exc.retry_after)
+            return response
+        except IdempotencyConflict as exc:
+            response = create_error_response(exc.detail, status_code=exc.status_code)
+            if exc.retry_after:
+                response['Retry-After'] = str(exc.retry_after)
+            return response
+        except GenerationCancelled:
+            return create_error_response(
+                "Quiz-Generierung wurde abgebrochen.",
+                status_code=status.HTTP_409_CONFLICT
+            )
         except Exception as e:
             return create_error_response(
                 f"Fehler bei der Quiz-Generierung: {str(e)}",
@@ -89,20 +178,156 @@ class CreateQuizView(CreateAPIView):
             )
 
 
+class GenerationJobListView(GenericAPIView):
+    """View for the user's running quiz generations"""
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request):
+        """Lists the running generations of the user"""
+        return Response(list_generation_jobs(request.user.pk), status=status.HTTP_200_OK)
+    
+    def delete(self, request):
+        """Cancels all running generations of the user"""
+        cancelled = cancel_user_generation_jobs(request.user.pk)
+        return Response({'cancelled': cancelled}, status=status.HTTP_200_OK)
+
+
+class GenerationJobDetailView(GenericAPIView):
+    """View for cancelling one running quiz generation"""
+    permission_classes = [IsAuthenticated]
+    
+    def delete(self, request, job_id):
+        """Cancels a running generation of the user"""
+        if not cancel_generation_job(request.user.pk, job_id):
+            return Response(
+                {"detail": "Keine laufende Quiz-Generierung gefunden."},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
 class QuizListView(ListAPIView):
-    """View for listing all quizzes"""
-    serializer_class = QuizSerializer
+    """View for listing all quizzes with keyset pagination"""
+    serializer_class = QuizListSerializer
     permission_classes = [IsAuthenticated] 
+    pagination_class = QuizCursorPagination
+    
+    def get_requested_fields(self):
+        """Gets fields requested via the 'fields' query parameter"""
+        return parse_requested_fields(self.request.query_params, QUIZ_LIST_FIELDS)
     
     def get_queryset(self):
-        """Returns quizzes for authenticated user"""
-        return Quiz.objects.filter(created_by=self.request.user)
+        """Returns annotated quizzes for authenticated user, newest first"""
+        queryset = Quiz.objects.filter(created_by=self.request.user).order_by('-created_at', '-id')
+        return annotate_quiz_list(queryset, self.get_requested_fields())
+    
+    def get_serializer_context(self):
+        """Adds requested fields to serializer context"""
+        context = super().get_serializer_context()
+        context['fields'] = self.get_requested_fields()
+        return context
+
+
+class QuizSearchView(GenericAPIView):
+    """View for ranked full-text search over the user's quizzes"""
+    permission_classes = [IsAuthenticated]
+    serializer_class = QuizSearchResultSerializer
+    default_limit = 20
+    max_limit = 100
+    
+    def get_limit(self):
+        """Gets result limit from query params within allowed bounds"""
+        try:
+            limit = int(self.request.query_params['limit'])
+        except (KeyError, ValueError):
+            return self.default_limit
+        if limit <= 0:
+            return self.default_limit
+        return min(limit, self.max_limit)
+    
+    def get(self, request):
+        """Searches titles, descriptions, questions and transcripts"""
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            return Response(
+                {"detail": "Suchbegriff ist erforderlich."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        ranks = dict(search_quiz_ids(query, user=request.user, limit=self.get_limit()))
+        quizzes = Quiz.objects.in_bulk(list(ranks))
+        results = []
+        for quiz_id, rank in ranks.items():
+            if quiz_id in quizzes:
+                quizzes[quiz_id].rank = rank
+                results.append(quizzes[quiz_id])
+        serializer = self.get_serializer(results, many=True)
+        return Response({'query': query, 'results': serializer.data}, status=status.HTTP_200_OK)
+
+
+class QuizExportView(GenericAPIView):
+    """View for streaming all quizzes of the user as NDJSON"""
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request):
+        """Streams one JSON line per quiz"""
+        response = StreamingHttpResponse(
+            iter_quiz_export(request.user),
+            content_type='application/x-ndjson'
+        )
+        response['Content-Disposition'] = 'attachment; filename="quizzes.ndjson"'
+        return response
+
+
+class QuizImportView(GenericAPIView):
+    """View for importing quizzes from an uploaded NDJSON file"""
+    permission_classes = [IsAuthenticated]
+    serializer_class = QuizImportUploadSerializer
+    parser_classes = [MultiPartParser]
+    
+    def post(self, request):
+        """Imports quizzes line by line and reports invalid lines"""
+        serializer = self.get_serializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        
+        report = import_quizzes(request.user, serializer.validated_data['file'])
+        response_status = status.HTTP_201_CREATED if report['imported'] else status.HTTP_400_BAD_REQUEST
+        return Response(report, status=response_status)
+
+
+class QuizBulkDeleteView(GenericAPIView):
+    """View for deleting several quizzes at once"""
+    permission_classes = [IsAuthenticated]
+    serializer_class = QuizBulkDeleteSerializer
+    
+    def post(self, request):
+        """Deletes the owned quizzes among the given ids"""
+        serializer = self.get_serializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        
+        requested_ids = set(serializer.validated_data['ids'])
+        quizzes = Quiz.objects.filter(created_by=request.user, pk__in=requested_ids)
+        found_ids = set(quizzes.values_list('pk', flat=True))
+        if not found_ids:
+            return Response(
+                {"detail": "Keine Quizze gefunden."},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        
+        deleted = QuizDeletionService().delete_quizzes(quizzes)
+        return Response({
+            'deleted': deleted,
+            'not_found': sorted(requested_ids - found_ids),
+        }, status=status.HTTP_200_OK)
 
 
 class QuizDetailView(RetrieveUpdateDestroyAPIView):
     """View for quiz detail, update and delete operations"""
     serializer_class = QuizDetailSerializer
     permission_classes = [IsAuthenticated]
+    renderer_classes = FAST_RENDERER_CLASSES
     
     def get_queryset(self):
         """Returns quizzes for authenticated user"""
@@ -119,15 +344,31 @@ class QuizDetailView(RetrieveUpdateDestroyAPIView):
             return None
     
     def retrieve(self, request, *args, **kwargs):
-        """Handles quiz retrieval with better error messages"""
-        obj = self.get_object()
-        if obj is None:
+        """Handles conditional quiz retrieval with better error messages"""
+        validators = get_quiz_validators(self.kwargs.get('pk'), request.user)
+        if validators is None:
             return Response(
                 {"detail": "Quiz nicht gefunden oder ungültige ID."},
                 status=status.HTTP_404_NOT_FOUND
             )
-        serializer = self.get_serializer(obj)
-        return Response(serializer.data)
+        etag, last_modified = validators
+        conditional_response = get_conditional_response(
+            request, etag=etag, last_modified=int(last_modified.timestamp())
+        )
+        if conditional_response is not None:
+            return set_quiz_validator_headers(conditional_response, etag, last_modified)
+        
+        payload = get_quiz_payload('detail', self.kwargs['pk'], self._build_detail_payload, version=etag)
+        if payload is None:
+            return Response(
+                {"detail": "Quiz nicht gefunden oder ungültige ID."},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        return set_quiz_validator_headers(Response(payload), etag, last_modified)
+    
+    def _build_detail_payload(self):
+        """Serializes the quiz for the payload cache"""
+        return serialize_quiz_detail(self.kwargs['pk'], self.request.user)
     
     def update(self, request, *args, **kwargs):
         """Handles quiz update with better error messages"""
@@ -148,11 +389,16 @@ class QuizDetailView(RetrieveUpdateDestroyAPIView):
                 status=status.HTTP_404_NOT_FOUND
             )
         return super().destroy(request, *args, **kwargs)
+    
+    def perform_destroy(self, instance):
+        """Deletes the quiz with its sessions and answers in batches"""
+        QuizDeletionService().delete_quizzes(Quiz.objects.filter(pk=instance.pk))
 
 
 class StartQuizView(GenericAPIView):
     """View for starting a quiz session"""
     permission_classes = [IsAuthenticated]
+    renderer_classes = FAST_RENDERER_CLASSES
     
     def post(self, request, quiz_id):
         """Starts a new quiz session"""
@@ -169,15 +415,16 @@ class StartQuizView(GenericAPIView):
                 status=status.HTTP_404_NOT_FOUND
             )
         
-        session = get_or_create_quiz_session(quiz, request.user)
-        serializer = QuizPlaySerializer(session)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        session = apply_buffered_state(get_or_create_quiz_session(quiz, request.user))
+        payload = serialize_quiz_play(session, get_play_questions(quiz.pk, quiz.content_version))
+        return Response(payload, status=status.HTTP_200_OK)
 
 
 class SubmitAnswerView(GenericAPIView):
     """View for submitting quiz answers"""
     permission_classes = [IsAuthenticated]
     serializer_class = SubmitAnswerSerializer
+    renderer_classes = FAST_RENDERER_CLASSES
     
     def post(self, request, session_id):
         """Submits an answer and moves to next question"""
@@ -215,11 +462,22 @@ class SubmitAnswerView(GenericAPIView):
                 status=status.HTTP_404_NOT_FOUND
             )
         
-        save_quiz_answer(session, question, selected_option)
-        move_to_next_question(session)
+        if is_answer_buffer_enabled():
+            try:
+                submit_buffered_answer(session, question, selected_option)
+            except SessionLocked:
+                return Response(
+                    {"detail": "Eine andere Antwort dieser Quiz-Session wird gerade verarbeitet."},
+                    status=status.HTTP_409_CONFLICT
+                )
+        else:
+            save_quiz_answer(session, question, selected_option)
+            move_to_next_question(session)
         
-        serializer = QuizPlaySerializer(session)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        payload = serialize_quiz_play(
+            session, get_play_questions(session.quiz_id, session.quiz_content_version)
+        )
+        return Response(payload, status=status.HTTP_200_OK)
 
 
 class QuizEvaluationView(GenericAPIView):
@@ -235,6 +493,96 @@ class QuizEvaluationView(GenericAPIView):
                 status=status.HTTP_404_NOT_FOUND
             )
         
-        serializer = QuizEvaluationSerializer(session)
+        serializer = QuizEvaluationSerializer(ensure_score_snapshot(session))
         return Response(serializer.data, status=status.HTTP_200_OK)
 
+
+class QuizAnalyticsView(GenericAPIView):
+    """View for per-question answer distribution of a quiz"""
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request, pk):
+        """Gets answer statistics from the materialised stats table"""
+        quiz = get_quiz_by_id(pk, request.user) if str(pk).isdigit() else None
+        if not quiz:
+            return Response(
+                {"detail": "Quiz nicht gefunden."},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        return Response(get_quiz_analytics(quiz.pk), status=status.HTTP_200_OK)
+
+
+class QuizLeaderboardView(ListAPIView):
+    """View for the ranked leaderboard of a quiz"""
+    serializer_class = LeaderboardEntrySerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = LeaderboardPagination
+    
+    def get_queryset(self):
+        """Returns leaderboard entries of an owned quiz in rank order"""
+        return (
+            LeaderboardEntry.objects.filter(quiz_id=self.kwargs['pk'])
+            .select_related('user')
+            .order_by(*RANK_ORDER)
+        )
+    
+    def list(self, request, *args, **kwargs):
+        """Lists leaderboard entries with their rank"""
+        pk = self.kwargs['pk']
+        if not str(pk).isdigit() or not get_quiz_by_id(pk, request.user):
+            return Response(
+                {"detail": "Quiz nicht gefunden."},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        page = self.paginate_queryset(self.get_queryset())
+        for position, entry in enumerate(page, start=self.paginator.offset + 1):
+            entry.rank = position
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+
+class SessionHistoryView(ListAPIView):
+    """View for listing the user's quiz sessions with scores"""
+    serializer_class = SessionHistorySerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = SessionCursorPagination
+    
+    def get_queryset(self):
+        """Returns annotated sessions of authenticated user, newest first"""
+        queryset = QuizSession.objects.filter(user=self.request.user).order_by('-started_at', '-id')
+        return annotate_session_history(queryset)
+
+
+class SessionSummaryView(GenericAPIView):
+    """View for aggregated attempt statistics"""
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request):
+        """Gets attempts, scores and streaks of authenticated user"""
+        return Response(get_session_summary(request.user), status=status.HTTP_200_OK)
+
+
+class QuizCacheStatsView(GenericAPIView):
+    """View for quiz payload cache statistics"""
+    permission_classes = [IsAdminUser]
+    
+    def get(self, request):
+        """Gets hit and miss counters of this worker process"""
+        return Response(get_cache_stats(), status=status.HTTP_200_OK)
+
+
+class GenerationStatsView(GenericAPIView):
+    """View for quiz generation admission statistics"""
+    permission_classes = [IsAdminUser]
+    
+    def get(self, request):
+        """Gets running and queued generations of this worker process"""
+        return Response(
+            {
+                **get_generation_admission().get_stats(),
+                **get_dedup_stats(),
+                **get_job_stats(),
+                'pipeline': get_pipeline_stats(),
+            },
+            status=status.HTTP_200_OK
+        )
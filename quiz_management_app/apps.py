@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class QuizManagementAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'quiz_management_app'
+
+    def ready(self):
+        """Connects model and database connection signal handlers"""
+        from . import signals  # noqa: F401
+        from core import db  # noqa: F401
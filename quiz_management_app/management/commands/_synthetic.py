@@ -0,0 +1,91 @@
+from django.contrib.auth.models import User
+from django.utils import timezone
+from ...models import Quiz, Question, QuestionOption, QuizSession, QuizAnswer
+
+
+OPTIONS_PER_QUESTION = 4
+
+
+def _bulk_create(model, objects, batch_size):
+    """Creates objects in batches and returns them with primary keys"""
+    return model.objects.bulk_create(objects, batch_size=batch_size)
+
+
+def create_synthetic_users(count, prefix='bench', batch_size=1000):
+    """Creates users with unusable passwords for benchmarks"""
+    users = [
+        User(username=f'{prefix}_user_{index}', password='!')
+        for index in range(count)
+    ]
+    return _bulk_create(User, users, batch_size)
+
+
+def create_synthetic_quizzes(users, quizzes_per_user, questions_per_quiz, batch_size=1000):
+    """Creates quizzes with questions and options for each user"""
+    quizzes = _bulk_create(Quiz, [
+        Quiz(
+            title=f'Quiz {user.pk}-{index}',
+            description=f'Synthetic quiz {index} for {user.username}',
+            video_url=f'https://www.youtube.com/watch?v=bench{user.pk}x{index}',
+            created_by=user,
+        )
+        for user in users
+        for index in range(quizzes_per_user)
+    ], batch_size)
+
+    questions = _bulk_create(Question, [
+        Question(quiz=quiz, question_title=f'Question {index} of {quiz.title}')
+        for quiz in quizzes
+        for index in range(questions_per_quiz)
+    ], batch_size)
+
+    options = _bulk_create(QuestionOption, [
+        QuestionOption(question=question, option_text=f'Option {index}', is_correct=index == 0)
+        for question in questions
+        for index in range(OPTIONS_PER_QUESTION)
+    ], batch_size)
+    return quizzes, questions, options
+
+
+def create_synthetic_sessions(quizzes, questions, options, sessions_per_quiz, batch_size=1000):
+    """Creates completed sessions with one answer per question"""
+    questions_by_quiz = {}
+    for question in questions:
+        questions_by_quiz.setdefault(question.quiz_id, []).append(question)
+    options_by_question = {}
+    for option in options:
+        options_by_question.setdefault(option.question_id, []).append(option)
+
+    now = timezone.now()
+    sessions = _bulk_create(QuizSession, [
+        QuizSession(
+            quiz=quiz,
+            user_id=quiz.created_by_id,
+            is_completed=index < sessions_per_quiz - 1,
+            completed_at=now if index < sessions_per_quiz - 1 else None,
+        )
+        for quiz in quizzes
+        for index in range(sessions_per_quiz)
+    ], batch_size)
+
+    answers = []
+    for session_index, session in enumerate(sessions):
+        for question_index, question in enumerate(questions_by_quiz.get(session.quiz_id, [])):
+            question_options = options_by_question[question.pk]
+            selected = question_options[(session_index + question_index) % len(question_options)]
+            answers.append(QuizAnswer(session=session, question=question, selected_option=selected))
+            if len(answers) >= batch_size:
+                _bulk_create(QuizAnswer, answers, batch_size)
+                answers = []
+    if answers:
+        _bulk_create(QuizAnswer, answers, batch_size)
+    return sessions
+
+
+def create_synthetic_dataset(users, quizzes_per_user, questions_per_quiz, sessions_per_quiz, batch_size=1000):
+    """Creates a complete synthetic dataset and returns the created users, quizzes and sessions"""
+    created_users = create_synthetic_users(users, batch_size=batch_size)
+    quizzes, questions, options = create_synthetic_quizzes(
+        created_users, quizzes_per_user, questions_per_quiz, batch_size)
+    sessions = create_synthetic_sessions(quizzes, questions, options, sessions_per_quiz, batch_size)
+    return created_users, quizzes, questions, sessions
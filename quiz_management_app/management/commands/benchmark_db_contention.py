@@ -0,0 +1,130 @@
+import random
+import statistics
+import threading
+import time
+from contextlib import contextmanager
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connection, connections, transaction
+from django.db.backends.signals import connection_created
+from django.db.models import F
+from django.contrib.auth.models import User
+from core.db import apply_sqlite_pragmas, configure_sqlite_connection, get_sqlite_pragmas
+from ...models import QuizSession, QuizAnswer
+from ...api.deletion import QuizDeletionService
+from ._synthetic import create_synthetic_users, create_synthetic_quizzes
+
+
+DEFAULT_SQLITE_PRAGMAS = {'journal_mode': 'DELETE', 'synchronous': 'FULL'}
+
+
+class Command(BaseCommand):
+    help = 'Runs concurrent submit-style writers against the database and reports lock errors and latency'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--writers', type=int, default=8)
+        parser.add_argument('--operations', type=int, default=200, help='Submits per writer')
+        parser.add_argument('--questions', type=int, default=10)
+        parser.add_argument(
+            '--mode', choices=['configured', 'default', 'both'], default='both',
+            help='configured uses the project settings, default plain Django SQLite settings'
+        )
+
+    @contextmanager
+    def _default_sqlite_settings(self):
+        """Temporarily opens SQLite connections without PRAGMAs and transaction mode"""
+        options = connections.settings[DEFAULT_DB_ALIAS]['OPTIONS']
+        connections.settings[DEFAULT_DB_ALIAS]['OPTIONS'] = {}
+        connection_created.disconnect(dispatch_uid='quizly_sqlite_pragmas')
+        connection.close()
+        apply_sqlite_pragmas(connection, DEFAULT_SQLITE_PRAGMAS)
+        try:
+            yield
+        finally:
+            connection.close()
+            connections.settings[DEFAULT_DB_ALIAS]['OPTIONS'] = options
+            connection_created.connect(configure_sqlite_connection, dispatch_uid='quizly_sqlite_pragmas')
+            apply_sqlite_pragmas(connection, get_sqlite_pragmas())
+
+    def _submit(self, session_id, question_id, option_id):
+        """Reads the session, upserts an answer and advances progress like SubmitAnswerView"""
+        with transaction.atomic():
+            QuizSession.objects.filter(pk=session_id).values_list('current_question_index', flat=True).first()
+            QuizAnswer.objects.update_or_create(
+                session_id=session_id, question_id=question_id,
+                defaults={'selected_option_id': option_id}
+            )
+            QuizSession.objects.filter(pk=session_id).update(current_question_index=F('current_question_index') + 1)
+
+    def _writer(self, session_id, answers, operations, seed, results):
+        """Runs submits in a thread with its own connection"""
+        rng = random.Random(seed)
+        latencies = []
+        errors = 0
+        try:
+            for _ in range(operations):
+                question_id, option_id = rng.choice(answers)
+                start = time.perf_counter()
+                try:
+                    self._submit(session_id, question_id, option_id)
+                except OperationalError:
+                    errors += 1
+                    continue
+                latencies.append((time.perf_counter() - start) * 1000)
+        finally:
+            connections.close_all()
+        results.append((latencies, errors))
+
+    def _run(self, name, sessions, answers, options):
+        """Starts all writers and reports throughput, errors and latency percentiles"""
+        results = []
+        threads = [
+            threading.Thread(
+                target=self._writer,
+                args=(session.pk, answers[session.quiz_id], options['operations'], index, results)
+            )
+            for index, session in enumerate(sessions)
+        ]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        latencies = sorted(latency for thread_latencies, _ in results for latency in thread_latencies)
+        errors = sum(thread_errors for _, thread_errors in results)
+        if not latencies:
+            self.stdout.write(f'{name:<11} all {errors} submits failed')
+            return
+        p95 = latencies[int(len(latencies) * 0.95) - 1] if len(latencies) >= 20 else latencies[-1]
+        self.stdout.write(
+            f'{name:<11} {len(latencies) / elapsed:8.1f} submits/s  {errors:5d} lock errors  '
+            f'p50 {statistics.median(latencies):7.2f} ms  p95 {p95:7.2f} ms'
+        )
+
+    def handle(self, *args, **options):
+        """Creates one session per writer, runs the selected modes and removes the data again"""
+        if options['mode'] != 'configured' and connection.vendor != 'sqlite':
+            raise CommandError('The default mode compares SQLite settings; use --mode configured.')
+
+        users = create_synthetic_users(options['writers'], prefix='contention_bench')
+        quizzes, questions, option_rows = create_synthetic_quizzes(users, 1, options['questions'])
+        sessions = QuizSession.objects.bulk_create([
+            QuizSession(quiz=quiz, user=quiz.created_by) for quiz in quizzes
+        ])
+        quiz_by_question = {question.pk: question.quiz_id for question in questions}
+        answers = {}
+        for option in option_rows:
+            answers.setdefault(quiz_by_question[option.question_id], []).append((option.question_id, option.pk))
+
+        try:
+            self.stdout.write(
+                f"{options['writers']} writers x {options['operations']} submits on {connection.vendor}"
+            )
+            if options['mode'] in ('default', 'both'):
+                with self._default_sqlite_settings():
+                    self._run('default', sessions, answers, options)
+            if options['mode'] in ('configured', 'both'):
+                self._run('configured', sessions, answers, options)
+        finally:
+            QuizDeletionService().delete_users(User.objects.filter(pk__in=[user.pk for user in users]))
@@ -0,0 +1,139 @@
+import os
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.core.management.base import BaseCommand
+from ...api.generation_pipeline import build_pipeline, get_pipeline_capacity, get_pipeline_sizes
+
+
+class SimulatedCPU:
+    """Processor-sharing model of transcription: k jobs on c cores each progress at min(1, c/k)"""
+
+    def __init__(self, cores, tick):
+        self.cores = cores
+        self.tick = tick
+        self.active = 0
+        self.peak = 0
+        self.threads = set()
+        self._lock = threading.Lock()
+
+    def run(self, seconds):
+        """Blocks until the given CPU seconds were served"""
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+            # Each thread running transcription holds its own Whisper model
+            self.threads.add(threading.get_ident())
+        remaining = seconds
+        try:
+            while remaining > 0:
+                time.sleep(self.tick)
+                with self._lock:
+                    remaining -= self.tick * min(1, self.cores / self.active)
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+class Command(BaseCommand):
+    help = 'Compares sequential and staged generation with simulated stage durations and equal jobs in flight'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--jobs', type=int, default=40)
+        parser.add_argument('--download-seconds', type=float, default=20, help='Simulated download time per video')
+        parser.add_argument('--asr-seconds', type=float, default=40, help='Simulated transcription CPU time')
+        parser.add_argument('--llm-seconds', type=float, default=10, help='Simulated LLM response time')
+        parser.add_argument('--cores', type=int, default=os.cpu_count() or 1, help='Cores available for transcription')
+        parser.add_argument(
+            '--in-flight', type=int, default=None,
+            help='Jobs in flight for both modes (default: the pipeline capacity, like the admission cap)'
+        )
+        parser.add_argument('--time-scale', type=float, default=0.01, help='Factor applied to all simulated durations')
+
+    def _get_sizes(self, options):
+        """Gets the configured pipeline sizes with one ASR worker per simulated core"""
+        sizes = get_pipeline_sizes()
+        sizes['asr'] = (options['cores'], sizes['asr'][1])
+        return sizes
+
+    def _build_stages(self, options, cpu):
+        """Builds simulated stages; downloads and LLM calls wait, transcription uses the CPU"""
+        scale = options['time_scale']
+
+        def download(job):
+            time.sleep(options['download_seconds'] * scale)
+            return job
+
+        def transcribe(job):
+            cpu.run(options['asr_seconds'] * scale)
+            return job
+
+        def generate(job):
+            time.sleep(options['llm_seconds'] * scale)
+            job['quiz_data'] = {'title': job['url']}
+            return job
+
+        return download, transcribe, generate
+
+    def _measure(self, options, in_flight, generate_quiz):
+        """Runs all jobs with the given number in flight and returns elapsed time and latencies"""
+        latencies = []
+
+        def timed(index):
+            start = time.perf_counter()
+            generate_quiz(index)
+            latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=in_flight) as executor:
+            for future in [executor.submit(timed, index) for index in range(options['jobs'])]:
+                future.result()
+        return time.perf_counter() - start, latencies
+
+    def _run_sequential(self, options, in_flight):
+        """Runs every job through all stages on its request thread, like generate_quiz_from_youtube"""
+        cpu = SimulatedCPU(options['cores'], options['time_scale'] / 2)
+        stages = self._build_stages(options, cpu)
+
+        def generate_quiz(index):
+            job = {'url': f'video-{index}'}
+            for stage in stages:
+                job = stage(job)
+
+        return (*self._measure(options, in_flight, generate_quiz), cpu)
+
+    def _run_staged(self, options, in_flight):
+        """Runs the jobs on a staged pipeline"""
+        cpu = SimulatedCPU(options['cores'], options['time_scale'] / 2)
+        pipeline = build_pipeline(*self._build_stages(options, cpu), name='benchmark', sizes=self._get_sizes(options))
+        try:
+            result = self._measure(
+                options, in_flight, lambda index: pipeline.submit({'url': f'video-{index}'}).result()
+            )
+        finally:
+            pipeline.shutdown()
+        return (*result, cpu)
+
+    def _report(self, name, in_flight, result, options):
+        """Prints throughput and latency converted back to unscaled time"""
+        elapsed, latencies, cpu = result
+        scale = options['time_scale']
+        per_hour = options['jobs'] * 3600 * scale / elapsed
+        self.stdout.write(
+            f'{name:<12} {in_flight:>9} {per_hour:>11.1f} {statistics.median(latencies) / scale:>11.0f}s '
+            f'{cpu.peak:>9} {len(cpu.threads):>7}'
+        )
+
+    def handle(self, *args, **options):
+        """Runs sequential generation capped at the cores and both modes at equal jobs in flight"""
+        sizes = self._get_sizes(options)
+        in_flight = options['in_flight'] or get_pipeline_capacity(sizes)
+        self.stdout.write(
+            f"download {options['download_seconds']}s, asr {options['asr_seconds']}s, "
+            f"llm {options['llm_seconds']}s, {options['cores']} core(s), {options['jobs']} jobs"
+        )
+        self.stdout.write(f"{'mode':<12} {'in flight':>9} {'quizzes/h':>11} {'p50 latency':>12} {'peak asr':>9} {'models':>7}")
+        self._report('sequential', options['cores'], self._run_sequential(options, options['cores']), options)
+        self._report('sequential', in_flight, self._run_sequential(options, in_flight), options)
+        self._report('staged', in_flight, self._run_staged(options, in_flight), options)
@@ -0,0 +1,84 @@
+import random
+import time
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from ...models import QuizSession, LeaderboardEntry
+from ...api.leaderboard import (
+    RANK_ORDER, get_leaderboard_size, get_naive_leaderboard, rebuild_quiz_leaderboard, record_completed_session
+)
+from ._synthetic import create_synthetic_users, create_synthetic_quizzes
+
+
+class Command(BaseCommand):
+    help = 'Compares the maintained leaderboard against ranking all completed sessions per request'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sessions', type=int, default=1000000)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--reads', type=int, default=50, help='Leaderboard reads per strategy')
+        parser.add_argument('--completions', type=int, default=1000, help='Incremental inserts to time')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def _create_sessions(self, quiz, user, count, batch_size, rng):
+        """Bulk inserts completed sessions with random scores and durations"""
+        now = timezone.now()
+        created = 0
+        while created < count:
+            size = min(batch_size, count - created)
+            batch = []
+            for _ in range(size):
+                correct = rng.randint(0, 10)
+                batch.append(QuizSession(
+                    quiz=quiz, user=user, is_completed=True,
+                    completed_at=now + timedelta(seconds=rng.randint(30, 1800)),
+                    correct_answers=correct, total_questions=10, percentage=correct * 10.0,
+                ))
+            QuizSession.objects.bulk_create(batch)
+            created += size
+            self.stdout.write(f'  {created} sessions', ending='\r')
+        self.stdout.write('')
+
+    def _time(self, func, repeat):
+        """Returns average milliseconds per call"""
+        start = time.perf_counter()
+        for _ in range(repeat):
+            func()
+        return (time.perf_counter() - start) * 1000 / repeat
+
+    def handle(self, *args, **options):
+        """Builds the dataset, measures both strategies and rolls back"""
+        rng = random.Random(options['seed'])
+        size = get_leaderboard_size()
+        with transaction.atomic():
+            user = create_synthetic_users(1, prefix='leaderboard_bench')[0]
+            quiz = create_synthetic_quizzes([user], 1, 10)[0][0]
+
+            start = time.perf_counter()
+            self._create_sessions(quiz, user, options['sessions'], options['batch_size'], rng)
+            self.stdout.write(f"Inserted {options['sessions']} sessions in {time.perf_counter() - start:.1f}s")
+
+            start = time.perf_counter()
+            rebuild_quiz_leaderboard(quiz.pk)
+            self.stdout.write(f'Rebuild: {time.perf_counter() - start:.2f}s')
+
+            naive_ms = self._time(lambda: get_naive_leaderboard(quiz.pk, size), options['reads'])
+            maintained_ms = self._time(
+                lambda: list(LeaderboardEntry.objects.filter(quiz=quiz).order_by(*RANK_ORDER)
+                             .values('id', 'user_id', 'percentage', 'duration')[:size]),
+                options['reads']
+            )
+            self.stdout.write(f'Naive ORDER BY read:     {naive_ms:10.3f} ms')
+            self.stdout.write(f'Maintained leaderboard:  {maintained_ms:10.3f} ms')
+
+            completions = list(
+                QuizSession.objects.filter(quiz=quiz).order_by('?')[:options['completions']]
+            )
+            start = time.perf_counter()
+            for session in completions:
+                record_completed_session(session)
+            insert_ms = (time.perf_counter() - start) * 1000 / max(len(completions), 1)
+            self.stdout.write(f'Incremental update:      {insert_ms:10.3f} ms per completion')
+            self.stdout.write(self.style.SUCCESS(f'Read speedup: {naive_ms / maintained_ms:.1f}x'))
+            transaction.set_rollback(True)
@@ -0,0 +1,83 @@
+import time
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from ...models import Quiz, QuizSession, QuizAnswer
+from ._synthetic import create_synthetic_dataset
+
+
+INDEX_MARKERS = ('USING INDEX', 'USING COVERING INDEX', 'USING INTEGER PRIMARY KEY', 'Index Scan', 'Index Only Scan', 'Bitmap Index Scan')
+
+
+class Command(BaseCommand):
+    help = 'Runs EXPLAIN on the hot session, answer and quiz list queries against a synthetic dataset'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100)
+        parser.add_argument('--quizzes-per-user', type=int, default=20)
+        parser.add_argument('--questions-per-quiz', type=int, default=10)
+        parser.add_argument('--sessions-per-quiz', type=int, default=3)
+        parser.add_argument('--repeat', type=int, default=200, help='Executions per query for timing')
+        parser.add_argument('--keep', action='store_true', help='Keep the synthetic data instead of rolling back')
+
+    def _hot_queries(self, user, quiz, session, question):
+        """Returns the hot queries of the play and list endpoints"""
+        return [
+            ('get_or_create_quiz_session', QuizSession.objects.filter(quiz=quiz, user=user, is_completed=False)),
+            ('get_completed_quiz_session', QuizSession.objects.filter(id=session.pk, user=user, is_completed=True)),
+            ('save_quiz_answer', QuizAnswer.objects.filter(session=session, question=question)),
+            ('QuizListView', Quiz.objects.filter(created_by=user).order_by('-created_at', '-id')),
+        ]
+
+    def _time_query(self, queryset, repeat):
+        """Returns average execution time in milliseconds"""
+        start = time.perf_counter()
+        for _ in range(repeat):
+            list(queryset.all())
+        return (time.perf_counter() - start) * 1000 / repeat
+
+    def _report(self, name, queryset, repeat):
+        """Prints plan and timing for one query"""
+        plan = queryset.explain()
+        uses_index = any(marker in plan for marker in INDEX_MARKERS)
+        average_ms = self._time_query(queryset, repeat)
+        style = self.style.SUCCESS if uses_index else self.style.ERROR
+        self.stdout.write(style(f'{name}: {"index" if uses_index else "NO INDEX"}, {average_ms:.3f} ms/query'))
+        for line in plan.splitlines():
+            self.stdout.write(f'    {line}')
+        return uses_index
+
+    def handle(self, *args, **options):
+        """Builds the dataset, explains the hot queries and rolls back"""
+        with transaction.atomic():
+            start = time.perf_counter()
+            users, quizzes, questions, sessions = create_synthetic_dataset(
+                options['users'],
+                options['quizzes_per_user'],
+                options['questions_per_quiz'],
+                options['sessions_per_quiz'],
+            )
+            self.stdout.write(
+                f'Created {len(users)} users, {len(quizzes)} quizzes, {len(questions)} questions '
+                f'and {len(sessions)} sessions in {time.perf_counter() - start:.1f}s '
+                f'on {connection.vendor}'
+            )
+            if connection.vendor == 'sqlite':
+                with connection.cursor() as cursor:
+                    cursor.execute('ANALYZE')
+
+            session = sessions[len(sessions) // 2]
+            quiz = next(item for item in quizzes if item.pk == session.quiz_id)
+            user = next(item for item in users if item.pk == quiz.created_by_id)
+            question = next(item for item in questions if item.quiz_id == quiz.pk)
+
+            results = [
+                self._report(name, queryset, options['repeat'])
+                for name, queryset in self._hot_queries(user, quiz, session, question)
+            ]
+            if not options['keep']:
+                transaction.set_rollback(True)
+
+        if all(results):
+            self.stdout.write(self.style.SUCCESS('All hot queries use an index.'))
+        else:
+            self.stdout.write(self.style.WARNING('Some hot queries do not use an index.'))
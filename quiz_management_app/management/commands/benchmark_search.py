@@ -0,0 +1,95 @@
+import random
+import time
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+from ...models import Quiz, Question
+from ...api.search import rebuild_search_index, search_quiz_ids
+from ._synthetic import create_synthetic_users
+
+
+WORDS = (
+    'python', 'django', 'datenbank', 'netzwerk', 'sicherheit', 'algorithmus', 'geschichte',
+    'physik', 'chemie', 'biologie', 'mathematik', 'musik', 'sprache', 'wirtschaft', 'energie',
+    'klima', 'planet', 'galaxie', 'computer', 'internet', 'roboter', 'medizin', 'sport', 'kunst',
+)
+
+
+class Command(BaseCommand):
+    help = 'Compares icontains scans against the full-text index on synthetic quizzes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--quizzes', type=int, default=100000)
+        parser.add_argument('--questions-per-quiz', type=int, default=5)
+        parser.add_argument('--queries', type=int, default=50)
+        parser.add_argument('--batch-size', type=int, default=2000)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def _sentence(self, rng, length):
+        """Builds a random sentence from the benchmark vocabulary"""
+        return ' '.join(rng.choice(WORDS) + str(rng.randint(0, 500)) for _ in range(length))
+
+    def _create_dataset(self, user, options, rng):
+        """Bulk inserts quizzes with random text and their questions"""
+        batch_size = options['batch_size']
+        created = 0
+        while created < options['quizzes']:
+            size = min(batch_size, options['quizzes'] - created)
+            quizzes = Quiz.objects.bulk_create([
+                Quiz(
+                    title=self._sentence(rng, 4),
+                    description=self._sentence(rng, 12),
+                    transcript=self._sentence(rng, 80),
+                    video_url='https://www.youtube.com/watch?v=search',
+                    created_by=user,
+                )
+                for _ in range(size)
+            ])
+            Question.objects.bulk_create([
+                Question(quiz=quiz, question_title=self._sentence(rng, 8))
+                for quiz in quizzes
+                for _ in range(options['questions_per_quiz'])
+            ])
+            created += size
+            self.stdout.write(f'  {created} quizzes', ending='\r')
+        self.stdout.write('')
+
+    def _icontains_search(self, query, user, limit):
+        """Matches every term with icontains across quiz and question text"""
+        queryset = Quiz.objects.filter(created_by=user)
+        for term in query.split():
+            queryset = queryset.filter(
+                Q(title__icontains=term) | Q(description__icontains=term)
+                | Q(transcript__icontains=term) | Q(questions__question_title__icontains=term)
+            )
+        return list(queryset.distinct().values_list('pk', flat=True)[:limit])
+
+    def _measure(self, name, func, queries):
+        """Runs func over all queries and reports the average latency"""
+        start = time.perf_counter()
+        hits = sum(len(func(query)) for query in queries)
+        elapsed = (time.perf_counter() - start) * 1000 / len(queries)
+        self.stdout.write(f'{name:<12} {elapsed:10.2f} ms/query  ({hits} hits)')
+        return elapsed
+
+    def handle(self, *args, **options):
+        """Builds the dataset, indexes it, measures both strategies and rolls back"""
+        rng = random.Random(options['seed'])
+        with transaction.atomic():
+            user = create_synthetic_users(1, prefix='search_bench')[0]
+            start = time.perf_counter()
+            self._create_dataset(user, options, rng)
+            self.stdout.write(f'Inserted {options["quizzes"]} quizzes in {time.perf_counter() - start:.1f}s')
+
+            start = time.perf_counter()
+            rebuild_search_index(batch_size=options['batch_size'])
+            self.stdout.write(f'Indexed in {time.perf_counter() - start:.1f}s')
+
+            queries = [
+                ' '.join(rng.choice(WORDS) + str(rng.randint(0, 500)) for _ in range(rng.randint(1, 2)))
+                for _ in range(options['queries'])
+            ]
+            scan_ms = self._measure('icontains', lambda query: self._icontains_search(query, user, 20), queries)
+            index_ms = self._measure('index', lambda query: search_quiz_ids(query, user=user, limit=20), queries)
+            self.stdout.write(self.style.SUCCESS(f'Speedup: {scan_ms / index_ms:.1f}x'))
+            transaction.set_rollback(True)
@@ -0,0 +1,81 @@
+import time
+from django.db import transaction
+from django.db.models import Prefetch
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+from ...models import Quiz, Question, QuestionOption, QuizSession
+from ...api.serializers import QuizDetailSerializer, QuizPlayQuestionSerializer
+from ...api.fast_serializers import serialize_quiz_detail, serialize_play_questions, serialize_quiz_play
+from ...api.renderers import FastJSONRenderer
+from ._synthetic import create_synthetic_users, create_synthetic_quizzes
+
+
+class Command(BaseCommand):
+    help = 'Compares requests per second of the ModelSerializer and fast-path quiz serializers'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--quizzes', type=int, default=50)
+        parser.add_argument('--questions-per-quiz', type=int, default=10)
+        parser.add_argument('--iterations', type=int, default=2000)
+
+    def _legacy_detail(self, quiz_id, user):
+        """Renders quiz detail through QuizDetailSerializer"""
+        quiz = Quiz.objects.prefetch_related('questions__question_options').get(id=quiz_id, created_by=user)
+        return JSONRenderer().render(QuizDetailSerializer(quiz).data)
+
+    def _fast_detail(self, quiz_id, user):
+        """Renders quiz detail through the fast path"""
+        return FastJSONRenderer().render(serialize_quiz_detail(quiz_id, user))
+
+    def _legacy_play(self, session):
+        """Renders play payload through QuizPlayQuestionSerializer"""
+        questions = list(
+            Question.objects.filter(quiz_id=session.quiz_id).order_by('id')
+            .prefetch_related(Prefetch('question_options', queryset=QuestionOption.objects.order_by('id')))
+        )
+        data = QuizPlayQuestionSerializer(questions, many=True).data
+        return JSONRenderer().render(serialize_quiz_play(session, data))
+
+    def _fast_play(self, session):
+        """Renders play payload through the fast path"""
+        return FastJSONRenderer().render(serialize_quiz_play(session, serialize_play_questions(session.quiz_id)))
+
+    def _measure(self, name, func, arguments, iterations):
+        """Runs func over arguments and reports requests per second"""
+        start = time.perf_counter()
+        for index in range(iterations):
+            func(*arguments[index % len(arguments)])
+        elapsed = time.perf_counter() - start
+        rate = iterations / elapsed
+        self.stdout.write(f'{name:<16} {rate:>10.1f} req/s  ({elapsed * 1000 / iterations:.3f} ms/req)')
+        return rate
+
+    def handle(self, *args, **options):
+        """Builds a dataset, checks byte compatibility and measures both paths"""
+        with transaction.atomic():
+            user = create_synthetic_users(1, prefix='serializer_bench')[0]
+            quizzes, _, _ = create_synthetic_quizzes([user], options['quizzes'], options['questions_per_quiz'])
+            sessions = QuizSession.objects.bulk_create([
+                QuizSession(quiz=quiz, user=user, current_question_index=1) for quiz in quizzes
+            ])
+
+            detail_arguments = [(quiz.pk, user) for quiz in quizzes]
+            play_arguments = [(session,) for session in sessions]
+
+            for quiz_id, quiz_user in detail_arguments:
+                if self._legacy_detail(quiz_id, quiz_user) != self._fast_detail(quiz_id, quiz_user):
+                    raise AssertionError(f'Detail output differs for quiz {quiz_id}')
+            for (session,) in play_arguments:
+                if self._legacy_play(session) != self._fast_play(session):
+                    raise AssertionError(f'Play output differs for session {session.pk}')
+            self.stdout.write(self.style.SUCCESS('Fast-path output is byte-identical.'))
+
+            iterations = options['iterations']
+            legacy_detail = self._measure('detail legacy', self._legacy_detail, detail_arguments, iterations)
+            fast_detail = self._measure('detail fast', self._fast_detail, detail_arguments, iterations)
+            legacy_play = self._measure('play legacy', self._legacy_play, play_arguments, iterations)
+            fast_play = self._measure('play fast', self._fast_play, play_arguments, iterations)
+            self.stdout.write(
+                f'Speedup: detail {fast_detail / legacy_detail:.2f}x, play {fast_play / legacy_play:.2f}x'
+            )
+            transaction.set_rollback(True)
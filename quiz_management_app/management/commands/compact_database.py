@@ -0,0 +1,35 @@
+from datetime import timedelta
+from django.core.management.base import BaseCommand, CommandError
+from core.compaction import compact_database
+
+
+class Command(BaseCommand):
+    help = 'Deletes expired JWT tokens and stale unfinished quiz sessions in bounded batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=None, help='Rows per transaction (default: COMPACTION_BATCH_SIZE)')
+        parser.add_argument(
+            '--session-days', type=float, default=None,
+            help='Age in days after which unanswered open sessions are removed (default: COMPACTION_STALE_SESSION_DAYS)'
+        )
+
+    def handle(self, *args, **options):
+        """Runs one compaction pass and reports removed rows and time spent"""
+        if options['batch_size'] is not None and options['batch_size'] < 1:
+            raise CommandError('--batch-size must be positive.')
+        session_max_age = None
+        if options['session_days'] is not None:
+            session_max_age = timedelta(days=options['session_days'])
+
+        totals, elapsed = compact_database(
+            batch_size=options['batch_size'],
+            session_max_age=session_max_age,
+            progress=lambda totals: self.stdout.write(
+                ', '.join(f'{label}: {count}' for label, count in totals.items())
+            )
+        )
+        for label, count in totals.items():
+            self.stdout.write(f'{label:<40} {count:>10}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Removed {sum(totals.values())} rows in {elapsed:.1f}s'
+        ))
@@ -0,0 +1,28 @@
+import time
+from django.core.management.base import BaseCommand
+from ...api.leaderboard import rebuild_leaderboards
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the bounded per-quiz leaderboards from completed sessions'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--quiz', type=int, action='append', dest='quiz_ids', help='Limit to quiz id (repeatable)')
+        parser.add_argument('--size', type=int, default=None, help='Entries per quiz (default: QUIZ_LEADERBOARD_SIZE)')
+        parser.add_argument('--batch-size', type=int, default=500, help='Quizzes per progress report')
+
+    def handle(self, *args, **options):
+        """Runs the rebuild and reports progress"""
+        start = time.perf_counter()
+        totals = rebuild_leaderboards(
+            quiz_ids=options['quiz_ids'],
+            size=options['size'],
+            batch_size=options['batch_size'],
+            progress=lambda totals: self.stdout.write(
+                f"{totals['quizzes']} quizzes, {totals['entries']} entries"
+            )
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt {totals['entries']} entries for {totals['quizzes']} quizzes "
+            f"in {time.perf_counter() - start:.1f}s"
+        ))
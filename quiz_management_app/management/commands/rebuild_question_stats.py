@@ -0,0 +1,26 @@
+import time
+from django.core.management.base import BaseCommand
+from ...api.question_stats import rebuild_question_stats
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the materialised per-option answer statistics in quiz batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100, help='Quizzes per transaction')
+        parser.add_argument('--quiz', type=int, action='append', dest='quiz_ids', help='Limit to quiz id (repeatable)')
+
+    def handle(self, *args, **options):
+        """Runs the batched rebuild and reports progress"""
+        start = time.perf_counter()
+        totals = rebuild_question_stats(
+            batch_size=options['batch_size'],
+            quiz_ids=options['quiz_ids'],
+            progress=lambda totals: self.stdout.write(
+                f"{totals['quizzes']} quizzes, {totals['rows']} stats rows"
+            )
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt {totals['rows']} stats rows for {totals['quizzes']} quizzes "
+            f"in {time.perf_counter() - start:.1f}s"
+        ))
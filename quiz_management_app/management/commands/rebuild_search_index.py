@@ -0,0 +1,23 @@
+import time
+from django.core.management.base import BaseCommand, CommandError
+from ...api.search import is_search_index_available, rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the full-text search index over quizzes, questions and transcripts'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Quizzes per index statement')
+
+    def handle(self, *args, **options):
+        """Re-indexes all quizzes and reports progress"""
+        if not is_search_index_available():
+            raise CommandError('The database backend has no full-text search index.')
+        start = time.perf_counter()
+        total = rebuild_search_index(
+            batch_size=options['batch_size'],
+            progress=lambda total: self.stdout.write(f'{total} quizzes indexed')
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Indexed {total} quizzes in {time.perf_counter() - start:.1f}s'
+        ))
@@ -0,0 +1,60 @@
+# Generated by Django 5.2.5 on 2026-10-19 09:43
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Max
+
+
+def remove_duplicate_rows(apps, schema_editor):
+    """Removes duplicate open sessions and answers so the unique constraints can be created"""
+    QuizSession = apps.get_model('quiz_management_app', 'QuizSession')
+    QuizAnswer = apps.get_model('quiz_management_app', 'QuizAnswer')
+
+    open_duplicates = (
+        QuizSession.objects.filter(is_completed=False)
+        .values('quiz_id', 'user_id')
+        .annotate(newest_id=Max('id'), total=Count('id'))
+        .filter(total__gt=1)
+    )
+    for row in open_duplicates:
+        QuizSession.objects.filter(
+            quiz_id=row['quiz_id'], user_id=row['user_id'], is_completed=False
+        ).exclude(id=row['newest_id']).delete()
+
+    answer_duplicates = (
+        QuizAnswer.objects.values('session_id', 'question_id')
+        .annotate(newest_id=Max('id'), total=Count('id'))
+        .filter(total__gt=1)
+    )
+    for row in answer_duplicates:
+        QuizAnswer.objects.filter(
+            session_id=row['session_id'], question_id=row['question_id']
+        ).exclude(id=row['newest_id']).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz_management_app', '0003_quizsession_quizanswer'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_rows, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='quiz',
+            index=models.Index(fields=['created_by', '-created_at', '-id'], name='quiz_owner_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='quizsession',
+            index=models.Index(fields=['quiz', 'user', 'is_completed'], name='session_quiz_user_state_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='quizanswer',
+            constraint=models.UniqueConstraint(fields=('session', 'question'), name='unique_answer_per_question'),
+        ),
+        migrations.AddConstraint(
+            model_name='quizsession',
+            constraint=models.UniqueConstraint(condition=models.Q(('is_completed', False)), fields=('quiz', 'user'), name='unique_open_session_per_user'),
+        ),
+    ]
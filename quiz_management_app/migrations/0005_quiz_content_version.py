@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-19 09:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz_management_app', '0004_session_answer_indexes_and_constraints'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quiz',
+            name='content_version',
+            field=models.PositiveIntegerField(default=1),
+        ),
+    ]
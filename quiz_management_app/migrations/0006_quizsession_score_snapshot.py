@@ -0,0 +1,71 @@
+# Generated by Django 5.2.5 on 2026-10-19 09:50
+
+from django.db import migrations, models
+from django.db.models import Count, F
+from rest_framework import serializers
+
+
+def backfill_score_snapshots(apps, schema_editor):
+    """Stores score snapshots for sessions completed before snapshots existed"""
+    QuizSession = apps.get_model('quiz_management_app', 'QuizSession')
+    QuizAnswer = apps.get_model('quiz_management_app', 'QuizAnswer')
+    datetime_field = serializers.DateTimeField()
+
+    sessions = (
+        QuizSession.objects.filter(is_completed=True, percentage__isnull=True)
+        .annotate(question_total=Count('quiz__questions'))
+    )
+    for session in sessions.iterator(chunk_size=500):
+        rows = (
+            QuizAnswer.objects.filter(session_id=session.pk).order_by('id')
+            .values('id', 'question_id', 'selected_option_id', 'answered_at', correct=F('selected_option__is_correct'))
+        )
+        answers = [
+            {
+                'id': row['id'],
+                'question': row['question_id'],
+                'selected_option': row['selected_option_id'],
+                'answered_at': datetime_field.to_representation(row['answered_at']),
+                'is_correct': row['correct'],
+            }
+            for row in rows
+        ]
+        correct = sum(1 for answer in answers if answer['is_correct'])
+        total = session.question_total
+        QuizSession.objects.filter(pk=session.pk).update(
+            correct_answers=correct,
+            total_questions=total,
+            percentage=round((correct / total) * 100, 1) if total else 0,
+            answer_snapshot=answers,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz_management_app', '0005_quiz_content_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quizsession',
+            name='answer_snapshot',
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='quizsession',
+            name='correct_answers',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='quizsession',
+            name='percentage',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='quizsession',
+            name='total_questions',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.RunPython(backfill_score_snapshots, migrations.RunPython.noop),
+    ]
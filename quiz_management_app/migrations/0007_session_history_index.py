@@ -0,0 +1,19 @@
+# Generated by Django 5.2.5 on 2026-10-19 09:51
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz_management_app', '0006_quizsession_score_snapshot'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='quizsession',
+            index=models.Index(fields=['user', '-started_at', '-id'], name='session_user_started_idx'),
+        ),
+    ]
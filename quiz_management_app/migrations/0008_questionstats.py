@@ -0,0 +1,61 @@
+# Generated by Django 5.2.5 on 2026-10-19 09:51
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_question_stats(apps, schema_editor):
+    """Builds the answer counters of all options from the answers stored before the stats existed"""
+    Quiz = apps.get_model('quiz_management_app', 'Quiz')
+    QuestionOption = apps.get_model('quiz_management_app', 'QuestionOption')
+    QuizAnswer = apps.get_model('quiz_management_app', 'QuizAnswer')
+    QuestionStats = apps.get_model('quiz_management_app', 'QuestionStats')
+
+    quiz_ids = list(Quiz.objects.order_by('pk').values_list('pk', flat=True))
+    for start in range(0, len(quiz_ids), 100):
+        batch = quiz_ids[start:start + 100]
+        counts = dict(
+            QuizAnswer.objects.filter(question__quiz_id__in=batch)
+            .order_by()
+            .values_list('selected_option')
+            .annotate(total=Count('id'))
+        )
+        options = (
+            QuestionOption.objects.filter(question__quiz_id__in=batch)
+            .values_list('id', 'question_id', 'question__quiz_id')
+        )
+        QuestionStats.objects.bulk_create([
+            QuestionStats(
+                quiz_id=quiz_id,
+                question_id=question_id,
+                option_id=option_id,
+                answer_count=counts.get(option_id, 0)
+            )
+            for option_id, question_id, quiz_id in options
+        ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz_management_app', '0007_session_history_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QuestionStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('answer_count', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('option', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='stats', to='quiz_management_app.questionoption')),
+                ('question', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stats', to='quiz_management_app.question')),
+                ('quiz', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='question_stats', to='quiz_management_app.quiz')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['quiz', 'question'], name='stats_quiz_question_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_question_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 5.2.5 on 2026-10-19 09:53
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import DurationField, ExpressionWrapper, F
+
+
+def backfill_leaderboards(apps, schema_editor):
+    """Fills the leaderboards with the top sessions completed before the leaderboard existed"""
+    Quiz = apps.get_model('quiz_management_app', 'Quiz')
+    QuizSession = apps.get_model('quiz_management_app', 'QuizSession')
+    LeaderboardEntry = apps.get_model('quiz_management_app', 'LeaderboardEntry')
+    size = getattr(settings, 'QUIZ_LEADERBOARD_SIZE', 100)
+
+    for quiz_id in Quiz.objects.order_by('pk').values_list('pk', flat=True).iterator():
+        sessions = (
+            QuizSession.objects.filter(
+                quiz_id=quiz_id, is_completed=True, percentage__isnull=False, completed_at__isnull=False
+            )
+            .annotate(duration=ExpressionWrapper(F('completed_at') - F('started_at'), output_field=DurationField()))
+            .order_by('-percentage', 'duration', 'completed_at', 'id')
+            .values('id', 'user_id', 'percentage', 'duration', 'completed_at')[:size]
+        )
+        LeaderboardEntry.objects.bulk_create([
+            LeaderboardEntry(
+                quiz_id=quiz_id,
+                session_id=session['id'],
+                user_id=session['user_id'],
+                percentage=session['percentage'],
+                duration=session['duration'],
+                completed_at=session['completed_at'],
+            )
+            for session in sessions
+        ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz_management_app', '0008_questionstats'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeaderboardEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('percentage', models.FloatField()),
+                ('duration', models.DurationField()),
+                ('completed_at', models.DateTimeField()),
+                ('quiz', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='leaderboard_entries', to='quiz_management_app.quiz')),
+                ('session', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='leaderboard_entry', to='quiz_management_app.quizsession')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['quiz', '-percentage', 'duration', 'completed_at', 'id'], name='leaderboard_rank_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_leaderboards, migrations.RunPython.noop),
+    ]
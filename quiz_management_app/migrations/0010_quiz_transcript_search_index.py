@@ -0,0 +1,56 @@
+# Generated by Django 5.2.5 on 2026-10-19 10:03
+
+from django.db import migrations, models
+
+
+CREATE_INDEX_SQL = {
+    'sqlite': [
+        "CREATE VIRTUAL TABLE quiz_search_index USING fts5("
+        "title, description, questions, transcript, tokenize = 'unicode61 remove_diacritics 2')",
+        "INSERT INTO quiz_search_index (rowid, title, description, questions, transcript) "
+        "SELECT q.id, q.title, q.description, "
+        "COALESCE((SELECT group_concat(question_title, ' ') FROM quiz_management_app_question "
+        "WHERE quiz_id = q.id), ''), q.transcript "
+        "FROM quiz_management_app_quiz q",
+    ],
+    'postgresql': [
+        "CREATE TABLE quiz_search_index (quiz_id integer PRIMARY KEY, document tsvector NOT NULL)",
+        "CREATE INDEX quiz_search_index_document_idx ON quiz_search_index USING GIN (document)",
+        "INSERT INTO quiz_search_index (quiz_id, document) "
+        "SELECT q.id, "
+        "setweight(to_tsvector('simple', q.title), 'A') || "
+        "setweight(to_tsvector('simple', q.description), 'B') || "
+        "setweight(to_tsvector('simple', COALESCE((SELECT string_agg(question_title, ' ') "
+        "FROM quiz_management_app_question WHERE quiz_id = q.id), '')), 'C') || "
+        "setweight(to_tsvector('simple', q.transcript), 'D') "
+        "FROM quiz_management_app_quiz q",
+    ],
+}
+
+
+def create_search_index(apps, schema_editor):
+    """Creates and fills the full-text index on backends that support one"""
+    for statement in CREATE_INDEX_SQL.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(statement)
+
+
+def drop_search_index(apps, schema_editor):
+    """Drops the full-text index"""
+    if schema_editor.connection.vendor in CREATE_INDEX_SQL:
+        schema_editor.execute("DROP TABLE IF EXISTS quiz_search_index")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz_management_app', '0009_leaderboardentry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quiz',
+            name='transcript',
+            field=models.TextField(blank=True, default=''),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -10,6 +10,13 @@ class Quiz(models.Model):
     created_by = models.ForeignKey(User, on_delete=models.CASCADE)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    content_version = models.PositiveIntegerField(default=1)
+    transcript = models.TextField(blank=True, default='')
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_by', '-created_at', '-id'], name='quiz_owner_created_idx'),
+        ]
 
     def __str__(self):
         """String representation of quiz"""
@@ -47,6 +54,23 @@ class QuizSession(models.Model):
     completed_at = models.DateTimeField(null=True, blank=True)
     is_completed = models.BooleanField(default=False)
     current_question_index = models.IntegerField(default=0)
+    correct_answers = models.PositiveIntegerField(null=True, blank=True)
+    total_questions = models.PositiveIntegerField(null=True, blank=True)
+    percentage = models.FloatField(null=True, blank=True)
+    answer_snapshot = models.JSONField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['quiz', 'user', 'is_completed'], name='session_quiz_user_state_idx'),
+            models.Index(fields=['user', '-started_at', '-id'], name='session_user_started_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['quiz', 'user'],
+                condition=models.Q(is_completed=False),
+                name='unique_open_session_per_user',
+            ),
+        ]
     
     def __str__(self):
         """String representation of quiz session"""
@@ -73,6 +97,11 @@ class QuizAnswer(models.Model):
     question = models.ForeignKey(Question, on_delete=models.CASCADE)
     selected_option = models.ForeignKey(QuestionOption, on_delete=models.CASCADE)
     answered_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['session', 'question'], name='unique_answer_per_question'),
+        ]
     
     def __str__(self):
         """String representation of quiz answer"""
@@ -80,4 +109,41 @@ class QuizAnswer(models.Model):
 
     def is_correct(self):
         """Checks if the selected option is correct"""
-        return self.selected_option.is_correct
\ No newline at end of file
+        return self.selected_option.is_correct
+
+
+class QuestionStats(models.Model):
+    """Model holding the materialised answer count of a question option"""
+    quiz = models.ForeignKey(Quiz, related_name='question_stats', on_delete=models.CASCADE)
+    question = models.ForeignKey(Question, related_name='stats', on_delete=models.CASCADE)
+    option = models.OneToOneField(QuestionOption, related_name='stats', on_delete=models.CASCADE)
+    answer_count = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['quiz', 'question'], name='stats_quiz_question_idx'),
+        ]
+
+    def __str__(self):
+        """String representation of question stats"""
+        return f"{self.option_id}: {self.answer_count}"
+
+
+class LeaderboardEntry(models.Model):
+    """Model holding a ranked completed session in the bounded leaderboard of a quiz"""
+    quiz = models.ForeignKey(Quiz, related_name='leaderboard_entries', on_delete=models.CASCADE)
+    session = models.OneToOneField(QuizSession, related_name='leaderboard_entry', on_delete=models.CASCADE)
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    percentage = models.FloatField()
+    duration = models.DurationField()
+    completed_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['quiz', '-percentage', 'duration', 'completed_at', 'id'], name='leaderboard_rank_idx'),
+        ]
+
+    def __str__(self):
+        """String representation of leaderboard entry"""
+        return f"{self.quiz_id}: {self.user_id} - {self.percentage}"
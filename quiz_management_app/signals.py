@@ -0,0 +1,67 @@
+from functools import partial
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+from .models import Quiz, Question, QuestionOption
+from .api.payload_cache import invalidate_quiz_payloads
+from .api.search import index_quiz
+
+
+def _schedule_once(action, key):
+    """Runs action after commit, once per key and transaction"""
+    connection = transaction.get_connection()
+    if connection.in_atomic_block:
+        for _, callback, _ in connection.run_on_commit:
+            if getattr(callback, 'quiz_signal_key', None) == (action.__name__, key):
+                return
+    callback = partial(action, key)
+    callback.quiz_signal_key = (action.__name__, key)
+    transaction.on_commit(callback)
+
+
+def bump_quiz_content_version(quiz_id):
+    """Marks a quiz as changed after its questions or options changed"""
+    Quiz.objects.filter(pk=quiz_id).update(
+        content_version=F('content_version') + 1,
+        updated_at=timezone.now()
+    )
+    invalidate_quiz_payloads(quiz_id)
+
+
+def bump_question_quiz_content_version(question_id):
+    """Marks the quiz of a question as changed"""
+    quiz_id = Question.objects.filter(pk=question_id).values_list('quiz_id', flat=True).first()
+    if quiz_id is not None:
+        bump_quiz_content_version(quiz_id)
+
+
+@receiver(post_save, sender=Quiz)
+@receiver(post_delete, sender=Quiz)
+def quiz_changed(sender, instance, raw=False, created=False, **kwargs):
+    """Re-indexes a saved quiz and drops cached payloads when it is updated or deleted"""
+    if raw:
+        return
+    _schedule_once(index_quiz, instance.pk)
+    if not created:
+        _schedule_once(invalidate_quiz_payloads, instance.pk)
+
+
+@receiver(post_save, sender=Question)
+@receiver(post_delete, sender=Question)
+def question_changed(sender, instance, raw=False, **kwargs):
+    """Bumps quiz content version and re-indexes the quiz when a question changes"""
+    if raw:
+        return
+    _schedule_once(bump_quiz_content_version, instance.quiz_id)
+    _schedule_once(index_quiz, instance.quiz_id)
+
+
+@receiver(post_save, sender=QuestionOption)
+@receiver(post_delete, sender=QuestionOption)
+def question_option_changed(sender, instance, raw=False, **kwargs):
+    """Bumps quiz content version when an option changes"""
+    if raw:
+        return
+    _schedule_once(bump_question_quiz_content_version, instance.question_id)
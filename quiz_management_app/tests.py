@@ -1,3 +1,462 @@
-from django.test import TestCase
+import importlib
+import threading
+import time
+from datetime import timedelta
+from django.apps import apps
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from .api.generation_admission import FairShareAdmission, GenerationRejected
+from .api.generation_dedup import (
+    IdempotencyConflict, SingleFlight, begin_idempotent_request, complete_idempotent_request, generation_flights,
+    get_dedup_stats, release_idempotent_request
+)
+from .api.generation_jobs import CancellationToken, GenerationCancelled, check_cancelled
+from .api.fast_serializers import get_play_questions
+from .api.leaderboard import rebuild_quiz_leaderboard, record_completed_session
+from .api.payload_cache import get_quiz_payload, invalidate_quiz_payloads
+from .api.question_stats import get_quiz_analytics
+from .api.quiz_utils import save_quiz_answer
+from .models import LeaderboardEntry, Question, QuestionOption, QuestionStats, Quiz, QuizAnswer, QuizSession
 
-# Create your tests here.
+
+def wait_until(condition, timeout=2):
+    """Polls condition until it holds or the timeout passes"""
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("Condition not reached in time")
+        time.sleep(0.005)
+
+
+def create_quiz(user, questions=2, options=3):
+    """Creates a quiz whose first option of every question is correct"""
+    quiz = Quiz.objects.create(title='Quiz', video_url='https://youtu.be/dQw4w9WgXcQ', created_by=user)
+    for index in range(questions):
+        question = Question.objects.create(quiz=quiz, question_title=f'Question {index}')
+        for option in range(options):
+            QuestionOption.objects.create(question=question, option_text=f'Option {option}', is_correct=option == 0)
+    return quiz
+
+
+def create_players(quiz, count):
+    """Creates users with a completed session of the quiz each"""
+    return [
+        QuizSession.objects.create(
+            quiz=quiz, user=User.objects.create_user(f'player{index}', password='pw'), is_completed=True
+        )
+        for index in range(count)
+    ]
+
+
+class FairShareAdmissionTests(SimpleTestCase):
+    """Tests ordering, rejection and timeouts of the generation admission"""
+
+    def _queue_waiter(self, admission, user_id, order, weight=1):
+        """Starts a thread that records the user once admitted and releases right away"""
+        def run():
+            admission.acquire(user_id, weight)
+            order.append(user_id)
+            admission.release(user_id, 0.01)
+
+        queued = admission.get_stats()['queued_now']
+        thread = threading.Thread(target=run)
+        thread.start()
+        wait_until(lambda: admission.get_stats()['queued_now'] == queued + 1)
+        return thread
+
+    def test_admits_immediately_with_free_slot(self):
+        """A request with a free slot does not wait"""
+        admission = FairShareAdmission(2, 1, 10, 3, 5)
+        self.assertEqual(admission.acquire('a'), 0.0)
+        self.assertEqual(admission.get_stats()['running'], 1)
+
+    def test_other_user_overtakes_queued_backlog(self):
+        """A user with a backlog does not starve a user who has not run yet"""
+        admission = FairShareAdmission(1, 1, 10, 3, 5)
+        admission.acquire('blocker')
+        order = []
+        threads = [
+            self._queue_waiter(admission, 'a', order),
+            self._queue_waiter(admission, 'a', order),
+            self._queue_waiter(admission, 'b', order),
+        ]
+        admission.release('blocker', 0.01)
+        for thread in threads:
+            thread.join(2)
+        self.assertEqual(order, ['a', 'b', 'a'])
+
+    def test_weight_shortens_finish_tag(self):
+        """A heavier weighted user is admitted before an earlier queued user"""
+        admission = FairShareAdmission(1, 1, 10, 3, 5)
+        admission.acquire('blocker')
+        order = []
+        threads = [
+            self._queue_waiter(admission, 'a', order),
+            self._queue_waiter(admission, 'staff', order, weight=4),
+        ]
+        admission.release('blocker', 0.01)
+        for thread in threads:
+            thread.join(2)
+        self.assertEqual(order, ['staff', 'a'])
+
+    def test_rejects_when_user_queue_full(self):
+        """Requests beyond the per-user queue limit are rejected"""
+        admission = FairShareAdmission(1, 1, 10, 0, 5)
+        admission.acquire('a')
+        with self.assertRaises(GenerationRejected) as context:
+            admission.acquire('b')
+        self.assertEqual(context.exception.reason, 'user')
+        self.assertGreaterEqual(context.exception.retry_after, 1)
+
+    def test_rejects_when_global_queue_full(self):
+        """Requests beyond the global queue limit are rejected"""
+        admission = FairShareAdmission(1, 1, 0, 3, 5)
+        admission.acquire('a')
+        with self.assertRaises(GenerationRejected) as context:
+            admission.acquire('b')
+        self.assertEqual(context.exception.reason, 'global')
+        self.assertEqual(admission.get_stats()['rejected_global'], 1)
+
+    def test_queue_timeout(self):
+        """A queued request gives up after the queue timeout and leaves the queue"""
+        admission = FairShareAdmission(1, 1, 10, 3, 0.05)
+        admission.acquire('a')
+        with self.assertRaises(GenerationRejected) as context:
+            admission.acquire('b')
+        self.assertEqual(context.exception.reason, 'timeout')
+        self.assertEqual(admission.get_stats()['queued_now'], 0)
+
+    def test_cancel_while_queued(self):
+        """Cancelling a queued request wakes it and removes its ticket"""
+        admission = FairShareAdmission(1, 1, 10, 3, 30)
+        admission.acquire('a')
+        token = CancellationToken('b', 'url')
+        threading.Timer(0.05, token.cancel, args=('user',)).start()
+        start = time.monotonic()
+        with self.assertRaises(GenerationCancelled):
+            admission.acquire('b', cancel_token=token)
+        self.assertLess(time.monotonic() - start, 1)
+        self.assertEqual(admission.get_stats()['queued_now'], 0)
+        self.assertEqual(admission.get_stats()['cancelled'], 1)
+
+
+class SingleFlightTests(SimpleTestCase):
+    """Tests that concurrent calls of one key share the leader's outcome"""
+
+    def _run_with_follower(self, func):
+        """Runs func as leader while a second caller of the same key joins, returning both outcomes"""
+        flights = SingleFlight()
+        started = threading.Event()
+        finish = threading.Event()
+        outcomes = {}
+
+        def leader_func():
+            started.set()
+            finish.wait(2)
+            return func()
+
+        def call(name, target):
+            try:
+                outcomes[name] = flights.run('key', target)
+            except Exception as e:
+                outcomes[name] = e
+
+        leader = threading.Thread(target=call, args=('leader', leader_func))
+        leader.start()
+        started.wait(2)
+        follower = threading.Thread(target=call, args=('follower', lambda: self.fail("Follower ran the call")))
+        coalesced = get_dedup_stats()['coalesced']
+        follower.start()
+        wait_until(lambda: get_dedup_stats()['coalesced'] > coalesced)
+        finish.set()
+        leader.join(2)
+        follower.join(2)
+        self.assertFalse(flights.is_running('key'))
+        return outcomes
+
+    def test_follower_shares_result(self):
+        """The follower gets the leader's result marked as shared"""
+        outcomes = self._run_with_follower(lambda: 'quiz')
+        self.assertEqual(outcomes['leader'], ('quiz', False))
+        self.assertEqual(outcomes['follower'], ('quiz', True))
+
+    def test_follower_gets_leader_error(self):
+        """The follower re-raises the leader's error instead of running the call again"""
+        error = ValueError('download failed')
+
+        def fail():
+            raise error
+
+        outcomes = self._run_with_follower(fail)
+        self.assertIs(outcomes['leader'], error)
+        self.assertIs(outcomes['follower'], error)
+
+    def test_sequential_calls_run_again(self):
+        """A key is run again once its previous call finished"""
+        flights = SingleFlight()
+        calls = []
+        for _ in range(2):
+            flights.run('key', lambda: calls.append(1))
+        self.assertEqual(len(calls), 2)
+
+
+class IdempotencyTests(SimpleTestCase):
+    """Tests reservation, conflicts and replay of Idempotency-Key records"""
+
+    def setUp(self):
+        cache.clear()
+
+    def test_first_request_reserves_key(self):
+        """The first request reserves the key and runs"""
+        self.assertIsNone(begin_idempotent_request(1, 'key', 'url-a', 'flight'))
+
+    def test_pending_key_conflicts(self):
+        """A retry while the request is pending elsewhere gets 409 with Retry-After"""
+        begin_idempotent_request(1, 'key', 'url-a', 'flight')
+        with self.assertRaises(IdempotencyConflict) as context:
+            begin_idempotent_request(1, 'key', 'url-a', 'flight')
+        self.assertEqual(context.exception.status_code, 409)
+        self.assertEqual(context.exception.retry_after, 5)
+
+    def test_pending_key_joins_running_flight(self):
+        """A retry while the request runs in this process joins its flight"""
+        begin_idempotent_request(1, 'key', 'url-a', 'flight')
+        running = threading.Event()
+        finish = threading.Event()
+
+        def leader():
+            running.set()
+            finish.wait(2)
+
+        thread = threading.Thread(target=generation_flights.run, args=('flight', leader))
+        thread.start()
+        running.wait(2)
+        try:
+            self.assertIsNone(begin_idempotent_request(1, 'key', 'url-a', 'flight'))
+        finally:
+            finish.set()
+            thread.join(2)
+
+    def test_other_payload_is_rejected(self):
+        """Reusing a key for another payload gets 422"""
+        begin_idempotent_request(1, 'key', 'url-a', 'flight')
+        with self.assertRaises(IdempotencyConflict) as context:
+            begin_idempotent_request(1, 'key', 'url-b', 'flight')
+        self.assertEqual(context.exception.status_code, 422)
+
+    def test_finished_request_is_replayed(self):
+        """A retry after completion gets the stored response"""
+        begin_idempotent_request(1, 'key', 'url-a', 'flight')
+        complete_idempotent_request(1, 'key', 'url-a', 201, {'id': 7})
+        record = begin_idempotent_request(1, 'key', 'url-a', 'flight')
+        self.assertEqual((record['status'], record['data']), (201, {'id': 7}))
+
+    def test_keys_are_scoped_per_user(self):
+        """The same key of another user is independent"""
+        begin_idempotent_request(1, 'key', 'url-a', 'flight')
+        self.assertIsNone(begin_idempotent_request(2, 'key', 'url-b', 'flight'))
+
+    def test_release_allows_retry(self):
+        """A failed request frees its key but keeps finished records"""
+        begin_idempotent_request(1, 'key', 'url-a', 'flight')
+        release_idempotent_request(1, 'key')
+        self.assertIsNone(begin_idempotent_request(1, 'key', 'url-a', 'flight'))
+        complete_idempotent_request(1, 'key', 'url-a', 201, {'id': 7})
+        release_idempotent_request(1, 'key')
+        self.assertEqual(begin_idempotent_request(1, 'key', 'url-a', 'flight')['state'], 'done')
+
+
+class CancellationTokenTests(SimpleTestCase):
+    """Tests the cancellation checks stages run between their steps"""
+
+    def test_enter_stage_records_stage(self):
+        """Entering a stage of a running job records it"""
+        token = CancellationToken(1, 'url')
+        token.enter_stage('download')
+        self.assertEqual(token.stage, 'download')
+        self.assertFalse(token.to_dict()['cancelled'])
+
+    def test_enter_stage_after_cancel_raises(self):
+        """A cancelled job does not start its next stage"""
+        token = CancellationToken(1, 'url')
+        token.enter_stage('download')
+        token.cancel('user')
+        with self.assertRaises(GenerationCancelled) as context:
+            token.enter_stage('transcribe')
+        self.assertEqual(context.exception.reason, 'user')
+        self.assertEqual(token.stage, 'download')
+
+    def test_first_reason_wins(self):
+        """Later cancellations keep the first reason"""
+        token = CancellationToken(1, 'url')
+        token.cancel('disconnect')
+        token.cancel('user')
+        self.assertEqual(token.reason, 'disconnect')
+
+    def test_check_cancelled_without_token(self):
+        """Stages run without a token never cancel"""
+        check_cancelled(None)
+        token = CancellationToken(1, 'url')
+        check_cancelled(token)
+        token.cancel()
+        with self.assertRaises(GenerationCancelled):
+            check_cancelled(token)
+
+    def test_callbacks(self):
+        """Callbacks run once on cancel, right away when added late, and not after removal"""
+        token = CancellationToken(1, 'url')
+        calls = []
+        kept = lambda: calls.append('kept')
+        removed = lambda: calls.append('removed')
+        token.add_callback(kept)
+        token.add_callback(removed)
+        token.remove_callback(removed)
+        token.cancel()
+        token.cancel()
+        token.add_callback(lambda: calls.append('late'))
+        self.assertEqual(calls, ['kept', 'late'])
+
+
+class QuestionStatsTests(TestCase):
+    """Tests the incrementally maintained per-option answer counters"""
+
+    def setUp(self):
+        self.user = User.objects.create_user('owner', password='pw')
+        self.quiz = create_quiz(self.user)
+        self.question = self.quiz.questions.order_by('id').first()
+        self.correct, self.wrong, _ = self.question.question_options.order_by('id')
+
+    def _get_counts(self):
+        """Gets the answer count per option of the first question"""
+        question = get_quiz_analytics(self.quiz.pk)['questions'][0]
+        return {option['id']: option['answer_count'] for option in question['options']}
+
+    def test_answers_are_counted(self):
+        """New and changed answers move the counters of their options"""
+        session = QuizSession.objects.create(quiz=self.quiz, user=self.user)
+        save_quiz_answer(session, self.question, self.wrong)
+        self.assertEqual(self._get_counts()[self.wrong.pk], 1)
+        save_quiz_answer(session, self.question, self.correct)
+        save_quiz_answer(session, self.question, self.correct)
+        counts = self._get_counts()
+        self.assertEqual((counts[self.correct.pk], counts[self.wrong.pk]), (1, 0))
+
+    def test_first_row_includes_existing_answers(self):
+        """A counter created on a later answer starts from the answers stored before it existed"""
+        for session in create_players(self.quiz, 6):
+            QuizAnswer.objects.create(session=session, question=self.question, selected_option=self.correct)
+        session = QuizSession.objects.create(quiz=self.quiz, user=self.user)
+        save_quiz_answer(session, self.question, self.correct)
+        question = get_quiz_analytics(self.quiz.pk)['questions'][0]
+        self.assertEqual(question['total_answers'], 7)
+        self.assertEqual(question['correct_rate'], 1.0)
+
+    def test_migration_backfills_counters(self):
+        """The stats migration counts the answers stored before it"""
+        sessions = create_players(self.quiz, 3)
+        for session, option in zip(sessions, (self.correct, self.correct, self.wrong)):
+            QuizAnswer.objects.create(session=session, question=self.question, selected_option=option)
+        QuestionStats.objects.all().delete()
+        migration = importlib.import_module('quiz_management_app.migrations.0008_questionstats')
+        migration.backfill_question_stats(apps, None)
+        counts = self._get_counts()
+        self.assertEqual((counts[self.correct.pk], counts[self.wrong.pk]), (2, 1))
+        self.assertEqual(QuestionStats.objects.count(), QuestionOption.objects.count())
+
+
+@override_settings(QUIZ_LEADERBOARD_SIZE=3)
+class LeaderboardTests(TestCase):
+    """Tests the bounded per-quiz leaderboard kept at session completion"""
+
+    def setUp(self):
+        self.quiz = create_quiz(User.objects.create_user('owner', password='pw'))
+        self.sessions = create_players(self.quiz, 5)
+
+    def _complete(self, session, percentage, seconds):
+        """Stores a score and duration on a session without updating the leaderboard"""
+        session.percentage = percentage
+        session.completed_at = session.started_at + timedelta(seconds=seconds)
+        session.save()
+        return session
+
+    def _get_ranking(self):
+        """Gets the session ids of the leaderboard in rank order"""
+        return list(
+            LeaderboardEntry.objects.filter(quiz=self.quiz)
+            .order_by('-percentage', 'duration', 'completed_at', 'id')
+            .values_list('session_id', flat=True)
+        )
+
+    def test_ranks_by_score_then_duration(self):
+        """Higher scores rank first and faster runs break ties"""
+        first, second, third = self.sessions[:3]
+        for session, percentage, seconds in ((first, 50, 10), (second, 90, 30), (third, 90, 20)):
+            record_completed_session(self._complete(session, percentage, seconds))
+        self.assertEqual(self._get_ranking(), [third.pk, second.pk, first.pk])
+
+    def test_keeps_only_top_entries(self):
+        """A full leaderboard skips weaker sessions and trims the one pushed out"""
+        scores = (80, 70, 60, 10, 95)
+        for session, percentage in zip(self.sessions, scores):
+            record_completed_session(self._complete(session, percentage, 10))
+        self.assertEqual(self._get_ranking(), [self.sessions[4].pk, self.sessions[0].pk, self.sessions[1].pk])
+
+    def test_skips_unfinished_sessions(self):
+        """Sessions without a score are not ranked"""
+        self.assertIsNone(record_completed_session(QuizSession(quiz=self.quiz, is_completed=True)))
+        self.assertEqual(self._get_ranking(), [])
+
+    def test_rebuild_matches_incremental_updates(self):
+        """Rebuilding from sessions gives the same top entries as recording them one by one"""
+        for session, percentage in zip(self.sessions, (40, 90, 70, 90, 20)):
+            record_completed_session(self._complete(session, percentage, session.pk))
+        incremental = self._get_ranking()
+        self.assertEqual(rebuild_quiz_leaderboard(self.quiz.pk), 3)
+        self.assertEqual(self._get_ranking(), incremental)
+
+    def test_migration_backfills_leaderboard(self):
+        """The leaderboard migration ranks sessions completed before it"""
+        for session, percentage in zip(self.sessions, (40, 90, 70, 100, 20)):
+            self._complete(session, percentage, 10)
+        migration = importlib.import_module('quiz_management_app.migrations.0009_leaderboardentry')
+        migration.backfill_leaderboards(apps, None)
+        self.assertEqual(self._get_ranking(), [self.sessions[3].pk, self.sessions[1].pk, self.sessions[2].pk])
+        record_completed_session(self._complete(QuizSession.objects.create(
+            quiz=self.quiz, user=User.objects.create_user('late', password='pw'), is_completed=True
+        ), 50, 10))
+        self.assertEqual(len(self._get_ranking()), 3)
+        self.assertNotIn(QuizSession.objects.latest('id').pk, self._get_ranking())
+
+
+class PayloadCacheTests(TransactionTestCase):
+    """Tests the read-through cache of quiz payloads with real commits, so signal callbacks run"""
+
+    def setUp(self):
+        cache.clear()
+
+    def test_builds_once_per_version(self):
+        """A payload is built on a miss, served from the cache and rebuilt for a new version"""
+        builds = []
+
+        def build():
+            builds.append(1)
+            return {'build': len(builds)}
+
+        self.assertEqual(get_quiz_payload('detail', 1, build, version=1), {'build': 1})
+        self.assertEqual(get_quiz_payload('detail', 1, build, version=1), {'build': 1})
+        self.assertEqual(get_quiz_payload('detail', 1, build, version=2), {'build': 2})
+        invalidate_quiz_payloads(1)
+        self.assertEqual(get_quiz_payload('detail', 1, build, version=2), {'build': 3})
+
+    def test_play_questions_follow_content_changes(self):
+        """Editing a question bumps the content version and the play payload is rebuilt"""
+        quiz = create_quiz(User.objects.create_user('owner', password='pw'))
+        quiz.refresh_from_db()
+        question = quiz.questions.order_by('id').first()
+        get_play_questions(quiz.pk, quiz.content_version)
+        question.question_title = 'Changed'
+        question.save()
+        quiz.refresh_from_db()
+        questions = get_play_questions(quiz.pk, quiz.content_version)
+        self.assertIn('Changed', [question['question_title'] for question in questions])
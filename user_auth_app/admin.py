@@ -1,9 +1,9 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
+from django.apps import apps
 from django.contrib.auth.models import User
-from django.db import connection
-from django.core.exceptions import ValidationError
 from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from quiz_management_app.api.deletion import QuizDeletionService, count_user_rows
 
 admin.site.unregister(User)
 
@@ -30,30 +30,23 @@ class CustomUserAdmin(UserAdmin):
         }),
     )
     
-    def delete_model(self, request, obj):
-        try:
-            self._delete_jwt_tokens(obj)
-            self._delete_from_table('auth_user', 'id', obj.id)
-        except Exception as e:
-            raise ValidationError(f"Fehler beim Löschen des Benutzers: {e}")
+    def get_deleted_objects(self, objs, request):
+        model_count = {
+            model._meta.verbose_name_plural: count
+            for model, count in count_user_rows([obj.pk for obj in objs]).items() if count
+        }
+        perms_needed = set() if self.has_delete_permission(request) else {self.opts.verbose_name}
+        return [str(obj) for obj in objs], model_count, perms_needed, []
     
-    def _delete_from_table(self, table, col, user_id):
-        try:
-            with connection.cursor() as cursor:
-                cursor.execute(f"DELETE FROM {table} WHERE {col} = %s", [user_id])
-        except Exception as e:
-            raise
+    def delete_model(self, request, obj):
+        self.delete_queryset(request, User.objects.filter(pk=obj.pk))
     
-    def _delete_jwt_tokens(self, user):
-        try:
-            OutstandingToken.objects.filter(user_id=user.id).delete()
-            BlacklistedToken.objects.filter(token__user_id=user.id).delete()
-        except Exception:
-            pass
+    def _delete_jwt_tokens(self, queryset):
+        if not apps.is_installed('rest_framework_simplejwt.token_blacklist'):
+            return
+        BlacklistedToken.objects.filter(token__user__in=queryset).delete()
+        OutstandingToken.objects.filter(user__in=queryset).delete()
     
     def delete_queryset(self, request, queryset):
-        for obj in queryset:
-            try:
-                self.delete_model(request, obj)
-            except Exception:
-                pass
+        self._delete_jwt_tokens(queryset)
+        QuizDeletionService().delete_users(queryset)
@@ -1,9 +1,14 @@
+import hashlib
+import json
 from rest_framework import status
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import RefreshToken, AccessToken
-from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+from rest_framework_simplejwt.exceptions import TokenError
 from django.contrib.auth import authenticate
+from django.conf import settings
 from django.contrib.auth.models import User
+from django.utils.http import quote_etag
+from .tokens import RefreshToken, AccessToken, add_user_claims, get_user_claims
+from .user_cache import TOKEN_VERSION_CLAIM, get_current_token_version, get_token_version, load_token_version
 
 
 def validate_login_credentials(username, password):
@@ -13,14 +18,16 @@ def validate_login_credentials(username, password):
     return True
 
 
-def authenticate_user(username, password):
-    """Authenticates user with credentials"""
-    return authenticate(username=username, password=password)
+def authenticate_user(username, password, request=None):
+    """Authenticates user with credentials through the configured authentication backends"""
+    return authenticate(request, username=username, password=password)
 
 
 def create_refresh_token_for_user(user):
-    """Creates refresh token for user"""
-    return RefreshToken.for_user(user)
+    """Creates refresh token for user with its token version and user claims"""
+    refresh_token = RefreshToken.for_user(user)
+    refresh_token[TOKEN_VERSION_CLAIM] = get_token_version(user)
+    return add_user_claims(refresh_token, user)
 
 
 def create_login_response_data(user, refresh_token):
@@ -61,14 +68,8 @@ def blacklist_access_token(access_token):
         return
     
     try:
-        token = AccessToken(access_token)
-        jti = token.payload.get('jti')
-        if jti:
-            BlacklistedToken.objects.get_or_create(
-                token__jti=jti, 
-                defaults={'token': token}
-            )
-    except Exception:
+        AccessToken(access_token).blacklist()
+    except TokenError:
         pass
 
 
@@ -78,9 +79,8 @@ def blacklist_refresh_token(refresh_token):
         return
     
     try:
-        refresh = RefreshToken(refresh_token)
-        refresh.blacklist()
-    except Exception:
+        RefreshToken(refresh_token).blacklist()
+    except TokenError:
         pass
 
 
@@ -88,17 +88,7 @@ def blacklist_header_token(request):
     """Blacklists token from Authorization header"""
     auth_header = request.META.get('HTTP_AUTHORIZATION')
     if auth_header and auth_header.startswith('Bearer '):
-        try:
-            token_string = auth_header.split(' ')[1]
-            token = AccessToken(token_string)
-            jti = token.payload.get('jti')
-            if jti:
-                BlacklistedToken.objects.get_or_create(
-                    token__jti=jti, 
-                    defaults={'token': token}
-                )
-        except Exception:
-            pass
+        blacklist_access_token(auth_header.split(' ')[1])
 
 
 def get_access_token_from_request(request):
@@ -125,6 +115,48 @@ def validate_access_token(access_token):
         return None, f"Token ungültig: {str(e)}"
 
 
+def is_token_version_current(token, user_id):
+    """Checks the token version claim against the cached version, re-reading the database on a mismatch"""
+    version = token.payload.get(TOKEN_VERSION_CLAIM)
+    if version == get_current_token_version(user_id):
+        return True
+    # The cached version may predate the token; only the database decides a mismatch
+    return version == load_token_version(user_id)
+
+
+def validate_access_token_claims(access_token):
+    """Validates signature, expiry, revocation and token version and reads the possibly outdated user from its claims"""
+    if not access_token:
+        return None, "Kein Token gefunden"
+    
+    try:
+        token = AccessToken(access_token)
+    except TokenError as e:
+        return None, f"Token ungültig: {str(e)}"
+    user_data = get_user_claims(token)
+    if user_data is None or token.payload.get(TOKEN_VERSION_CLAIM) is None:
+        # Tokens issued before user claims existed still need the database lookup
+        user, token_or_error = validate_access_token(access_token)
+        if user is None:
+            return None, token_or_error
+        from .serializers import UserSerializer
+        return UserSerializer(user).data, token_or_error
+    if not is_token_version_current(token, user_data['id']):
+        return None, "Token ist nicht mehr gültig."
+    return user_data, token
+
+
+def is_stateless_validation_enabled():
+    """Checks whether token validation trusts the user claims of signed tokens"""
+    return getattr(settings, 'AUTH_STATELESS_TOKEN_VALIDATION', False)
+
+
+def build_validation_etag(data):
+    """Builds a strong ETag from the token validation response data"""
+    digest = hashlib.sha1(json.dumps(data, sort_keys=True, default=str).encode()).hexdigest()
+    return quote_etag(digest[:20])
+
+
 def get_refresh_token_from_request(request):
     """Gets refresh token from request"""
     return request.COOKIES.get('refresh_token')
@@ -1,58 +1,54 @@
 from rest_framework_simplejwt.authentication import JWTAuthentication
-from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
-from rest_framework_simplejwt.tokens import AccessToken
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings
+from .user_cache import TOKEN_VERSION_CLAIM, get_cached_user, get_token_version
 import logging
 
 logger = logging.getLogger(__name__)
 
 
 class CookieJWTAuthentication(JWTAuthentication):
-    """Authentication using JWT tokens in cookies"""
+    """Authentication using JWT tokens from the Authorization header or the access token cookie"""
     
-    def _authenticate_from_header(self, request):
-        """Authenticates user from Authorization header"""
+    def _get_raw_token_from_header(self, request):
+        """Gets the raw token from the Authorization header"""
         header = self.get_header(request)
         if header is None:
             return None
-        
-        raw_token = self.get_raw_token(header)
-        if raw_token is None:
-            return None
-        
+        return self.get_raw_token(header)
+    
+    def get_user(self, validated_token):
+        """Gets the token user from the per-process user cache"""
         try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken("Token enthält keine Benutzerkennung.")
+        
+        version = validated_token.get(TOKEN_VERSION_CLAIM)
+        return get_cached_user(user_id, version, lambda: self._load_user(validated_token, version))
+    
+    def _load_user(self, validated_token, version):
+        """Loads the user and rejects tokens issued before a password or status change"""
+        user = super().get_user(validated_token)
+        if version is not None and version != get_token_version(user):
+            raise AuthenticationFailed("Token ist nicht mehr gültig.", code='token_version_mismatch')
+        return user
+    
+    def authenticate(self, request):
+        """Validates the header token, or the cookie token when no header is sent, exactly once"""
+        raw_token = self._get_raw_token_from_header(request)
+        if raw_token is not None:
             validated_token = self.get_validated_token(raw_token)
             return self.get_user(validated_token), validated_token
-        except (InvalidToken, TokenError) as e:
-            logger.warning(f"Invalid token in header: {e}")
-            return None
-    
-    def _authenticate_from_cookie(self, request):
-        """Authenticates user from access token cookie"""
+        
         access_token = request.COOKIES.get('access_token')
         if not access_token:
+            logger.debug("No valid token found in header or cookies")
             return None
         
         try:
             validated_token = self.get_validated_token(access_token)
-            user = self.get_user(validated_token)
-            logger.info(f"Successfully authenticated user: {user.username}")
-            return user, validated_token
-        except (InvalidToken, TokenError) as e:
+            return self.get_user(validated_token), validated_token
+        except (InvalidToken, TokenError, AuthenticationFailed) as e:
             logger.warning(f"Invalid token in cookie: {e}")
             return None
-        except Exception as e:
-            logger.error(f"Unexpected error during authentication: {e}")
-            return None
-    
-    def authenticate(self, request):
-        """Main authentication method"""
-        header_auth = self._authenticate_from_header(request)
-        if header_auth:
-            return header_auth
-        
-        cookie_auth = self._authenticate_from_cookie(request)
-        if cookie_auth:
-            return cookie_auth
-        
-        logger.debug("No valid token found in header or cookies")
-        return None
\ No newline at end of file
@@ -0,0 +1,60 @@
+import logging
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.hashers import make_password, verify_password
+from django.core.exceptions import PermissionDenied
+from .password_hashing import PasswordHashingOverloaded, run_password_check
+
+logger = logging.getLogger(__name__)
+
+UserModel = get_user_model()
+
+OVERLOAD_ATTRIBUTE = 'password_hashing_overloaded'
+
+
+def get_hashing_overload(request):
+    """Gets the overload that rejected the last authentication of a request, if any"""
+    return getattr(request, OVERLOAD_ATTRIBUTE, None)
+
+
+class BoundedHashingModelBackend(ModelBackend):
+    """ModelBackend that runs password hashing on the bounded password executor"""
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        """Authenticates like ModelBackend, keeping the user lookup on the request thread"""
+        if username is None:
+            username = kwargs.get(UserModel.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+        try:
+            user = UserModel._default_manager.get_by_natural_key(username)
+        except UserModel.DoesNotExist:
+            # Hashes anyway so unknown usernames take as long as wrong passwords
+            self._run_check(request, make_password, password)
+            return None
+        if self._check_password(request, user, password) and self.user_can_authenticate(user):
+            return user
+        return None
+
+    def _run_check(self, request, func, *args):
+        """Runs a hashing function on the executor, turning overload into a failed login"""
+        try:
+            return run_password_check(func, *args)
+        except PasswordHashingOverloaded as exc:
+            logger.warning(f"Login rejected: {exc}")
+            if request is not None:
+                setattr(request, OVERLOAD_ATTRIBUTE, exc)
+            # authenticate() treats PermissionDenied as a failed login and stops at this backend
+            raise PermissionDenied(str(exc))
+
+    def _check_password(self, request, user, password):
+        """Verifies a password on the executor and upgrades outdated hashes"""
+        is_correct, must_update = self._run_check(request, verify_password, password, user.password)
+        if is_correct and must_update:
+            try:
+                user.password = run_password_check(make_password, password)
+            except PasswordHashingOverloaded:
+                # The password was verified; the upgrade waits for a quieter login
+                return is_correct
+            user.save(update_fields=['password'])
+        return is_correct
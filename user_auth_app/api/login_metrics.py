@@ -0,0 +1,71 @@
+import threading
+import time
+from collections import deque
+
+
+_lock = threading.Lock()
+_stats = {'attempts': 0, 'succeeded': 0, 'failed': 0, 'throttled_ip': 0, 'throttled_username': 0, 'overloaded': 0}
+_latencies = deque(maxlen=1000)
+_completed_at = deque(maxlen=10000)
+_hash_seconds = {'average': None}
+
+
+def record_login(succeeded, latency):
+    """Records a finished login attempt with its duration including queueing"""
+    now = time.monotonic()
+    with _lock:
+        _stats['attempts'] += 1
+        _stats['succeeded' if succeeded else 'failed'] += 1
+        _latencies.append(latency)
+        _completed_at.append(now)
+
+
+def record_hash_duration(seconds):
+    """Updates the moving average duration of a password check"""
+    with _lock:
+        average = _hash_seconds['average']
+        _hash_seconds['average'] = seconds if average is None else average * 0.9 + seconds * 0.1
+
+
+def record_login_rejection(reason):
+    """Counts a login rejected by a throttle or the hashing queue limit"""
+    with _lock:
+        _stats[reason] += 1
+
+
+def get_average_hash_seconds():
+    """Gets the moving average duration of a password check"""
+    return _hash_seconds['average']
+
+
+def _percentile(values, fraction):
+    """Gets a percentile of sorted values"""
+    return values[min(int(len(values) * fraction), len(values) - 1)]
+
+
+def get_login_stats():
+    """Gets login counters, throughput and latency percentiles of this worker process"""
+    now = time.monotonic()
+    with _lock:
+        stats = dict(_stats)
+        latencies = sorted(_latencies)
+        recent = sum(1 for completed in _completed_at if now - completed <= 60)
+        average_hash = _hash_seconds['average']
+    stats['logins_last_minute'] = recent
+    stats['latency_ms'] = {
+        'p50': round(_percentile(latencies, 0.5) * 1000, 1),
+        'p95': round(_percentile(latencies, 0.95) * 1000, 1),
+        'max': round(latencies[-1] * 1000, 1),
+    } if latencies else None
+    stats['average_hash_ms'] = round(average_hash * 1000, 1) if average_hash is not None else None
+    return stats
+
+
+def reset_login_stats():
+    """Resets all counters and samples"""
+    with _lock:
+        for counter in _stats:
+            _stats[counter] = 0
+        _latencies.clear()
+        _completed_at.clear()
+        _hash_seconds['average'] = None
@@ -0,0 +1,105 @@
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+import django
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from .login_metrics import get_average_hash_seconds, record_hash_duration
+
+
+class PasswordHashingOverloaded(Exception):
+    """Raised when the password hashing queue is full or a check waits too long"""
+
+    def __init__(self, retry_after):
+        super().__init__(f'Password hashing overloaded, retry after {retry_after}s')
+        self.retry_after = retry_after
+
+
+_executor = None
+_slots = None
+_pending = {'count': 0}
+_lock = threading.Lock()
+
+
+def _get_workers():
+    """Gets the number of concurrent password checks per process"""
+    return getattr(settings, 'LOGIN_HASH_WORKERS', 2)
+
+
+def _get_queue_size():
+    """Gets the number of password checks allowed to wait for a worker"""
+    return getattr(settings, 'LOGIN_HASH_QUEUE_SIZE', 32)
+
+
+def _get_pool():
+    """Gets the executor and its slot semaphore, creating them on first use"""
+    global _executor, _slots
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=_get_workers(), thread_name_prefix='quizly-login')
+            _slots = threading.BoundedSemaphore(_get_workers() + _get_queue_size())
+        return _executor, _slots
+
+
+def _estimate_retry_after():
+    """Estimates the seconds until the current queue has drained"""
+    average = get_average_hash_seconds() or 0.5
+    return max(math.ceil(_pending['count'] * average / _get_workers()), 1)
+
+
+def _release(slots):
+    """Frees a queue slot after a check finished or was cancelled"""
+    with _lock:
+        _pending['count'] -= 1
+    slots.release()
+
+
+def _run_timed(func, args, kwargs):
+    """Runs a hashing function in a worker thread and records how long it took"""
+    start = time.perf_counter()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        record_hash_duration(time.perf_counter() - start)
+
+
+def run_password_check(func, *args, **kwargs):
+    """Runs a CPU-bound hashing function on the bounded executor, rejecting it when the queue is full"""
+    executor, slots = _get_pool()
+    if not slots.acquire(blocking=False):
+        raise PasswordHashingOverloaded(_estimate_retry_after())
+    with _lock:
+        _pending['count'] += 1
+
+    try:
+        future = executor.submit(_run_timed, func, args, kwargs)
+    except Exception:
+        _release(slots)
+        raise
+    future.add_done_callback(lambda _: _release(slots))
+    try:
+        return future.result(timeout=getattr(settings, 'LOGIN_HASH_TIMEOUT', 10))
+    except TimeoutError:
+        future.cancel()
+        raise PasswordHashingOverloaded(_estimate_retry_after())
+
+
+def get_executor_stats():
+    """Gets pool size and the number of running or queued password checks"""
+    return {
+        'workers': _get_workers(),
+        'queue_size': _get_queue_size(),
+        'pending': _pending['count'],
+    }
+
+
+def init_hash_process():
+    """Sets up Django in a spawned hashing process so the password hashers are configured"""
+    if not settings.configured:
+        django.setup()
+
+
+def hash_password_in_process(password):
+    """Hashes a raw password in a hashing process; this module imports no models so it loads before setup"""
+    return make_password(password)
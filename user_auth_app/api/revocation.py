@@ -0,0 +1,199 @@
+import hashlib
+import math
+import threading
+import time
+from django.conf import settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+
+class BloomFilter:
+    """Set membership filter without false negatives and with a bounded false positive rate"""
+
+    def __init__(self, capacity, error_rate):
+        self.capacity = max(int(capacity), 1)
+        self.error_rate = error_rate
+        self.size = max(int(-self.capacity * math.log(error_rate) / math.log(2) ** 2), 8)
+        self.hash_count = max(round(self.size / self.capacity * math.log(2)), 1)
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, value):
+        """Gets the bit positions of a value by double hashing one digest"""
+        digest = hashlib.blake2b(value.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little') | 1
+        return [(first + index * second) % self.size for index in range(self.hash_count)]
+
+    def add(self, value):
+        """Adds a value to the filter"""
+        for position in self._positions(value):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, value):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(value))
+
+
+_filter = None
+_last_id = 0
+_synced_at = 0.0
+_built_at = 0.0
+_lock = threading.Lock()
+_sync_lock = threading.Lock()
+_stats = {
+    'checks': 0, 'filter_negatives': 0, 'db_checks': 0, 'confirmed': 0,
+    'false_positives': 0, 'syncs': 0, 'rebuilds': 0,
+}
+
+
+def _get_capacity():
+    """Gets the minimum number of revoked tokens the filter is sized for"""
+    return getattr(settings, 'REVOCATION_FILTER_CAPACITY', 100000)
+
+
+def _get_error_rate():
+    """Gets the target false positive rate of the filter"""
+    return getattr(settings, 'REVOCATION_FILTER_ERROR_RATE', 0.001)
+
+
+def _get_sync_interval():
+    """Gets the seconds between incremental syncs with the blacklist table"""
+    return getattr(settings, 'REVOCATION_FILTER_SYNC_INTERVAL', 5)
+
+
+def _get_rebuild_interval():
+    """Gets the seconds between full rebuilds of the filter"""
+    return getattr(settings, 'REVOCATION_FILTER_REBUILD_INTERVAL', 3600)
+
+
+def _get_sync_overlap():
+    """Gets how many ids below the last seen one each sync reads again"""
+    return getattr(settings, 'REVOCATION_FILTER_SYNC_OVERLAP', 1000)
+
+
+def _count(counter):
+    """Increments a statistics counter"""
+    with _lock:
+        _stats[counter] += 1
+
+
+def _load_revoked(last_id, batch_size):
+    """Gets (id, jti) pairs of blacklisted tokens after the given id"""
+    return list(
+        BlacklistedToken.objects.filter(pk__gt=last_id).order_by('pk').values_list('pk', 'token__jti')[:batch_size]
+    )
+
+
+def rebuild_revocation_filter(batch_size=10000):
+    """Rebuilds the filter from the blacklist table in primary key batches"""
+    global _filter, _last_id, _synced_at, _built_at
+    with _sync_lock:
+        capacity = max(BlacklistedToken.objects.count() * 2, _get_capacity())
+        bloom = BloomFilter(capacity, _get_error_rate())
+        last_id = 0
+        while True:
+            rows = _load_revoked(last_id, batch_size)
+            if not rows:
+                break
+            for _, jti in rows:
+                bloom.add(jti)
+            last_id = rows[-1][0]
+        now = time.monotonic()
+        with _lock:
+            _filter, _last_id, _synced_at, _built_at = bloom, last_id, now, now
+            _stats['rebuilds'] += 1
+    return bloom.count
+
+
+def sync_revocation_filter(batch_size=10000):
+    """Adds tokens blacklisted since the last sync, including those revoked by other processes"""
+    global _last_id, _synced_at
+    if not _sync_lock.acquire(blocking=False):
+        return 0
+    try:
+        added = 0
+        # Ids are assigned at insert, not at commit, so a lower id can become visible after a higher one
+        cursor = max(_last_id - _get_sync_overlap(), 0)
+        while True:
+            rows = _load_revoked(cursor, batch_size)
+            if not rows:
+                break
+            with _lock:
+                for _, jti in rows:
+                    # Rows read again are skipped so they do not count towards the capacity twice
+                    if jti not in _filter:
+                        _filter.add(jti)
+                        added += 1
+                _last_id = max(_last_id, rows[-1][0])
+            cursor = rows[-1][0]
+        with _lock:
+            _synced_at = time.monotonic()
+            _stats['syncs'] += 1
+            overfull = _filter.count > _filter.capacity
+    finally:
+        _sync_lock.release()
+    if overfull:
+        rebuild_revocation_filter(batch_size)
+    return added
+
+
+def _get_filter():
+    """Gets the filter, building it on first use and syncing it when it is due"""
+    if _filter is None:
+        rebuild_revocation_filter()
+        return _filter
+    now = time.monotonic()
+    if now - _built_at >= _get_rebuild_interval():
+        # Drops compacted tokens and catches rows committed later than the sync overlap
+        rebuild_revocation_filter()
+    elif now - _synced_at >= _get_sync_interval():
+        sync_revocation_filter()
+    return _filter
+
+
+def add_revoked_jti(jti):
+    """Records a token revoked in this process without waiting for the next sync"""
+    bloom = _get_filter()
+    with _lock:
+        bloom.add(jti)
+
+
+def is_token_revoked(jti):
+    """Checks whether a token is blacklisted, querying the table only on a filter match"""
+    bloom = _get_filter()
+    _count('checks')
+    if jti not in bloom:
+        _count('filter_negatives')
+        return False
+    _count('db_checks')
+    revoked = BlacklistedToken.objects.filter(token__jti=jti).exists()
+    _count('confirmed' if revoked else 'false_positives')
+    return revoked
+
+
+def reset_revocation_filter():
+    """Drops the filter so it is rebuilt from the table on next use"""
+    global _filter, _last_id
+    with _lock:
+        _filter = None
+        _last_id = 0
+
+
+def get_revocation_stats():
+    """Gets filter size and check counters of this worker process"""
+    with _lock:
+        stats = dict(_stats)
+        bloom = _filter
+    stats['revoked_tokens'] = bloom.count if bloom else None
+    stats['capacity'] = bloom.capacity if bloom else None
+    stats['size_bytes'] = len(bloom.bits) if bloom else None
+    stats['hash_count'] = bloom.hash_count if bloom else None
+    stats['error_rate'] = _get_error_rate()
+    return stats
+
+
+def reset_revocation_stats():
+    """Resets all counters to zero"""
+    with _lock:
+        for counter in _stats:
+            _stats[counter] = 0
@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from django.contrib.auth.models import User
+from django.contrib.auth.validators import UnicodeUsernameValidator
 from django.contrib.auth.password_validation import validate_password
 from .auth_utils import validate_password_match, remove_password2_from_data
 
@@ -40,4 +41,18 @@ class UserSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = User
-        fields = ['id', 'username', 'email', 'first_name', 'last_name']
\ No newline at end of file
+        fields = ['id', 'username', 'email', 'first_name', 'last_name']
+
+
+class UserImportRowSerializer(serializers.Serializer):
+    """Serializer for a single row of a CSV user import"""
+    username = serializers.CharField(max_length=150, validators=[UnicodeUsernameValidator()])
+    email = serializers.EmailField(required=False, allow_blank=True, default='')
+    password = serializers.CharField(max_length=128, trim_whitespace=False)
+    first_name = serializers.CharField(max_length=150, required=False, allow_blank=True, default='')
+    last_name = serializers.CharField(max_length=150, required=False, allow_blank=True, default='')
+
+
+class UserImportUploadSerializer(serializers.Serializer):
+    """Serializer for the uploaded CSV user import file"""
+    file = serializers.FileField()
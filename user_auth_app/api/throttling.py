@@ -0,0 +1,102 @@
+import hashlib
+import math
+import time
+import uuid
+from contextlib import contextmanager
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.exceptions import Throttled
+from rest_framework.throttling import BaseThrottle
+from .login_metrics import record_login_rejection
+
+
+class LoginThrottled(Throttled):
+    """Throttled login response with a German message and Retry-After header"""
+    default_detail = 'Zu viele Anmeldeversuche.'
+    extra_detail_singular = 'Erneut möglich in {wait} Sekunde.'
+    extra_detail_plural = 'Erneut möglich in {wait} Sekunden.'
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """Allows bursts up to a bucket size and refills tokens at a steady rate per key"""
+    scope = None
+    lock_timeout = 1
+
+    def __init__(self):
+        self.wait_seconds = None
+
+    def get_cache_key(self, request, view):
+        """Gets the bucket key of a request or None to skip throttling"""
+        raise NotImplementedError
+
+    def get_rate(self):
+        """Gets (bucket size, tokens per second) for this scope"""
+        burst, per_minute = getattr(settings, 'LOGIN_THROTTLE_RATES', {})[self.scope]
+        return burst, per_minute / 60
+
+    def allow_request(self, request, view):
+        """Takes a token from the bucket or reports how long until one is available"""
+        key = self.get_cache_key(request, view)
+        if key is None:
+            return True
+        burst, rate = self.get_rate()
+        cache = caches[getattr(settings, 'LOGIN_THROTTLE_CACHE_ALIAS', 'default')]
+        timeout = math.ceil(burst / rate)
+        with self._bucket_lock(cache, key) as locked:
+            tokens = 0
+            if locked:
+                now = time.time()
+                tokens, updated = cache.get(key, (burst, now))
+                tokens = min(burst, tokens + (now - updated) * rate)
+                if tokens >= 1:
+                    cache.set(key, (tokens - 1, now), timeout)
+                    return True
+                cache.set(key, (tokens, now), timeout)
+        self.wait_seconds = (1 - tokens) / rate
+        record_login_rejection(f'throttled_{self.scope.removeprefix("login_")}')
+        return False
+
+    @contextmanager
+    def _bucket_lock(self, cache, key):
+        """Serialises the read-modify-write of one bucket, yielding False if the lock stays taken"""
+        lock_key = f'{key}:lock'
+        owner = uuid.uuid4().hex
+        deadline = time.monotonic() + self.lock_timeout
+        # add() only succeeds if the key is absent; the lock expires if its holder dies
+        while not cache.add(lock_key, owner, self.lock_timeout):
+            if time.monotonic() >= deadline:
+                # Rejects instead of letting the attempt bypass the bucket
+                yield False
+                return
+            time.sleep(0.002)
+        try:
+            yield True
+        finally:
+            if cache.get(lock_key) == owner:
+                cache.delete(lock_key)
+
+    def wait(self):
+        """Gets the seconds until the next token is available"""
+        return self.wait_seconds
+
+
+class LoginIPThrottle(TokenBucketThrottle):
+    """Token bucket per client address for login attempts"""
+    scope = 'login_ip'
+
+    def get_cache_key(self, request, view):
+        """Gets the bucket key of the client address"""
+        return f'quizly:throttle:{self.scope}:{self.get_ident(request)}'
+
+
+class LoginUsernameThrottle(TokenBucketThrottle):
+    """Token bucket per username for login attempts, independent of the client address"""
+    scope = 'login_username'
+
+    def get_cache_key(self, request, view):
+        """Gets the bucket key of the submitted username"""
+        username = request.data.get('username')
+        if not isinstance(username, str) or not username:
+            return None
+        digest = hashlib.sha256(username.strip().lower().encode()).hexdigest()[:32]
+        return f'quizly:throttle:{self.scope}:{digest}'
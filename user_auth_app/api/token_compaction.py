@@ -0,0 +1,24 @@
+from django.db import router, transaction
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+
+def delete_expired_tokens(now=None, batch_size=1000, progress=None):
+    """Deletes expired outstanding tokens and their blacklist entries in short transactions"""
+    using = router.db_for_write(OutstandingToken)
+    expired = OutstandingToken.objects.filter(expires_at__lte=now or timezone.now())
+    totals = {}
+    while True:
+        pks = list(expired.order_by('pk').values_list('pk', flat=True)[:batch_size])
+        if not pks:
+            return totals
+        with transaction.atomic(using=using):
+            # Expired tokens fail signature checks anyway, so their blacklist rows are dead weight
+            deleted = {
+                BlacklistedToken._meta.label: BlacklistedToken.objects.filter(token_id__in=pks)._raw_delete(using),
+                OutstandingToken._meta.label: OutstandingToken.objects.filter(pk__in=pks)._raw_delete(using),
+            }
+        for label, count in deleted.items():
+            totals[label] = totals.get(label, 0) + count
+        if progress:
+            progress(totals)
@@ -0,0 +1,53 @@
+from functools import partial
+from django.db import transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import (
+    AccessToken as BaseAccessToken, BlacklistMixin, RefreshToken as BaseRefreshToken
+)
+from .revocation import add_revoked_jti, is_token_revoked
+
+
+USER_CLAIM = 'usr'
+USER_CLAIM_FIELDS = ('username', 'email', 'first_name', 'last_name')
+
+
+class RevocationFilterMixin:
+    """Consults the revocation filter before the blacklist table and records new revocations in it"""
+
+    def check_blacklist(self):
+        """Raises TokenError if the token is blacklisted"""
+        if is_token_revoked(self.payload[api_settings.JTI_CLAIM]):
+            raise TokenError(_("Token is blacklisted"))
+
+    def blacklist(self):
+        """Blacklists the token and adds it to this process' filter once committed"""
+        result = super().blacklist()
+        transaction.on_commit(partial(add_revoked_jti, self.payload[api_settings.JTI_CLAIM]))
+        return result
+
+
+class AccessToken(RevocationFilterMixin, BlacklistMixin, BaseAccessToken):
+    """Access token that can be revoked on logout"""
+
+
+class RefreshToken(RevocationFilterMixin, BaseRefreshToken):
+    """Refresh token issuing revocable access tokens"""
+    access_token_class = AccessToken
+
+
+def add_user_claims(token, user):
+    """Stores the public user fields in a token so it can be validated without a user query"""
+    token[USER_CLAIM] = {field: getattr(user, field) for field in USER_CLAIM_FIELDS}
+    return token
+
+
+def get_user_claims(token):
+    """Gets the user data carried by a token or None for tokens issued without it"""
+    claims = token.payload.get(USER_CLAIM)
+    if not isinstance(claims, dict):
+        return None
+    user_id = token.payload.get(api_settings.USER_ID_CLAIM)
+    # simplejwt stores the user id as a string
+    return {'id': int(user_id) if str(user_id).isdigit() else user_id, **claims}
@@ -3,8 +3,12 @@ from . import views
 
 urlpatterns = [
     path('register/', views.UserRegistrationView.as_view(), name='register'),
+    path('users/import/', views.UserImportView.as_view(), name='user_import'),
     path('login/', views.UserLoginView.as_view(), name='login'),
     path('logout/', views.UserLogoutView.as_view(), name='logout'),
     path('token/refresh/', views.TokenRefreshView.as_view(), name='refresh_token'),
     path('token/validate/', views.TokenValidationView.as_view(), name='validate_token'),
+    path('metrics/auth/', views.AuthCacheStatsView.as_view(), name='auth_cache_stats'),
+    path('metrics/auth/revocation/', views.RevocationFilterStatsView.as_view(), name='revocation_filter_stats'),
+    path('metrics/auth/login/', views.LoginMetricsView.as_view(), name='login_metrics'),
 ]
\ No newline at end of file
@@ -0,0 +1,124 @@
+import copy
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+
+
+TOKEN_VERSION_CLAIM = 'tv'
+
+_entries = OrderedDict()
+_lock = threading.Lock()
+_stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'invalidations': 0}
+
+
+def _get_max_size():
+    """Gets the maximum number of cached users per process"""
+    return getattr(settings, 'AUTH_USER_CACHE_SIZE', 1024)
+
+
+def _get_ttl():
+    """Gets the lifetime of cached users in seconds"""
+    return getattr(settings, 'AUTH_USER_CACHE_TTL', 30)
+
+
+def _derive_token_version(password, is_active):
+    """Hashes the fields whose change invalidates issued tokens"""
+    return hashlib.sha256(f'{password}:{is_active}'.encode()).hexdigest()[:12]
+
+
+def get_token_version(user):
+    """Derives a token version that changes with the password hash and active state"""
+    return _derive_token_version(user.password, user.is_active)
+
+
+def build_token_version_key(user_id):
+    """Builds the shared cache key of a user's current token version"""
+    return f'quizly:user:{user_id}:tv'
+
+
+def _get_version_ttl():
+    """Gets how long current token versions are cached in seconds"""
+    return getattr(settings, 'AUTH_TOKEN_VERSION_CACHE_TTL', 60)
+
+
+def load_token_version(user_id):
+    """Reads the current token version of a user from the database and caches it; '' for unknown users"""
+    row = User.objects.filter(pk=user_id).values_list('password', 'is_active').first()
+    version = _derive_token_version(*row) if row else ''
+    cache.set(build_token_version_key(user_id), version, _get_version_ttl())
+    return version
+
+
+def get_current_token_version(user_id):
+    """Gets the current token version of a user from the shared cache, loading it on a miss"""
+    version = cache.get(build_token_version_key(user_id))
+    if version is None:
+        version = load_token_version(user_id)
+    return version
+
+
+def forget_token_version(user_id):
+    """Drops the cached token version so the next check reads the database"""
+    cache.delete(build_token_version_key(user_id))
+
+
+def get_cached_user(user_id, version, loader):
+    """Returns a copy of the cached user for (user id, token version) or loads and stores it"""
+    key = (str(user_id), version)
+    now = time.monotonic()
+    with _lock:
+        entry = _entries.get(key)
+        if entry is not None and entry[0] > now:
+            _entries.move_to_end(key)
+            _stats['hits'] += 1
+            return copy.copy(entry[1])
+        if entry is not None:
+            del _entries[key]
+        _stats['misses'] += 1
+
+    user = loader()
+    with _lock:
+        _entries[key] = (now + _get_ttl(), user)
+        _entries.move_to_end(key)
+        while len(_entries) > _get_max_size():
+            _entries.popitem(last=False)
+            _stats['evictions'] += 1
+    return copy.copy(user)
+
+
+def invalidate_user(user_id):
+    """Drops all cached entries of a user"""
+    user_id = str(user_id)
+    with _lock:
+        for key in [key for key in _entries if key[0] == user_id]:
+            del _entries[key]
+            _stats['invalidations'] += 1
+
+
+def clear_user_cache():
+    """Drops all cached users"""
+    with _lock:
+        _entries.clear()
+
+
+def get_user_cache_stats():
+    """Gets hit, miss and eviction counters of this worker process"""
+    with _lock:
+        stats = dict(_stats)
+        stats['size'] = len(_entries)
+    lookups = stats['hits'] + stats['misses']
+    stats['hit_rate'] = round(stats['hits'] / lookups, 3) if lookups else None
+    stats['max_size'] = _get_max_size()
+    stats['ttl'] = _get_ttl()
+    return stats
+
+
+def reset_user_cache_stats():
+    """Resets all counters to zero"""
+    with _lock:
+        for counter in _stats:
+            _stats[counter] = 0
@@ -0,0 +1,150 @@
+import csv
+import io
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import IntegrityError, transaction
+from .auth_utils import normalize_registration_data
+from .password_hashing import hash_password_in_process, init_hash_process
+from .serializers import UserImportRowSerializer
+
+
+IMPORT_BATCH_SIZE = 500
+MAX_REPORTED_ERRORS = 100
+REQUIRED_COLUMNS = ('username', 'password')
+
+
+def get_hash_processes():
+    """Gets the number of processes hashing passwords during a command line import"""
+    return getattr(settings, 'USER_IMPORT_HASH_PROCESSES', None) or os.cpu_count() or 1
+
+
+def get_upload_hash_processes():
+    """Gets the number of processes hashing passwords during an uploaded import"""
+    return getattr(settings, 'USER_IMPORT_UPLOAD_HASH_PROCESSES', 2)
+
+
+def create_hash_pool(processes):
+    """Starts hashing processes with spawn, so the server's threads, locks and connections are not forked"""
+    return ProcessPoolExecutor(
+        max_workers=processes,
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=init_hash_process
+    )
+
+
+def iter_csv_rows(file):
+    """Yields (line number, row) pairs of an uploaded or opened CSV file"""
+    if isinstance(file, io.TextIOBase):
+        text = file
+    else:
+        text = io.TextIOWrapper(file, encoding='utf-8-sig', newline='')
+    reader = csv.DictReader(text)
+    missing = [column for column in REQUIRED_COLUMNS if column not in (reader.fieldnames or [])]
+    if missing:
+        raise ValueError(f"CSV-Datei benötigt die Spalten: {', '.join(missing)}.")
+    for row in reader:
+        yield reader.line_num, row
+
+
+def _build_users(batch, hashes):
+    """Builds unsaved users from validated rows and their password hashes"""
+    return [
+        User(
+            username=data['username'],
+            email=data['email'],
+            first_name=data['first_name'],
+            last_name=data['last_name'],
+            password=password_hash
+        )
+        for (_, data), password_hash in zip(batch, hashes)
+    ]
+
+
+def _persist_batch(batch, pool, record_error):
+    """Hashes the passwords of a batch in the process pool and inserts its users in one statement"""
+    existing = set(User.objects.filter(
+        username__in=[data['username'] for _, data in batch]
+    ).values_list('username', flat=True))
+    for line_number, data in batch:
+        if data['username'] in existing:
+            record_error(line_number, {'username': ["Benutzername ist bereits vergeben."]})
+    batch = [(line_number, data) for line_number, data in batch if data['username'] not in existing]
+    if not batch:
+        return 0
+
+    passwords = [data['password'] for _, data in batch]
+    if pool is None:
+        hashes = [hash_password_in_process(password) for password in passwords]
+    else:
+        hashes = list(pool.map(hash_password_in_process, passwords, chunksize=max(len(passwords) // 32, 1)))
+
+    try:
+        with transaction.atomic():
+            User.objects.bulk_create(_build_users(batch, hashes))
+    except IntegrityError:
+        # A username was registered concurrently; retry once without the taken ones
+        taken = set(User.objects.filter(
+            username__in=[data['username'] for _, data in batch]
+        ).values_list('username', flat=True))
+        kept = []
+        for (line_number, data), password_hash in zip(batch, hashes):
+            if data['username'] in taken:
+                record_error(line_number, {'username': ["Benutzername ist bereits vergeben."]})
+            else:
+                kept.append(((line_number, data), password_hash))
+        with transaction.atomic():
+            User.objects.bulk_create(_build_users([row for row, _ in kept], [h for _, h in kept]))
+        return len(kept)
+    return len(batch)
+
+
+def import_users(file, batch_size=IMPORT_BATCH_SIZE, processes=None, progress=None):
+    """Validates CSV user rows and creates them in batches, collecting per-row errors"""
+    report = {'imported': 0, 'failed': 0, 'errors': []}
+    seen = set()
+    batch = []
+
+    def record_error(line_number, errors):
+        report['failed'] += 1
+        if len(report['errors']) < MAX_REPORTED_ERRORS:
+            report['errors'].append({'line': line_number, 'errors': errors})
+
+    def flush():
+        nonlocal pool
+        # The processes start with the first batch, so files without valid rows spawn none
+        if pool is None and processes > 1:
+            pool = create_hash_pool(min(processes, len(batch)))
+        report['imported'] += _persist_batch(batch, pool, record_error)
+        batch.clear()
+        if progress:
+            progress(report)
+
+    rows = iter_csv_rows(file)
+    processes = processes or get_hash_processes()
+    pool = None
+    try:
+        for line_number, row in rows:
+            serializer = UserImportRowSerializer(data=normalize_registration_data(
+                {key: value for key, value in row.items() if key is not None and value is not None}
+            ))
+            if not serializer.is_valid():
+                record_error(line_number, serializer.errors)
+                continue
+            username = serializer.validated_data['username']
+            if username in seen:
+                record_error(line_number, {'username': ["Benutzername kommt mehrfach vor."]})
+                continue
+            seen.add(username)
+            batch.append((line_number, serializer.validated_data))
+            if len(batch) >= batch_size:
+                flush()
+        if batch:
+            flush()
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    report['errors'].sort(key=lambda error: error['line'])
+    return report
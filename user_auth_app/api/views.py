@@ -1,18 +1,29 @@
+import time
 from rest_framework import status
 from rest_framework.generics import CreateAPIView, GenericAPIView
-from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.permissions import AllowAny, IsAuthenticated, IsAdminUser
+from rest_framework.parsers import MultiPartParser
 from rest_framework.response import Response
 from django.contrib.auth.models import User
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
-from .serializers import UserRegistrationSerializer, UserSerializer
+from django.utils.cache import get_conditional_response
+from .serializers import UserRegistrationSerializer, UserSerializer, UserImportUploadSerializer
+from .user_cache import get_user_cache_stats
+from .revocation import get_revocation_stats
+from .login_metrics import get_login_stats, record_login, record_login_rejection
+from .password_hashing import get_executor_stats
+from .backends import get_hashing_overload
+from .user_import import get_upload_hash_processes, import_users
+from .throttling import LoginThrottled, LoginIPThrottle, LoginUsernameThrottle
 from .auth_utils import (
     validate_login_credentials, authenticate_user, create_refresh_token_for_user,
     create_login_response_data, set_auth_cookies, blacklist_access_token,
     blacklist_refresh_token, blacklist_header_token, get_access_token_from_request,
     validate_access_token, get_refresh_token_from_request, refresh_access_token,
     create_refresh_response_data, set_refresh_cookie, normalize_registration_data,
-    validate_password_match, remove_password2_from_data
+    validate_password_match, remove_password2_from_data, validate_access_token_claims,
+    is_stateless_validation_enabled, build_validation_etag
 )
 
 
@@ -35,10 +46,34 @@ class UserRegistrationView(CreateAPIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+class UserImportView(GenericAPIView):
+    """View for creating many users from an uploaded CSV file"""
+    permission_classes = [IsAdminUser]
+    serializer_class = UserImportUploadSerializer
+    parser_classes = [MultiPartParser]
+    
+    def post(self, request):
+        """Imports users row by row and reports invalid rows"""
+        serializer = self.get_serializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            report = import_users(serializer.validated_data['file'], processes=get_upload_hash_processes())
+        except ValueError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        response_status = status.HTTP_201_CREATED if report['imported'] else status.HTTP_400_BAD_REQUEST
+        return Response(report, status=response_status)
+
+
 class UserLoginView(GenericAPIView):
     """View for user login"""
     permission_classes = [AllowAny]
+    throttle_classes = [LoginIPThrottle, LoginUsernameThrottle]
     
+    def throttled(self, request, wait):
+        """Rejects throttled login attempts with 429 and Retry-After"""
+        raise LoginThrottled(wait=wait)
     
     def post(self, request, *args, **kwargs):
         """Handles user login"""
@@ -50,7 +85,13 @@ class UserLoginView(GenericAPIView):
                 "detail": "Username und Passwort sind erforderlich."
             }, status=status.HTTP_400_BAD_REQUEST)
         
-        user = authenticate_user(username, password)
+        start = time.perf_counter()
+        user = authenticate_user(username, password, request)
+        overload = get_hashing_overload(request)
+        if overload is not None:
+            record_login_rejection('overloaded')
+            raise LoginThrottled(wait=overload.retry_after, detail="Anmeldung ist derzeit ausgelastet.")
+        record_login(user is not None, time.perf_counter() - start)
         
         if user is None:
             return Response({
@@ -101,23 +142,41 @@ class UserLogoutView(GenericAPIView):
 class TokenValidationView(GenericAPIView):
     """View for token validation"""
     permission_classes = [AllowAny]
+    # Validates the token itself, so the request authenticators need not load the user first
+    authentication_classes = []
+    
+    def _validate(self, access_token):
+        """Gets the user data and token, from the token claims in stateless mode"""
+        if is_stateless_validation_enabled():
+            return validate_access_token_claims(access_token)
+        user, token_or_error = validate_access_token(access_token)
+        if user is None:
+            return None, token_or_error
+        return UserSerializer(user).data, token_or_error
     
     def get(self, request, *args, **kwargs):
-        """Validates current authentication status"""
+        """Validates current authentication status, answering 304 when nothing changed"""
         access_token = get_access_token_from_request(request)
-        user, token_or_error = validate_access_token(access_token)
+        user_data, token_or_error = self._validate(access_token)
         
-        if user is None:
+        if user_data is None:
             return Response({
                 "authenticated": False,
                 "detail": token_or_error
             }, status=status.HTTP_401_UNAUTHORIZED)
         
-        return Response({
+        data = {
             "authenticated": True,
-            "user": UserSerializer(user).data,
+            "user": user_data,
             "token_exp": token_or_error.payload.get('exp')
-        }, status=status.HTTP_200_OK)
+        }
+        etag = build_validation_etag(data)
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = Response(data, status=status.HTTP_200_OK)
+        response['ETag'] = etag
+        response['Cache-Control'] = 'private, no-cache'
+        return response
 
 
 class TokenRefreshView(GenericAPIView):
@@ -138,4 +197,31 @@ class TokenRefreshView(GenericAPIView):
         response = Response(response_data, status=status.HTTP_200_OK)
         set_refresh_cookie(response, access_token)
         
-        return response
\ No newline at end of file
+        return response
+
+
+class AuthCacheStatsView(GenericAPIView):
+    """View for authenticated user cache statistics"""
+    permission_classes = [IsAdminUser]
+    
+    def get(self, request):
+        """Gets hit and miss counters of this worker process"""
+        return Response(get_user_cache_stats(), status=status.HTTP_200_OK)
+
+
+class RevocationFilterStatsView(GenericAPIView):
+    """View for token revocation filter statistics"""
+    permission_classes = [IsAdminUser]
+    
+    def get(self, request):
+        """Gets filter size and check counters of this worker process"""
+        return Response(get_revocation_stats(), status=status.HTTP_200_OK)
+
+
+class LoginMetricsView(GenericAPIView):
+    """View for login throughput, latency and admission statistics"""
+    permission_classes = [IsAdminUser]
+    
+    def get(self, request):
+        """Gets login counters and password hashing queue state of this worker process"""
+        return Response({**get_login_stats(), 'executor': get_executor_stats()}, status=status.HTTP_200_OK)
@@ -0,0 +1,49 @@
+import time
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import RequestFactory, override_settings
+from ...api.auth_utils import create_refresh_token_for_user
+from ...api.views import TokenValidationView
+
+
+class Command(BaseCommand):
+    help = 'Compares requests per second of database-backed and stateless token validation'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=5000)
+
+    def _measure(self, name, view, request, iterations, expected_status):
+        """Calls the view repeatedly and reports requests per second"""
+        start = time.perf_counter()
+        for _ in range(iterations):
+            response = view(request)
+            if hasattr(response, 'render'):
+                response.render()
+        elapsed = time.perf_counter() - start
+        if response.status_code != expected_status:
+            self.stderr.write(f'{name}: unexpected status {response.status_code}')
+        self.stdout.write(f'{name:<20} {iterations / elapsed:>10.1f} req/s  ({elapsed * 1000 / iterations:.3f} ms/req)')
+        return response
+
+    def handle(self, *args, **options):
+        """Creates a user and token in a rolled back transaction and measures each mode"""
+        iterations = options['iterations']
+        view = TokenValidationView.as_view()
+        factory = RequestFactory()
+        with transaction.atomic():
+            user = User.objects.create_user('token_bench_user', 'bench@example.com', 'unused-password')
+            access_token = str(create_refresh_token_for_user(user).access_token)
+            request = factory.get('/api/token/validate/', HTTP_AUTHORIZATION=f'Bearer {access_token}')
+
+            with override_settings(AUTH_STATELESS_TOKEN_VALIDATION=False):
+                self._measure('database', view, request, iterations, 200)
+            with override_settings(AUTH_STATELESS_TOKEN_VALIDATION=True):
+                response = self._measure('stateless', view, request, iterations, 200)
+                conditional = factory.get(
+                    '/api/token/validate/',
+                    HTTP_AUTHORIZATION=f'Bearer {access_token}',
+                    HTTP_IF_NONE_MATCH=response['ETag']
+                )
+                self._measure('stateless + 304', view, conditional, iterations, 304)
+            transaction.set_rollback(True)
@@ -0,0 +1,38 @@
+import time
+from django.core.management.base import BaseCommand, CommandError
+from ...api.user_import import IMPORT_BATCH_SIZE, get_hash_processes, import_users
+
+
+class Command(BaseCommand):
+    help = 'Creates users from a CSV file with username, password and optional email, first_name, last_name columns'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV file with a header row')
+        parser.add_argument('--batch-size', type=int, default=IMPORT_BATCH_SIZE, help='Users per insert statement')
+        parser.add_argument('--processes', type=int, default=None, help='Password hashing processes (default: USER_IMPORT_HASH_PROCESSES)')
+
+    def handle(self, *args, **options):
+        """Runs the import and prints progress and the per-row error report"""
+        processes = options['processes'] or get_hash_processes()
+        start = time.perf_counter()
+        try:
+            with open(options['path'], encoding='utf-8-sig', newline='') as file:
+                report = import_users(
+                    file,
+                    batch_size=options['batch_size'],
+                    processes=processes,
+                    progress=lambda report: self.stdout.write(
+                        f"{report['imported']} imported, {report['failed']} failed"
+                    )
+                )
+        except (OSError, ValueError) as e:
+            raise CommandError(str(e))
+
+        for error in report['errors']:
+            self.stderr.write(f"line {error['line']}: {error['errors']}")
+        if report['failed'] > len(report['errors']):
+            self.stderr.write(f"... {report['failed'] - len(report['errors'])} more failed rows")
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {report['imported']} users, {report['failed']} failed, "
+            f"in {time.perf_counter() - start:.1f}s with {processes} hashing processes"
+        ))
@@ -0,0 +1,12 @@
+from django.contrib.auth.models import User
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .api.user_cache import forget_token_version, invalidate_user
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(sender, instance, **kwargs):
+    """Drops cached authentication entries of a changed or deleted user"""
+    invalidate_user(instance.pk)
+    forget_token_version(instance.pk)
@@ -1,3 +1,162 @@
-from django.test import TestCase
+import time
+import uuid
+from datetime import timedelta
+from unittest import mock
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from .api.auth_utils import create_refresh_token_for_user, validate_access_token_claims
+from .api.revocation import (
+    is_token_revoked, rebuild_revocation_filter, reset_revocation_filter, sync_revocation_filter
+)
+from .api.throttling import LoginIPThrottle
 
 
+def blacklist(pk=None):
+    """Blacklists a new token, optionally with a given blacklist id, and returns its jti"""
+    jti = uuid.uuid4().hex
+    token = OutstandingToken.objects.create(jti=jti, token=jti, expires_at=timezone.now() + timedelta(days=1))
+    BlacklistedToken.objects.create(pk=pk, token=token)
+    return jti
+
+
+@override_settings(REVOCATION_FILTER_SYNC_INTERVAL=3600, REVOCATION_FILTER_SYNC_OVERLAP=10)
+class RevocationFilterTests(TestCase):
+    """Tests the revocation filter and its sync with the blacklist table"""
+
+    def setUp(self):
+        reset_revocation_filter()
+
+    def tearDown(self):
+        reset_revocation_filter()
+
+    def test_revoked_and_unknown_tokens(self):
+        """Blacklisted tokens are revoked and unknown ones are not"""
+        jti = blacklist()
+        self.assertTrue(is_token_revoked(jti))
+        self.assertFalse(is_token_revoked(uuid.uuid4().hex))
+
+    def test_sync_adds_tokens_revoked_elsewhere(self):
+        """A sync picks up tokens blacklisted by other processes since the last sync"""
+        rebuild_revocation_filter()
+        jti = blacklist()
+        self.assertEqual(sync_revocation_filter(), 1)
+        self.assertTrue(is_token_revoked(jti))
+
+    def test_sync_picks_up_late_commits(self):
+        """A token whose lower id commits after a higher one was synced is still found"""
+        blacklist(pk=100)
+        late = uuid.uuid4().hex
+        rebuild_revocation_filter()
+        # Committed after the filter already saw id 100
+        token = OutstandingToken.objects.create(jti=late, token=late, expires_at=timezone.now() + timedelta(days=1))
+        BlacklistedToken.objects.create(pk=95, token=token)
+        self.assertEqual(sync_revocation_filter(), 1)
+        self.assertTrue(is_token_revoked(late))
+
+    def test_sync_does_not_count_rows_twice(self):
+        """Rows read again by the overlap are not added to the filter a second time"""
+        for _ in range(3):
+            blacklist()
+        self.assertEqual(rebuild_revocation_filter(), 3)
+        self.assertEqual(sync_revocation_filter(), 0)
+        self.assertEqual(sync_revocation_filter(), 0)
+
+
+class StatelessTokenValidationTests(TestCase):
+    """Tests validation from token claims and its token version check"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('fay', 'fay@example.com', 'pw')
+        self.access_token = str(create_refresh_token_for_user(self.user).access_token)
+
+    def test_reads_user_from_claims(self):
+        """A current token is validated from its claims without queries once the version is cached"""
+        validate_access_token_claims(self.access_token)
+        with CaptureQueriesContext(connection) as queries:
+            user_data, _ = validate_access_token_claims(self.access_token)
+        self.assertEqual(user_data['username'], 'fay')
+        self.assertEqual(user_data['id'], self.user.pk)
+        self.assertEqual(len(queries), 0)
+
+    def test_rejects_after_password_change(self):
+        """Changing the password ends access of tokens issued before"""
+        validate_access_token_claims(self.access_token)
+        self.user.set_password('new')
+        self.user.save()
+        user_data, error = validate_access_token_claims(self.access_token)
+        self.assertIsNone(user_data)
+        self.assertEqual(error, "Token ist nicht mehr gültig.")
+
+    def test_rejects_deactivated_user_with_stale_cache(self):
+        """A deactivation missed by the cache is caught once the cached version expires"""
+        validate_access_token_claims(self.access_token)
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        self.assertIsNotNone(validate_access_token_claims(self.access_token)[0])
+        cache.clear()
+        self.assertIsNone(validate_access_token_claims(self.access_token)[0])
+
+    def test_rejects_deleted_user(self):
+        """Deleting the user ends access of its tokens"""
+        self.user.delete()
+        self.assertIsNone(validate_access_token_claims(self.access_token)[0])
+
+    def test_new_token_after_password_change(self):
+        """A token issued after a change is accepted although an older version was cached"""
+        validate_access_token_claims(self.access_token)
+        User.objects.filter(pk=self.user.pk).update(password='changed')
+        self.user.refresh_from_db()
+        new_token = str(create_refresh_token_for_user(self.user).access_token)
+        self.assertIsNotNone(validate_access_token_claims(new_token)[0])
+
+
+@override_settings(LOGIN_THROTTLE_RATES={'login_ip': (3, 60)})
+class LoginThrottleTests(TestCase):
+    """Tests the token bucket that throttles login attempts per client address"""
+
+    def setUp(self):
+        cache.clear()
+        self.request = RequestFactory().post('/api/login/', REMOTE_ADDR='10.0.0.1')
+
+    def attempt(self, now):
+        """Runs one login attempt at a given time and returns whether it passed and the wait"""
+        throttle = LoginIPThrottle()
+        with mock.patch('user_auth_app.api.throttling.time.time', return_value=now):
+            return throttle.allow_request(self.request, None), throttle.wait()
+
+    def test_allows_burst_then_rejects(self):
+        """Attempts up to the bucket size pass and the next one waits for a token"""
+        now = time.time()
+        self.assertTrue(all(self.attempt(now)[0] for _ in range(3)))
+        allowed, wait = self.attempt(now)
+        self.assertFalse(allowed)
+        self.assertAlmostEqual(wait, 1, places=3)
+
+    def test_refills_over_time(self):
+        """A token comes back after one refill interval, but not the whole burst"""
+        now = time.time()
+        for _ in range(3):
+            self.attempt(now)
+        self.assertTrue(self.attempt(now + 1)[0])
+        self.assertFalse(self.attempt(now + 1)[0])
+
+    def test_other_addresses_have_own_bucket(self):
+        """An exhausted bucket does not throttle other client addresses"""
+        now = time.time()
+        for _ in range(4):
+            self.attempt(now)
+        self.request = RequestFactory().post('/api/login/', REMOTE_ADDR='10.0.0.2')
+        self.assertTrue(self.attempt(now)[0])
+
+    def test_rejects_while_bucket_is_locked(self):
+        """An attempt that cannot take the bucket lock is rejected instead of bypassing the bucket"""
+        throttle = LoginIPThrottle()
+        throttle.lock_timeout = 0.05
+        cache.add(f'{throttle.get_cache_key(self.request, None)}:lock', 'other', 5)
+        self.assertFalse(throttle.allow_request(self.request, None))
+        self.assertIsNotNone(throttle.wait())